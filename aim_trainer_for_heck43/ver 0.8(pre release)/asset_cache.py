@@ -0,0 +1,75 @@
+import json
+import os
+
+# Запеченные ассеты (python bake_assets.py): .bam вместо .egg и .txo с мипмапами
+# вместо png/jpg. Имя файла содержит хэш исходника, манифест хранит, из чего он сделан
+BAKE_DIR = 'baked'
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# False - всегда грузить исходники (для сравнения в bake_assets.py --report)
+USE_BAKED = True
+
+
+def game_dir():
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def source_stamp(path):
+    """Размер и время изменения файла: дешевая проверка, что исходник не менялся"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def read_manifest(root):
+    try:
+        with open(os.path.join(root, BAKE_DIR, MANIFEST_NAME), 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('assets', {})
+
+
+class AssetCache:
+    """Подменяет пути к моделям и текстурам на запеченные версии.
+
+    Запеченный файл берется, только если все его исходники (модель и ее
+    текстуры) совпадают по размеру и времени изменения с записанными в
+    манифесте; иначе грузится исходник, как раньше. Хэш исходника при
+    запуске не считается - его проверяет bake_assets.py при запекании.
+    """
+
+    def __init__(self, loader, root=None, use_baked=None):
+        self.loader = loader
+        self.root = root or game_dir()
+        self.use_baked = USE_BAKED if use_baked is None else use_baked
+        self.entries = read_manifest(self.root) if self.use_baked else {}
+        self.hits = []
+        self.misses = []
+
+    def resolve(self, path):
+        """Путь к запеченной версии ассета, если она свежая, иначе сам path"""
+        entry = self.entries.get(path)
+        if entry is None:
+            return path
+        baked = os.path.join(self.root, BAKE_DIR, entry['output'])
+        try:
+            fresh = os.path.exists(baked) and all(
+                source_stamp(os.path.join(self.root, source)) == stamp
+                for source, stamp in entry['sources'].items())
+        except OSError:
+            fresh = False
+        if not fresh:
+            print(f"Запеченный {path} устарел, грузится исходник (python bake_assets.py)")
+            self.misses.append(path)
+            return path
+        self.hits.append(path)
+        return os.path.relpath(baked, self.root).replace(os.sep, '/')
+
+    def load_model(self, path):
+        return self.loader.loadModel(self.resolve(path))
+
+    def load_texture(self, path):
+        return self.loader.loadTexture(self.resolve(path))
@@ -0,0 +1,108 @@
+from panda3d.core import AudioSound
+import math
+
+# Сколько копий одного звука может звучать одновременно
+DEFAULT_VOICES = 2
+MAX_VOICES = 8
+
+
+class AudioManager:
+    """Все звуки загружаются один раз при старте (в фоне, через LoadQueue).
+
+    На каждый звук держится небольшой пул голосов (копий AudioSound), которые
+    играются по кругу: частые выстрелы накладываются друг на друга, а не обрывают
+    предыдущий звук. Музыка идет через этот же менеджер.
+    """
+
+    def __init__(self, base, master_volume=1.0):
+        self.base = base
+        self.master_volume = master_volume
+        self.sounds = {}  # имя -> {'voices': [...], 'next': 0, 'volume': 1.0}
+        self.music = None
+        self.music_path = None
+        self.tracks = {}  # путь -> AudioSound, заранее загруженные треки
+        self.music_volume = 1.0
+
+    def load(self, name, path, volume=1.0, min_interval=None, sound=None):
+        """Загружает звук под именем name.
+
+        min_interval - минимальный промежуток между воспроизведениями (например,
+        задержка выстрела); по нему и длине звука считается число голосов.
+        sound - уже загруженный в фоне первый голос.
+        """
+        first = sound or self.base.loader.loadSfx(path)
+        count = DEFAULT_VOICES
+        if min_interval and first.length() > 0:
+            count = min(MAX_VOICES, max(1, math.ceil(first.length() / min_interval)))
+        # Повторные loadSfx того же файла берут уже декодированные данные из кэша
+        voices = [first] + [self.base.loader.loadSfx(path) for _ in range(count - 1)]
+        self.sounds[name] = {'voices': voices, 'next': 0, 'volume': volume}
+        self.apply_volume(name)
+
+    def play(self, name):
+        """Играет звук на следующем голосе пула"""
+        sound = self.sounds.get(name)
+        if sound is None:
+            return None
+        voice = sound['voices'][sound['next']]
+        sound['next'] = (sound['next'] + 1) % len(sound['voices'])
+        if voice.status() == AudioSound.PLAYING:
+            voice.stop()  # самый старый голос - его не жалко оборвать
+        voice.play()
+        return voice
+
+    def stop(self, name=None):
+        """Останавливает звук (или все звуки, если имя не задано)"""
+        names = [name] if name is not None else list(self.sounds)
+        for sound_name in names:
+            for voice in self.sounds.get(sound_name, {}).get('voices', []):
+                voice.stop()
+
+    def set_volume(self, name, volume):
+        if name in self.sounds:
+            self.sounds[name]['volume'] = volume
+            self.apply_volume(name)
+
+    def set_master_volume(self, volume):
+        self.master_volume = volume
+        for name in self.sounds:
+            self.apply_volume(name)
+        if self.music:
+            self.music.setVolume(self.music_volume * self.master_volume)
+
+    def apply_volume(self, name):
+        sound = self.sounds[name]
+        for voice in sound['voices']:
+            voice.setVolume(sound['volume'] * self.master_volume)
+
+    def add_track(self, path, sound):
+        """Трек, загруженный заранее: play_music возьмет его без загрузки"""
+        if sound:
+            self.tracks[path] = sound
+
+    def play_music(self, path, volume=0.5):
+        """Запускает фоновую музыку по кругу; уже играющий трек не перезапускается"""
+        self.music_volume = volume
+        if self.music and self.music_path == path:
+            self.music.setVolume(volume * self.master_volume)
+            if self.music.status() != AudioSound.PLAYING:
+                self.music.play()
+            return self.music
+
+        self.stop_music()
+        self.music = self.tracks.get(path) or self.base.loader.loadSfx(path)
+        self.music_path = path
+        if self.music:
+            self.music.setLoop(True)
+            self.music.setVolume(volume * self.master_volume)
+            self.music.play()
+        return self.music
+
+    def stop_music(self):
+        if self.music:
+            self.music.stop()
+
+    def set_music_volume(self, volume):
+        self.music_volume = volume
+        if self.music:
+            self.music.setVolume(volume * self.master_volume)
@@ -0,0 +1,248 @@
+from panda3d.core import loadPrcFileData, Filename, Loader, LoaderOptions, NodePath, SamplerState, Texture
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from asset_cache import BAKE_DIR, MANIFEST_NAME, MANIFEST_VERSION, game_dir, read_manifest, source_stamp
+
+# Запекание ассетов перед запуском: модели -> .bam (статичная геометрия сплющена),
+# текстуры -> .txo с мипмапами и сжатием DXT. Игра берет запеченное через AssetCache.
+# Запекание:  python bake_assets.py            (без изменений в исходниках ничего не делает)
+# Отчет:      python bake_assets.py --report   (запуск игры без окна: исходники и запеченное,
+#                                               холодный и теплый кэш моделей Panda3D)
+
+# Модель -> сплющивать ли ее (flattenStrong: только для геометрии, которая не двигается по частям)
+MODELS = {
+    'xz.egg': True,
+    'model_textures/untitled.bam': True,
+}
+TEXTURES = (
+    'assets/author_logo.jpg',
+    'models/snowflake.png',
+)
+
+# Меняется при изменении способа запекания - все пересобирается
+BAKE_VERSION = 1
+
+
+def file_hash(paths, *extra):
+    digest = hashlib.sha1(f"{BAKE_VERSION}:{extra}".encode())
+    for path in sorted(paths):
+        digest.update(path.encode())
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def prepare_texture(texture):
+    """Мипмапы считаются заранее, а не драйвером при загрузке; сжатие DXT, если доступно"""
+    if not texture.hasRamImage():
+        return False
+    texture.setMinfilter(SamplerState.FT_linear_mipmap_linear)
+    texture.generateRamMipmapImages()
+    mode = Texture.CM_dxt5 if texture.getNumComponents() == 4 else Texture.CM_dxt1
+    # Без libsquish в сборке Panda3D сжать на CPU нельзя - остаются несжатые мипмапы
+    return texture.compressRamImage(mode)
+
+
+class Baker:
+    def __init__(self, root, force=False):
+        self.root = root
+        self.force = force
+        self.out_dir = os.path.join(root, BAKE_DIR)
+        self.entries = {} if force else read_manifest(root)
+        self.baked = []
+        self.skipped = []
+
+    def path(self, relative):
+        return os.path.join(self.root, relative)
+
+    def relative(self, path):
+        path = os.path.abspath(path)
+        if path.startswith(self.root + os.sep):
+            return os.path.relpath(path, self.root).replace(os.sep, '/')
+        return path
+
+    def up_to_date(self, asset, *extra):
+        """Запеченная версия есть и ее исходники (модель и ее текстуры) не менялись"""
+        entry = self.entries.get(asset)
+        if entry is None or not os.path.exists(os.path.join(self.out_dir, entry['output'])):
+            return False
+        try:
+            if entry['hash'] != file_hash([self.path(source) for source in entry['sources']], *extra):
+                return False
+            # Содержимое то же (например, файл просто скопировали) - обновляем отметки,
+            # по которым игра проверяет свежесть
+            entry['sources'] = {source: source_stamp(self.path(source)) for source in entry['sources']}
+            return True
+        except OSError:
+            return False
+
+    def record(self, asset, output, sources, digest, **info):
+        old = self.entries.get(asset)
+        if old is not None and old['output'] != output:
+            try:
+                os.remove(os.path.join(self.out_dir, old['output']))
+            except OSError:
+                pass
+        self.entries[asset] = dict(info, output=output, hash=digest,
+                                   sources={source: source_stamp(self.path(source)) for source in sources})
+        self.baked.append(asset)
+
+    def output_name(self, asset, digest, extension):
+        stem = os.path.splitext(os.path.basename(asset))[0]
+        return f"{stem}-{digest[:12]}{extension}"
+
+    def bake_model(self, asset, flatten):
+        if self.up_to_date(asset, flatten):
+            self.skipped.append(asset)
+            return
+        started = time.perf_counter()
+        options = LoaderOptions(LoaderOptions.LF_search | LoaderOptions.LF_report_errors | LoaderOptions.LF_no_cache)
+        node = Loader.getGlobalPtr().loadSync(Filename.fromOsSpecific(self.path(asset)), options)
+        if node is None:
+            print(f"Не удалось загрузить {asset}")
+            return
+        model = NodePath(node)
+        if flatten:
+            model.flattenStrong()
+
+        sources = [asset]
+        compressed = 0
+        for texture in model.findAllTextures():
+            if texture.hasFullpath() and os.path.exists(texture.getFullpath().toOsSpecific()):
+                sources.append(self.relative(texture.getFullpath().toOsSpecific()))
+            compressed += prepare_texture(texture)
+        digest = file_hash([self.path(source) for source in sources], flatten)
+        output = self.output_name(asset, digest, '.bam')
+        # bam-texture-mode rawdata: текстуры (с мипмапами) лежат внутри .bam
+        if not model.writeBamFile(Filename.fromOsSpecific(os.path.join(self.out_dir, output))):
+            print(f"Не удалось записать {output}")
+            return
+        self.record(asset, output, sources, digest, flatten=flatten, textures=len(sources) - 1,
+                    compressed=compressed)
+        print(f"{asset} -> {BAKE_DIR}/{output} ({len(sources) - 1} текстур, "
+              f"{time.perf_counter() - started:.2f} с)")
+
+    def bake_texture(self, asset):
+        if self.up_to_date(asset):
+            self.skipped.append(asset)
+            return
+        texture = Texture(os.path.basename(asset))
+        if not texture.read(Filename.fromOsSpecific(self.path(asset))):
+            print(f"Не удалось загрузить {asset}")
+            return
+        compressed = prepare_texture(texture)
+        digest = file_hash([self.path(asset)])
+        output = self.output_name(asset, digest, '.txo')
+        if not texture.write(Filename.fromOsSpecific(os.path.join(self.out_dir, output))):
+            print(f"Не удалось записать {output}")
+            return
+        self.record(asset, output, [asset], digest, compressed=bool(compressed))
+        print(f"{asset} -> {BAKE_DIR}/{output}" + (" (DXT)" if compressed else ""))
+
+    def run(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        for asset, flatten in MODELS.items():
+            if os.path.exists(self.path(asset)):
+                self.bake_model(asset, flatten)
+            else:
+                print(f"Нет исходника {asset}, пропускаю")
+        for asset in TEXTURES:
+            if os.path.exists(self.path(asset)):
+                self.bake_texture(asset)
+            else:
+                print(f"Нет исходника {asset}, пропускаю")
+
+        manifest = {'version': MANIFEST_VERSION, 'assets': self.entries}
+        tmp_path = os.path.join(self.out_dir, MANIFEST_NAME + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(tmp_path, os.path.join(self.out_dir, MANIFEST_NAME))
+        print(f"Запечено {len(self.baked)}, без изменений {len(self.skipped)}")
+
+
+def measure(mode, cache_dir):
+    """Один запуск игры без окна (в отдельном процессе): время импорта и Game.__init__"""
+    loadPrcFileData('', 'window-type offscreen\naudio-library-name null')
+    loadPrcFileData('', f'model-cache-dir {cache_dir}')
+    import asset_cache
+    asset_cache.USE_BAKED = mode == 'baked'
+    started = time.perf_counter()
+    from main import Game
+    imported = time.perf_counter()
+    game = Game(headless=True)
+    initialized = time.perf_counter()
+    result = {
+        'import_s': imported - started,
+        'init_s': initialized - imported,
+        'baked': game.assets.hits,
+    }
+    game.destroy()
+    print(json.dumps(result))
+
+
+def report(root, runs):
+    """Холодный запуск - пустой кэш моделей Panda3D, теплый - тот же кэш после первого запуска.
+    Файловый кэш ОС между запусками не сбрасывается"""
+    results = {}
+    for mode in ('source', 'baked'):
+        with tempfile.TemporaryDirectory(prefix='aim_model_cache_') as cache_dir:
+            for launch in ['cold'] + ['warm'] * runs:
+                started = time.perf_counter()
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--measure', mode, '--cache-dir', cache_dir],
+                    cwd=root, capture_output=True, text=True)
+                wall = time.perf_counter() - started
+                if output.returncode != 0:
+                    print(output.stderr)
+                    raise SystemExit(f"Запуск ({mode}, {launch}) завершился с ошибкой")
+                result = json.loads(output.stdout.strip().splitlines()[-1])
+                result['process_s'] = wall
+                results.setdefault(f"{mode}_{launch}", []).append(result)
+
+    print(f"{'запуск':<14}{'процесс, с':>12}{'импорт, с':>12}{'Game(), с':>12}")
+    summary = {}
+    for key, launches in results.items():
+        best = {name: min(run[name] for run in launches) for name in ('process_s', 'import_s', 'init_s')}
+        best['baked'] = launches[0]['baked']
+        summary[key] = best
+        print(f"{key:<14}{best['process_s']:>12.3f}{best['import_s']:>12.3f}{best['init_s']:>12.3f}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Запекание моделей и текстур для быстрого запуска")
+    parser.add_argument('--force', action='store_true', help="пересобрать все, даже неизмененное")
+    parser.add_argument('--report', action='store_true', help="замерить запуск с исходниками и с запеченным")
+    parser.add_argument('--runs', type=int, default=2, help="сколько теплых запусков на режим (берется лучший)")
+    parser.add_argument('--output', help="куда записать JSON-отчет")
+    parser.add_argument('--measure', choices=('source', 'baked'), help=argparse.SUPPRESS)
+    parser.add_argument('--cache-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        measure(args.measure, args.cache_dir)
+        return 0
+
+    root = game_dir()
+    # Текстуры с мипмапами пишутся внутрь .bam, а не ссылкой на png
+    loadPrcFileData('', 'bam-texture-mode rawdata')
+    Baker(root, force=args.force).run()
+
+    if args.report:
+        summary = report(root, args.runs)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(summary, f, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+from panda3d.core import NodePath, Filename, Loader, Point3, GeomNode
+from panda3d.core import CollisionTraverser, CollisionNode, CollisionHandlerQueue, CollisionSphere
+from collision_mesh import MapCollision
+import numpy as np
+import argparse
+import random
+import time
+import json
+
+# Время коллизий игрока с картой за кадр: старая копия видимой геометрии в
+# CollisionNode против упрощенного меша в октодереве (MapCollision).
+# Сфера игрока (радиус 1 м на высоте глаз) ходит случайным маршрутом по карте,
+# каждый кадр - один traverse, как у CollisionHandlerPusher в игре.
+# Пример: python bench_collision.py --frames 5000 --output collision.json
+
+
+def load_map(path):
+    return NodePath(Loader.getGlobalPtr().loadSync(Filename(path)))
+
+
+def copy_scene(path):
+    """Как было в Game.__init__: первый GeomNode карты копируется под CollisionNode"""
+    scene = NodePath('scene')
+    model = load_map(path)
+    model.reparentTo(scene)
+    map_collision_np = NodePath(CollisionNode('map_collision'))
+    geom_node = model.find("**/+GeomNode")
+    if not geom_node.isEmpty():
+        geom_node.copyTo(map_collision_np)
+        map_collision_np.reparentTo(model)
+    return scene, model
+
+
+def octree_scene(path):
+    scene = NodePath('scene')
+    model = load_map(path)
+    model.reparentTo(scene)
+    collision = MapCollision(model)
+    return scene, collision
+
+
+def route(bounds, frames, height, seed):
+    """Маршрут игрока: случайные точки карты, между ними - шаги по 5 см (как бег за кадр)"""
+    rng = random.Random(seed)
+    low, high = bounds
+    points = []
+    position = Point3((low.x + high.x) / 2, (low.y + high.y) / 2, height)
+    while len(points) < frames:
+        goal = Point3(rng.uniform(low.x, high.x), rng.uniform(low.y, high.y), height + rng.choice((0, 0, 0.5, 1.0)))
+        steps = max(1, int((goal - position).length() / 0.05))
+        for step in range(1, steps + 1):
+            points.append(position + (goal - position) * (step / steps))
+        position = goal
+    return points[:frames]
+
+
+def measure(scene, from_mask, points, radius):
+    player_node = CollisionNode('player')
+    player_node.addSolid(CollisionSphere(0, 0, 0, radius))
+    player_node.setFromCollideMask(from_mask)
+    player = scene.attachNewNode(player_node)
+    queue = CollisionHandlerQueue()
+    trav = CollisionTraverser('bench')
+    trav.addCollider(player, queue)
+
+    times = []
+    contacts = 0
+    frames_with_contacts = 0
+    for point in points:
+        player.setPos(point)
+        t0 = time.perf_counter()
+        trav.traverse(scene)
+        times.append((time.perf_counter() - t0) * 1e6)
+        contacts += queue.getNumEntries()
+        frames_with_contacts += queue.getNumEntries() > 0
+    player.removeNode()
+
+    times = np.asarray(times)
+    return {
+        'mean_us': float(times.mean()),
+        'p50_us': float(np.percentile(times, 50)),
+        'p99_us': float(np.percentile(times, 99)),
+        'contacts': contacts,
+        'frames_with_contacts': frames_with_contacts,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Время коллизий игрока с картой за кадр")
+    parser.add_argument('--map', default='xz.egg', help="модель карты")
+    parser.add_argument('--frames', type=int, default=5000, help="сколько кадров маршрута")
+    parser.add_argument('--radius', type=float, default=1.0, help="радиус сферы игрока")
+    parser.add_argument('--height', type=float, default=1.8, help="высота глаз игрока")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="куда записать JSON-отчет")
+    args = parser.parse_args(argv)
+
+    copy, copy_model = copy_scene(args.map)
+    octree, collision = octree_scene(args.map)
+    points = route(copy_model.getTightBounds(), args.frames, args.height, args.seed)
+
+    # Сфера игрока по умолчанию не видит бит GeomNode, поэтому в игре копия карты
+    # обходилась траверсером, но не сталкивалась; "copy_geometry" - цена, если бы сталкивалась
+    default_mask = CollisionNode.getDefaultCollideMask()
+    results = {
+        'copy': measure(copy, default_mask, points, args.radius),
+        'copy_geometry': measure(copy, default_mask | GeomNode.getDefaultCollideMask(), points, args.radius),
+        'octree': measure(octree, default_mask, points, args.radius),
+    }
+
+    print(f"Карта {args.map}: {collision.stats['triangles']} треугольников -> {collision.stats['polygons']} полигонов, "
+          f"{collision.stats['cells']} ячеек (глубина {collision.stats['depth']})")
+    for name, result in results.items():
+        print(f"  {name:<14} среднее {result['mean_us']:7.2f} мкс, p50 {result['p50_us']:7.2f}, "
+              f"p99 {result['p99_us']:7.2f}, кадров с касанием {result['frames_with_contacts']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'map': args.map, 'mesh': collision.stats, 'frames': args.frames, 'results': results}, f, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
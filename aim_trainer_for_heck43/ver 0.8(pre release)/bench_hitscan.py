@@ -0,0 +1,197 @@
+from panda3d.core import loadPrcFileData
+
+# Без окна и звука: рисовать ничего не нужно, нужна только камера с линзой
+loadPrcFileData('', 'window-type offscreen\naudio-library-name null')
+
+from direct.showbase.ShowBase import ShowBase
+from panda3d.core import Point3, CollisionTraverser, CollisionNode, CollisionHandlerQueue
+from panda3d.core import CollisionHandlerPusher, CollisionRay, CollisionSphere, BitMask32
+from target import Target
+from hitscan import Hitscan, TARGET_MASK
+from spatial import TargetGrid
+from asset_cache import AssetCache
+from collision_mesh import MapCollision
+import argparse
+import math
+import random
+import time
+import json
+
+# Сравнение старой проверки выстрела (cTrav.traverse(render) по всей сцене), Hitscan
+# (свой траверсер только по манекенам) и Hitscan с сеткой TargetGrid на одной и той же сцене.
+# Пример: python bench_hitscan.py --targets 10,100,1000 --shots 500
+# Стресс-режим (N движущихся манекенов, сколько выстрелов в секунду выдерживает проверка):
+#         python bench_hitscan.py --stress 500 --seconds 5
+
+
+class BenchScene(ShowBase):
+    def __init__(self, shells=30):
+        ShowBase.__init__(self)
+        self.settings = {'show_target_images': False}
+        self.camera.setPos(0, 0, 1.8)
+
+        # Карта с упрощенной коллизией в октодереве - как в Game.on_map_loaded
+        self.assets = AssetCache(self.loader)
+        self.map_model = self.assets.load_model("xz.egg")
+        self.map_model.reparentTo(self.render)
+        self.map_collision = MapCollision(self.map_model)
+
+        try:
+            self.extra_model = self.assets.load_model("model_textures/untitled.bam")
+            self.extra_model.reparentTo(self.render)
+            self.extra_model.setPos(8, 0, 0)
+            self.extra_model.setScale(2.0)
+        except OSError:
+            print("Доп. модель не найдена, замер без нее")
+
+        # Гильзы, которые обычно разбросаны по сцене
+        shell_model = self.loader.loadModel("models/box")
+        shell_model.setScale(0.02, 0.05, 0.02)
+        for _ in range(shells):
+            shell = shell_model.copyTo(self.render)
+            shell.setPos(random.uniform(-2, 2), random.uniform(0, 3), random.uniform(0, 2))
+
+        self.targets = []
+        self.targets_root = self.render.attachNewNode("targets")
+        self.target_index = TargetGrid()
+
+        # Старый путь: общий траверсер с игроком-сферой и лучом, обход всего render
+        self.old_trav = CollisionTraverser('traverser')
+        self.old_queue = CollisionHandlerQueue()
+        player_np = self.camera.attachNewNode(CollisionNode('player'))
+        player_np.node().addSolid(CollisionSphere(0, 0, 0, 1.0))
+        pusher = CollisionHandlerPusher()
+        pusher.addCollider(player_np, self.camera)
+        self.old_trav.addCollider(player_np, pusher)
+        self.old_ray = CollisionRay()
+        ray_np = self.camera.attachNewNode(CollisionNode('mouseRay'))
+        ray_np.node().addSolid(self.old_ray)
+        ray_np.node().setFromCollideMask(TARGET_MASK)
+        ray_np.node().setIntoCollideMask(BitMask32.allOff())
+        self.old_trav.addCollider(ray_np, self.old_queue)
+
+        self.hitscan = Hitscan(self, self.targets_root)
+        self.indexed_hitscan = Hitscan(self, self.targets_root, self.target_index)
+
+    def set_targets(self, count):
+        for target in self.targets:
+            target.destroy()
+        self.targets = []
+        # Арена расширяется с числом манекенов, чтобы они не стояли друг в друге
+        width = max(30, count ** 0.5 * 4)
+        for _ in range(count):
+            pos = Point3(random.uniform(-width / 2, width / 2), random.uniform(15, 15 + width), 1)
+            self.targets.append(Target(self, pos))
+
+    def old_cast(self, x, y):
+        self.old_ray.setFromLens(self.camNode, x, y)
+        self.old_trav.traverse(self.render)
+        if self.old_queue.getNumEntries() == 0:
+            return None
+        self.old_queue.sortEntries()
+        for i in range(self.old_queue.getNumEntries()):
+            entry = self.old_queue.getEntry(i)
+            if entry.getIntoNode().getName().startswith('target_'):
+                origin = self.render.getRelativePoint(entry.getFromNodePath(), self.old_ray.getOrigin())
+                return (entry.getSurfacePoint(self.render) - origin).length()
+        return None
+
+    # Сравниваем дистанцию до попадания, а не имя части: у тела и ног общая передняя грань,
+    # и при попадании в нее порядок равных записей у разных обходов может отличаться
+    def new_cast(self, x, y):
+        hit = self.hitscan.cast(x, y)
+        return hit.distance if hit else None
+
+    def indexed_cast(self, x, y):
+        hit = self.indexed_hitscan.cast(x, y)
+        return hit.distance if hit else None
+
+
+def same_hits(first, second):
+    return all((a is None) == (b is None) and (a is None or abs(a - b) < 1e-3)
+               for a, b in zip(first, second))
+
+
+def run(scene, count, shots):
+    scene.set_targets(count)
+    points = [(random.uniform(-0.5, 0.5), random.uniform(-0.3, 0.3)) for _ in range(shots)]
+    result = {'targets': count, 'shots': shots}
+    parts = {}
+    for name, cast in (('old', scene.old_cast), ('hitscan', scene.new_cast), ('indexed', scene.indexed_cast)):
+        start = time.perf_counter()
+        parts[name] = [cast(x, y) for x, y in points]
+        result[f'{name}_us'] = (time.perf_counter() - start) / shots * 1e6
+    result['hits'] = sum(part is not None for part in parts['hitscan'])
+    result['same_hits'] = same_hits(parts['old'], parts['hitscan']) and same_hits(parts['old'], parts['indexed'])
+    return result
+
+
+def stress(scene, count, seconds, shots_per_frame=10):
+    """N манекенов ходят из стороны в сторону; каждый кадр сетка обновляется и делается
+    пачка выстрелов. Возвращает выстрелы в секунду, которые выдерживает проверка"""
+    scene.set_targets(count)
+    homes = [(target, Point3(target.position), random.uniform(0, 2 * math.pi)) for target in scene.targets]
+    move_time = shot_time = 0.0
+    shots = frames = 0
+    hits = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        t = frames / 60
+        t0 = time.perf_counter()
+        for target, home, phase in homes:
+            target.set_position(Point3(home.x + 2 * math.sin(t * 2 + phase), home.y, home.z))
+        t1 = time.perf_counter()
+        for _ in range(shots_per_frame):
+            hit = scene.indexed_hitscan.cast(random.uniform(-0.5, 0.5), random.uniform(-0.3, 0.3))
+            hits += hit is not None
+        t2 = time.perf_counter()
+        move_time += t1 - t0
+        shot_time += t2 - t1
+        shots += shots_per_frame
+        frames += 1
+    return {
+        'targets': count,
+        'frames': frames,
+        'shots': shots,
+        'hits': hits,
+        'shots_per_sec': shots / shot_time if shot_time else float('inf'),
+        'index_update_ms_per_frame': move_time / frames * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер проверки выстрела: вся сцена против Hitscan")
+    parser.add_argument('--targets', default='10,100,1000', help="число манекенов через запятую")
+    parser.add_argument('--shots', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stress', type=int, help="стресс-режим: число движущихся манекенов")
+    parser.add_argument('--seconds', type=float, default=5.0, help="длительность стресс-режима")
+    parser.add_argument('--output', help="куда записать JSON-отчет")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    scene = BenchScene()
+    results = []
+    if args.stress:
+        result = stress(scene, args.stress, args.seconds)
+        results.append(result)
+        print(f"{args.stress} движущихся манекенов: {result['shots_per_sec']:.0f} выстрелов/с, "
+              f"обновление сетки {result['index_update_ms_per_frame']:.2f} мс/кадр, "
+              f"попаданий {result['hits']} из {result['shots']}")
+    else:
+        for count in map(int, args.targets.split(',')):
+            result = run(scene, count, args.shots)
+            results.append(result)
+            print(f"{count:>5} манекенов: старый путь {result['old_us']:8.1f} мкс, "
+                  f"hitscan {result['hitscan_us']:8.1f} мкс, с сеткой {result['indexed_us']:8.1f} мкс, "
+                  f"попаданий {result['hits']}, совпадает: {result['same_hits']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+    scene.destroy()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
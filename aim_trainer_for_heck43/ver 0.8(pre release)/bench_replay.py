@@ -0,0 +1,140 @@
+from panda3d.core import loadPrcFileData
+
+# Без окна и звука: кадр рисуется в offscreen-буфер
+loadPrcFileData('', 'window-type offscreen\naudio-library-name null')
+
+from panda3d.core import ClockObject
+from main import Game
+from replay import InputReplay, read_replay
+import numpy as np
+import argparse
+import time
+import json
+
+# Воспроизведение записанного матча без окна с фиксированным шагом времени.
+# Запись: python main.py --record match.replay (пишется с начала матча до выхода в меню)
+# Замер:  python bench_replay.py match.replay --fps 60 --output result.json
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    values = np.asarray(values, dtype=np.float64)
+    p50, p90, p99, p999 = np.percentile(values, (50, 90, 99, 99.9))
+    return {'mean': values.mean(), 'p50': p50, 'p90': p90, 'p99': p99, 'p99.9': p999, 'max': values.max()}
+
+
+def run(data, fps):
+    game = Game(headless=True)
+    replay = InputReplay(game, data)
+    game.input_source = replay
+
+    # Фиксированный шаг: время кадра ставится вручную, ровно +1/fps за кадр.
+    # MSlave, а не MNonRealTime: замедление (update_time_scale) меняет dt через setDt,
+    # что в других режимах навсегда меняет частоту кадров часов
+    globalClock.setMode(ClockObject.MSlave)
+    step = 1.0 / fps
+
+    # Считаются только настоящие выстрелы: shoot() на перезарядке (клик пистолетом
+    # раньше cooldown) сразу возвращается и в замер не попадает.
+    # shoot_compute_ms - сколько считается сам shoot() (луч, попадание, handle_collision).
+    # shot_to_hit_ms - от рассылки ввода кадра (InputReplay.replay_task) до засчитанного
+    # попадания: клик доходит до shoot() через messenger, автоогонь винтовки - через update
+    # того же кадра. Отрисовка кадра сюда не входит
+    in_shot = [False]
+    shoot_ms = []
+    shot_to_hit_ms = []
+    counters = {'shots': 0, 'hits': 0}
+    shoot, handle_collision = game.shoot, game.handle_collision
+
+    def timed_shoot():
+        could_shoot = game.can_shoot
+        in_shot[0] = could_shoot
+        t0 = time.perf_counter()
+        try:
+            return shoot()
+        finally:
+            elapsed = (time.perf_counter() - t0) * 1000
+            in_shot[0] = False
+            # Выстрел состоялся, если shoot() снял can_shoot (вернется по таймеру reset_shoot)
+            if could_shoot and not game.can_shoot:
+                counters['shots'] += 1
+                shoot_ms.append(elapsed)
+
+    def timed_handle_collision(entry):
+        if in_shot[0]:
+            counters['hits'] += 1
+            if replay.dispatched is not None:
+                shot_to_hit_ms.append((time.perf_counter() - replay.dispatched) * 1000)
+        return handle_collision(entry)
+
+    game.shoot = timed_shoot
+    game.handle_collision = timed_handle_collision
+
+    game.start_game()
+    frame_ms = []
+    started = time.perf_counter()
+    frame = 0
+    while not replay.finished:
+        frame += 1
+        globalClock.setFrameTime(frame * step)
+        globalClock.setDt(step)
+        t0 = time.perf_counter()
+        game.taskMgr.step()
+        frame_ms.append((time.perf_counter() - t0) * 1000)
+    wall = time.perf_counter() - started
+
+    # Среднее время задач по кадрам из записи профилировщика
+    sections = {}
+    for _, _, _, frame_sections in game.profiler.trace:
+        for name, ms in frame_sections.items():
+            sections.setdefault(name, []).append(ms)
+
+    result = {
+        'frames': len(frame_ms),
+        'fps': fps,
+        'wall_seconds': wall,
+        'frame_ms': percentiles(frame_ms),
+        'shots': counters['shots'],
+        'hits': counters['hits'],
+        'score': game.score,
+        'shoot_compute_ms': percentiles(shoot_ms),
+        'shot_to_hit_ms': percentiles(shot_to_hit_ms),
+        'sections_ms': {name: sum(values) / len(values) for name, values in sections.items()},
+    }
+    game.destroy()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Воспроизведение записи матча без окна и замер кадра")
+    parser.add_argument('replay', help="файл записи (python main.py --record PATH)")
+    parser.add_argument('--fps', type=float, default=60.0, help="фиксированный шаг игрового времени")
+    parser.add_argument('--output', help="куда записать JSON-отчет")
+    args = parser.parse_args(argv)
+
+    data = read_replay(args.replay)
+    result = run(data, args.fps)
+
+    frame = result['frame_ms']
+    print(f"{result['frames']} кадров за {result['wall_seconds']:.2f} с: "
+          f"кадр p50 {frame['p50']:.2f} мс, p99 {frame['p99']:.2f} мс, p99.9 {frame['p99.9']:.2f} мс, "
+          f"макс {frame['max']:.2f} мс")
+    print(f"Выстрелов {result['shots']}, попаданий {result['hits']}, счет {result['score']}")
+    if result['shoot_compute_ms']:
+        shoot_ms = result['shoot_compute_ms']
+        print(f"Расчет выстрела (shoot): p50 {shoot_ms['p50']:.3f} мс, p99 {shoot_ms['p99']:.3f} мс")
+    if result['shot_to_hit_ms']:
+        latency = result['shot_to_hit_ms']
+        print(f"Ввод кадра -> попадание: p50 {latency['p50']:.3f} мс, p99 {latency['p99']:.3f} мс")
+    for name, ms in sorted(result['sections_ms'].items(), key=lambda item: -item[1]):
+        print(f"  {name}: {ms:.3f} мс/кадр")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,228 @@
+from panda3d.core import BitMask32, BoundingVolume, CollisionNode, CollisionPolygon, PandaNode
+from panda3d.core import GeomVertexReader, Point3
+
+# Коллизии карты; бит 1 - манекены (hitscan.TARGET_MASK), бит 20 - видимая геометрия
+MAP_MASK = BitMask32.bit(2)
+
+# Вершины ближе этого (метры) считаются одной - так соседние треугольники делят ребра
+WELD_EPSILON = 1e-3
+# Треугольники меньше этой площади (м^2) на игрока-сферу радиусом 1 м не влияют
+MIN_TRIANGLE_AREA = 1e-4
+# Сколько полигонов в листе октодерева и насколько глубоко делить
+OCTREE_LEAF_SIZE = 8
+OCTREE_MAX_DEPTH = 6
+
+
+def extract_triangles(model):
+    """Все треугольники видимой геометрии модели в ее системе координат"""
+    triangles = []
+    for geom_np in model.findAllMatches('**/+GeomNode'):
+        mat = geom_np.getMat(model)
+        for geom in geom_np.node().getGeoms():
+            geom = geom.decompose()  # полосы и веера -> отдельные треугольники
+            reader = GeomVertexReader(geom.getVertexData(), 'vertex')
+            for prim in geom.getPrimitives():
+                for i in range(prim.getNumPrimitives()):
+                    start, end = prim.getPrimitiveStart(i), prim.getPrimitiveEnd(i)
+                    if end - start != 3:
+                        continue
+                    points = []
+                    for j in range(start, end):
+                        reader.setRow(prim.getVertex(j))
+                        points.append(mat.xformPoint(reader.getData3()))
+                    triangles.append(points)
+    return triangles
+
+
+def weld(triangles):
+    """Общий список вершин (близкие склеены) и треугольники как тройки индексов"""
+    points = []
+    index = {}
+    faces = []
+    seen = set()
+    for triangle in triangles:
+        face = []
+        for p in triangle:
+            key = tuple(int(round(c / WELD_EPSILON)) for c in p)
+            if key not in index:
+                index[key] = len(points)
+                points.append(Point3(p))
+            face.append(index[key])
+        # Вырожденные и повторяющиеся (в том числе двусторонние копии) отбрасываем
+        if len(set(face)) < 3 or triangle_area(points, face) < MIN_TRIANGLE_AREA:
+            continue
+        key = frozenset(face)
+        if key in seen:
+            continue
+        seen.add(key)
+        faces.append(face)
+    return points, faces
+
+
+def triangle_area(points, face):
+    a, b, c = (points[i] for i in face[:3])
+    return (b - a).cross(c - a).length() / 2
+
+
+def face_plane(points, face):
+    a, b, c = (points[i] for i in face[:3])
+    normal = (b - a).cross(c - a)
+    normal.normalize()
+    return normal, normal.dot(a)
+
+
+def is_convex(points, polygon, normal):
+    count = len(polygon)
+    for k in range(count):
+        a, b, c = (points[polygon[(k + n) % count]] for n in range(3))
+        if (b - a).cross(c - b).dot(normal) < -1e-6:
+            return False
+    return True
+
+
+def drop_collinear(points, polygon):
+    result = []
+    count = len(polygon)
+    for k in range(count):
+        a, b, c = points[polygon[k - 1]], points[polygon[k]], points[polygon[(k + 1) % count]]
+        if (b - a).cross(c - b).length() > 1e-6:
+            result.append(polygon[k])
+    return result
+
+
+def join(first, second, a, b):
+    """Склеивает два многоугольника по общему ребру a->b (в second оно b->a)"""
+    k = first.index(b)
+    first = first[k:] + first[:k]  # b ... a
+    k = second.index(a)
+    second = second[k:] + second[:k]  # a ... b
+    return first + second[1:-1]
+
+
+def merge_coplanar(points, faces):
+    """Соседние треугольники одной плоскости склеиваются в выпуклые четырехугольники.
+
+    CollisionPolygon принимает до четырех точек: прямоугольная стена или пол
+    становится одним полигоном вместо двух треугольников.
+    """
+    planes = {}
+    for face in faces:
+        normal, distance = face_plane(points, face)
+        key = (round(normal.x, 3), round(normal.y, 3), round(normal.z, 3), round(distance, 2))
+        planes.setdefault(key, (normal, []))[1].append(list(face))
+
+    polygons = []
+    for normal, group in planes.values():
+        merged = True
+        while merged:
+            merged = False
+            edges = {}
+            for i, polygon in enumerate(group):
+                for k in range(len(polygon)):
+                    edges[(polygon[k], polygon[(k + 1) % len(polygon)])] = i
+            for i, polygon in enumerate(group):
+                if len(polygon) >= 4:
+                    continue
+                for k in range(len(polygon)):
+                    a, b = polygon[k], polygon[(k + 1) % len(polygon)]
+                    j = edges.get((b, a))
+                    if j is None or j == i:
+                        continue
+                    combined = drop_collinear(points, join(polygon, group[j], a, b))
+                    if len(combined) <= 4 and len(set(combined)) == len(combined) and is_convex(points, combined, normal):
+                        group[i] = combined
+                        del group[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        polygons.extend(group)
+    return polygons
+
+
+class MapCollision:
+    """Упрощенная коллизия карты вместо копии видимой геометрии.
+
+    Треугольники модели склеиваются по вершинам, вырожденные и повторяющиеся
+    отбрасываются, а соседние в одной плоскости собираются в четырехугольники.
+    Полигоны раскладываются по октодереву: внутренние узлы - пустые PandaNode с
+    ограничивающим боксом, листья - CollisionNode по OCTREE_LEAF_SIZE полигонов.
+    Траверсер отсекает ветки по боксам, поэтому сфера игрока проверяется только
+    с полигонами ближайших ячеек. Видимая геометрия карты в коллизиях не участвует.
+    """
+
+    def __init__(self, model, leaf_size=OCTREE_LEAF_SIZE, max_depth=OCTREE_MAX_DEPTH):
+        self.leaf_size = leaf_size
+        self.max_depth = max_depth
+        self.leaves = []
+        self.depth = 0
+        self.debug = False
+
+        triangles = extract_triangles(model)
+        points, faces = weld(triangles)
+        polygons = [
+            [points[i] for i in polygon]
+            for polygon in merge_coplanar(points, faces)
+            if CollisionPolygon.verifyPoints(*(points[i] for i in polygon))
+        ]
+        self.stats = {'triangles': len(triangles), 'polygons': len(polygons)}
+
+        # Сама отрисовываемая геометрия лучи и сферы больше не ловит
+        model.setCollideMask(BitMask32.allOff())
+        self.root = model.attachNewNode(PandaNode('map_collision'))
+        self.root.node().setBoundsType(BoundingVolume.BT_box)
+        items = []
+        for polygon in polygons:
+            center = Point3(0, 0, 0)
+            for p in polygon:
+                center += p
+            items.append((polygon, center / len(polygon)))
+        self.build(self.root, items, 0)
+        self.stats['cells'] = len(self.leaves)
+        self.stats['depth'] = self.depth
+
+    def build(self, parent, items, depth):
+        self.depth = max(self.depth, depth)
+        if len(items) <= self.leaf_size or depth >= self.max_depth:
+            self.add_leaf(parent, items)
+            return
+
+        # Делим по середине центров полигонов, а не по середине куба: ячейки плотнее
+        mid = [sum(center[axis] for _, center in items) / len(items) for axis in range(3)]
+        octants = {}
+        for item in items:
+            center = item[1]
+            key = tuple(center[axis] > mid[axis] for axis in range(3))
+            octants.setdefault(key, []).append(item)
+        if len(octants) == 1:
+            # Все центры в одной точке - делить дальше бессмысленно
+            self.add_leaf(parent, items)
+            return
+        for key, cell_items in sorted(octants.items()):
+            cell = parent.attachNewNode(PandaNode('map_octant'))
+            cell.node().setBoundsType(BoundingVolume.BT_box)
+            self.build(cell, cell_items, depth + 1)
+
+    def add_leaf(self, parent, items):
+        node = CollisionNode('map_cell')
+        for polygon, _ in items:
+            node.addSolid(CollisionPolygon(*polygon))
+        node.setIntoCollideMask(MAP_MASK)
+        node.setFromCollideMask(BitMask32.allOff())
+        node.setBoundsType(BoundingVolume.BT_box)
+        self.leaves.append(parent.attachNewNode(node))
+
+    def toggle_debug(self):
+        """Показывает полигоны коллизии и боксы листьев октодерева"""
+        self.debug = not self.debug
+        for leaf in self.leaves:
+            if self.debug:
+                leaf.show()
+                leaf.showTightBounds()
+            else:
+                leaf.hide()
+                leaf.hideBounds()
+
+    def destroy(self):
+        self.root.removeNode()
+        self.leaves = []
@@ -11,7 +11,7 @@ class SnowEffect:
         self.active = False
         
         # Загружаем текстуру снежинки
-        self.snowflake_texture = self.base.loader.loadTexture("models/snowflake.png")
+        self.snowflake_texture = self.base.assets.load_texture("models/snowflake.png")
         self.snowflake_texture.setMagfilter(Texture.FTLinear)
         self.snowflake_texture.setMinfilter(Texture.FTLinearMipmapLinear)
         
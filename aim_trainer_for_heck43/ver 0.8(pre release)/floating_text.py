@@ -0,0 +1,86 @@
+from panda3d.core import TextNode
+import numpy as np
+
+# Сколько всплывающих текстов может быть на экране одновременно
+FLOATING_TEXT_CAPACITY = 16
+FLOATING_TEXT_LIFETIME = 0.5  # секунды от появления до исчезновения
+FLOATING_TEXT_RISE = 0.2  # на сколько текст поднимается за время жизни
+FLOATING_TEXT_SCALE = 0.07
+
+
+class FloatingTextPool:
+    """Всплывающие тексты (очки за попадание) из заранее созданных узлов.
+
+    TextNode'ы создаются один раз и прячутся; новый текст занимает свободный
+    слот, а если свободных нет - самый старый. Позицию и прозрачность всех
+    живых текстов двигает одна задача раз в кадр, без интервалов и
+    doMethodLater на каждое попадание.
+    """
+
+    def __init__(self, parent, capacity=FLOATING_TEXT_CAPACITY, lifetime=FLOATING_TEXT_LIFETIME):
+        self.capacity = capacity
+        self.lifetime = lifetime
+        self.root = parent.attachNewNode('floating_texts')
+        self.nodes = []
+        self.text_nodes = []
+        for i in range(capacity):
+            text_node = TextNode(f'floating_text_{i}')
+            text_node.setAlign(TextNode.ACenter)
+            node = self.root.attachNewNode(text_node)
+            node.setScale(FLOATING_TEXT_SCALE)
+            node.hide()
+            self.text_nodes.append(text_node)
+            self.nodes.append(node)
+
+        self.origin = np.zeros((capacity, 2), dtype=np.float32)  # (x, z) на экране
+        self.born = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.next = 0
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def spawn(self, text, x, z, color, now):
+        """Показывает text в точке (x, z) экрана; старейший текст уступает место, если пул полон"""
+        free = np.flatnonzero(~self.alive)
+        if len(free):
+            i = int(free[0])
+        else:
+            i = int(np.argmin(self.born))
+        self.text_nodes[i].setText(text)
+        node = self.nodes[i]
+        node.setColor(*color)
+        node.setPos(x, 0, z)
+        node.setAlphaScale(1)
+        node.show()
+        self.origin[i] = (x, z)
+        self.born[i] = now
+        self.alive[i] = True
+
+    def update(self, now):
+        live = np.flatnonzero(self.alive)
+        if not len(live):
+            return
+        age = now - self.born[live]
+        expired = age >= self.lifetime
+        progress = age / self.lifetime
+        for i, done, t in zip(live.tolist(), expired.tolist(), progress.tolist()):
+            node = self.nodes[i]
+            if done:
+                node.hide()
+                continue
+            x, z = self.origin[i].tolist()
+            node.setPos(x, 0, z + FLOATING_TEXT_RISE * t)
+            node.setAlphaScale(1 - t)
+        self.alive[live[expired]] = False
+
+    def clear(self):
+        for i in np.flatnonzero(self.alive).tolist():
+            self.nodes[i].hide()
+        self.alive[:] = False
+
+    def destroy(self):
+        self.root.removeNode()
+        self.nodes = []
+        self.text_nodes = []
+        self.alive[:] = False
@@ -0,0 +1,76 @@
+from panda3d.core import CollisionTraverser, CollisionNode, CollisionHandlerQueue, CollisionRay, BitMask32
+from collections import namedtuple
+
+# Маска частей манекенов (target_head, target_body, ...), см. target.py
+TARGET_MASK = BitMask32.bit(1)
+
+# При меньшем числе манекенов один обход их общего узла дешевле, чем отбор по сетке
+INDEX_MIN_TARGETS = 32
+
+# Дальше этой дистанции выстрел ни во что не попадает (как и след пули в main.py)
+MAX_DISTANCE = 1000
+
+# Результат выстрела: имя части тела, точка попадания в мировых координатах, дистанция
+Hit = namedtuple('Hit', ['part', 'pos', 'distance', 'entry'])
+
+
+class Hitscan:
+    """Луч выстрела проверяется только против манекенов.
+
+    Свой траверсер обходит лишь узел root, в котором лежат манекены, поэтому
+    карта, доп. модель и гильзы на каждом выстреле не трогаются. Если задан
+    index (TargetGrid), коллизии проверяются только у манекенов, чьи сферы
+    пересекает луч, от ближнего к дальнему.
+    """
+
+    def __init__(self, base, root, index=None):
+        self.base = base
+        self.root = root
+        self.index = index
+        self.traverser = CollisionTraverser('hitscan')
+        self.queue = CollisionHandlerQueue()
+
+        self.ray = CollisionRay()
+        ray_node = CollisionNode('hitscan_ray')
+        ray_node.addSolid(self.ray)
+        ray_node.setFromCollideMask(TARGET_MASK)
+        ray_node.setIntoCollideMask(BitMask32.allOff())
+        self.ray_np = base.camera.attachNewNode(ray_node)
+        self.traverser.addCollider(self.ray_np, self.queue)
+
+    def cast(self, x, y):
+        """Луч из камеры через точку экрана (x, y); возвращает ближайшее попадание или None"""
+        self.ray.setFromLens(self.base.camNode, x, y)
+        render = self.base.render
+        origin = render.getRelativePoint(self.ray_np, self.ray.getOrigin())
+        if self.index is None or len(self.index) < INDEX_MIN_TARGETS:
+            return self.nearest(self.root, origin)
+
+        direction = render.getRelativeVector(self.ray_np, self.ray.getDirection())
+        direction.normalize()
+        best = None
+        for cell_exit, candidates in self.index.query_ray(origin, direction, MAX_DISTANCE):
+            for distance, target in candidates:
+                if best is not None and best.distance <= distance:
+                    break  # остальные манекены ячейки дальше уже найденного попадания
+                hit = self.nearest(target.model, origin)
+                if hit is not None and (best is None or hit.distance < best.distance):
+                    best = hit
+            if best is not None and best.distance <= cell_exit:
+                break  # все, что ближе попадания, лежит в уже пройденных ячейках
+        return best
+
+    def nearest(self, root, origin):
+        """Ближайшая часть манекена под узлом root"""
+        self.traverser.traverse(root)
+        if self.queue.getNumEntries() == 0:
+            return None
+
+        self.queue.sortEntries()
+        for i in range(self.queue.getNumEntries()):
+            entry = self.queue.getEntry(i)
+            part = entry.getIntoNode().getName()
+            if part.startswith('target_'):
+                pos = entry.getSurfacePoint(self.base.render)
+                return Hit(part, pos, (pos - origin).length(), entry)
+        return None
@@ -0,0 +1,155 @@
+from panda3d.core import CardMaker, TextNode, TransparencyAttrib
+from direct.gui.OnscreenText import OnscreenText
+from collections import deque
+
+KILLFEED_VISIBLE = 5  # Сколько сообщений показывается одновременно
+KILLFEED_SLOTS = KILLFEED_VISIBLE + 1  # плюс одно, которое как раз исчезает
+KILLFEED_DURATION = 5.0  # Длительность показа сообщения в секундах
+KILLFEED_FADE_TIME = 0.3  # Время для fade in/out анимации
+KILLFEED_SLIDE_DISTANCE = 0.2  # Расстояние для slide анимации
+KILLFEED_X = 1.3
+KILLFEED_TOP = 0.9
+KILLFEED_LINE_HEIGHT = 0.06
+
+
+class Killfeed:
+    """Килфид из фиксированного числа слотов (кольцевой буфер).
+
+    Текст, фон и рамка каждого слота создаются один раз; сообщение занимает
+    свободный слот (или самый старый, если свободных нет) и возвращается в
+    пул, когда полностью исчезнет. Узлы трогаются только когда у слота
+    меняется прозрачность, сдвиг или строка, поэтому серия убийств не
+    увеличивает работу за кадр.
+    """
+
+    def __init__(self, parent, slots=KILLFEED_SLOTS, visible=KILLFEED_VISIBLE, duration=KILLFEED_DURATION):
+        self.visible = visible
+        self.duration = duration
+        self.slots = [self.create_slot(parent, i) for i in range(slots)]
+        self.order = deque()  # индексы занятых слотов, сверху вниз (самое старое первым)
+
+    def create_slot(self, parent, index):
+        root = parent.attachNewNode(f'killfeed_slot_{index}')
+        root.setTransparency(TransparencyAttrib.MAlpha)
+
+        message = OnscreenText(
+            text="",
+            fg=(0.3, 0.6, 1, 1),
+            shadow=(0, 0, 0, 1),
+            pos=(0, 0),
+            align=TextNode.ARight,
+            scale=0.04,
+            parent=root,
+            mayChange=True
+        )
+        message.setBin('gui-popup', 0)
+
+        # Фон; итоговая прозрачность = альфа слота * 0.3
+        cm = CardMaker('killfeed_bg')
+        cm.setFrame(-0.5, 0.05, -0.015, 0.025)  # Относительные координаты
+        bg = root.attachNewNode(cm.generate())
+        bg.setColor(0, 0, 0, 0.3)
+        bg.setBin('background', 10)
+
+        # Белые границы (альфа слота * 0.8)
+        border_thickness = 0.002
+        frames = (
+            ('border_top', (-0.5, 0.05, 0.025, 0.025 + border_thickness)),
+            ('border_bottom', (-0.5, 0.05, -0.015 - border_thickness, -0.015)),
+            ('border_left', (-0.5 - border_thickness, -0.5, -0.015, 0.025)),
+            ('border_right', (0.05, 0.05 + border_thickness, -0.015, 0.025)),
+        )
+        for name, frame in frames:
+            cm = CardMaker(name)
+            cm.setFrame(*frame)
+            border = root.attachNewNode(cm.generate())
+            border.setColor(1, 1, 1, 0.8)
+            border.setBin('background', 11)
+
+        root.setAlphaScale(0)
+        root.hide()
+        return {
+            'root': root,
+            'message': message,
+            'text': "",
+            'creation_time': 0.0,
+            'alpha': 0.0,
+            'target_alpha': 0.0,
+            'x_offset': 0.0,
+            'y_pos': None,
+        }
+
+    def push(self, text, now):
+        """Добавляет сообщение внизу килфида"""
+        free = [i for i in range(len(self.slots)) if i not in self.order]
+        if free:
+            index = free[0]
+        else:
+            # Все слоты заняты - самое старое сообщение пропадает сразу
+            index = self.order.popleft()
+        slot = self.slots[index]
+        if slot['text'] != text:
+            slot['message'].setText(text)
+            slot['text'] = text
+        slot['creation_time'] = now
+        slot['alpha'] = 0.0
+        slot['target_alpha'] = 1.0
+        slot['x_offset'] = KILLFEED_SLIDE_DISTANCE
+        slot['y_pos'] = None  # позиция выставится в update
+        slot['root'].setAlphaScale(0)
+        slot['root'].show()
+        self.order.append(index)
+
+        # Лишние сверху начинают исчезать
+        for i in list(self.order)[:-self.visible]:
+            self.slots[i]['target_alpha'] = 0.0
+
+    def update(self, now, dt):
+        fade_step = dt / KILLFEED_FADE_TIME
+        slide_step = KILLFEED_SLIDE_DISTANCE * fade_step
+        expired = []
+
+        for row, index in enumerate(self.order):
+            slot = self.slots[index]
+
+            # Запускаем исчезновение через duration секунд
+            if slot['target_alpha'] == 1 and now - slot['creation_time'] > self.duration:
+                slot['target_alpha'] = 0.0
+
+            if slot['alpha'] != slot['target_alpha']:
+                if slot['target_alpha'] > slot['alpha']:
+                    slot['alpha'] = min(slot['target_alpha'], slot['alpha'] + fade_step)
+                else:
+                    slot['alpha'] = max(slot['target_alpha'], slot['alpha'] - fade_step)
+                slot['root'].setAlphaScale(slot['alpha'])
+                if slot['alpha'] <= 0:
+                    expired.append(index)
+                    continue
+
+            moved = False
+            if slot['x_offset'] > 0:
+                slot['x_offset'] = max(0.0, slot['x_offset'] - slide_step)
+                moved = True
+            y_pos = KILLFEED_TOP - row * KILLFEED_LINE_HEIGHT
+            if slot['y_pos'] != y_pos:
+                slot['y_pos'] = y_pos
+                moved = True
+            if moved:
+                slot['root'].setPos(KILLFEED_X + slot['x_offset'], 0, y_pos)
+
+        # Исчезнувшие слоты возвращаются в пул
+        for index in expired:
+            self.slots[index]['root'].hide()
+            self.order.remove(index)
+
+    def clear(self):
+        for index in self.order:
+            self.slots[index]['root'].hide()
+        self.order.clear()
+
+    def destroy(self):
+        for slot in self.slots:
+            slot['message'].destroy()
+            slot['root'].removeNode()
+        self.slots = []
+        self.order.clear()
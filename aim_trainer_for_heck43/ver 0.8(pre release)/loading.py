@@ -0,0 +1,130 @@
+from panda3d.core import Filename, TexturePool, Thread
+from collections import deque
+import os
+import time
+
+LOADING_TASK_CHAIN = 'asset_loading'
+
+
+class LoadQueue:
+    """Фоновая загрузка ассетов во время экрана загрузки.
+
+    Модели и звуки грузит асинхронный загрузчик Panda3D (callback вызывается в
+    главном потоке), текстуры - отдельный поток task chain, который прогревает
+    TexturePool: потом обычный loader.loadTexture берет готовую текстуру из пула.
+    Задания ставятся в порядке добавления, поэтому критичные (без них нельзя
+    показать меню и начать матч) добавляются первыми, а некритичные (музыка,
+    декоративные модели) догружаются уже при открытом меню.
+
+    Прогресс считается по байтам файлов: progress() - доля загруженных байт
+    критичных заданий. С asynchronous=False (без окна, замеры) все грузится
+    сразу при добавлении, как раньше.
+    """
+
+    def __init__(self, base, assets, asynchronous=True):
+        self.base = base
+        self.assets = assets
+        self.asynchronous = asynchronous
+        self.root = os.path.dirname(os.path.abspath(__file__))
+        self.jobs = []  # {'path', 'kind', 'size', 'critical', 'done'}
+        self.current = None  # путь последнего завершенного задания (для статуса)
+        self.started = time.perf_counter()
+        self.critical_seconds = None
+        self.finished_seconds = None
+        self.textures = deque()  # (Texture, job, callback, extra_args) от потока загрузки
+
+        if asynchronous:
+            threads = 1 if Thread.isThreadingSupported() else 0
+            base.taskMgr.setupTaskChain(LOADING_TASK_CHAIN, numThreads=threads, threadPriority=0)
+            base.taskMgr.add(self.deliver_textures, 'load_queue_textures')
+
+    def file_size(self, path):
+        for candidate in (path, f"{path}.bam", f"{path}.egg"):
+            try:
+                return os.path.getsize(os.path.join(self.root, candidate))
+            except OSError:
+                continue
+        return 0
+
+    def add_job(self, kind, path, critical):
+        job = {'path': path, 'kind': kind, 'size': max(self.file_size(path), 1), 'critical': critical, 'done': False}
+        self.jobs.append(job)
+        return job
+
+    def model(self, path, callback, extra_args=(), critical=True):
+        """Модель (с подменой на запеченную); callback(NodePath или None, *extra_args)"""
+        path = self.assets.resolve(path)
+        job = self.add_job('model', path, critical)
+        if not self.asynchronous:
+            self.finish(self.base.loader.loadModel(path, okMissing=True), job, callback, extra_args)
+            return
+        self.base.loader.loadModel(path, okMissing=True, callback=self.finish, extraArgs=[job, callback, extra_args])
+
+    def sound(self, path, callback, extra_args=(), critical=True):
+        """Звук или музыка; callback(AudioSound, *extra_args)"""
+        job = self.add_job('sound', path, critical)
+        if not self.asynchronous:
+            self.finish(self.base.loader.loadSfx(path), job, callback, extra_args)
+            return
+        self.base.loader.loadSfx(path, callback=self.finish, extraArgs=[job, callback, extra_args])
+
+    def texture(self, path, callback=None, extra_args=(), critical=True):
+        """Текстура попадает в TexturePool; callback(Texture или None, *extra_args)"""
+        path = self.assets.resolve(path)
+        job = self.add_job('texture', path, critical)
+        if not self.asynchronous:
+            self.finish(TexturePool.loadTexture(Filename(path)), job, callback, extra_args)
+            return
+        self.base.taskMgr.add(self.load_texture_task, 'load_queue_texture', taskChain=LOADING_TASK_CHAIN,
+                              extraArgs=[job, callback, extra_args], appendTask=True)
+
+    def load_texture_task(self, job, callback, extra_args, task):
+        # Поток загрузки: только чтение файла, сцену не трогаем
+        self.textures.append((TexturePool.loadTexture(Filename(job['path'])), job, callback, extra_args))
+        return task.done
+
+    def deliver_textures(self, task):
+        while self.textures:
+            self.finish(*self.textures.popleft())
+        return task.cont
+
+    def finish(self, result, job, callback, extra_args):
+        job['done'] = True
+        self.current = job['path']
+        if not result:
+            print(f"Не удалось загрузить {job['path']}")
+        if callback is not None:
+            callback(result, *extra_args)
+
+        # Без окна все грузится сразу при добавлении, замерять нечего
+        if not self.asynchronous:
+            return
+        elapsed = time.perf_counter() - self.started
+        if self.critical_seconds is None and self.critical_ready:
+            self.critical_seconds = elapsed
+            print(f"Критичные ассеты загружены за {elapsed:.2f} с")
+        if self.finished_seconds is None and self.all_ready:
+            self.finished_seconds = elapsed
+            print(f"Все ассеты загружены за {elapsed:.2f} с")
+
+    @property
+    def critical_ready(self):
+        return all(job['done'] for job in self.jobs if job['critical'])
+
+    @property
+    def all_ready(self):
+        return all(job['done'] for job in self.jobs)
+
+    def progress(self, critical_only=True):
+        """Доля загруженных байт (0..1)"""
+        jobs = [job for job in self.jobs if job['critical'] or not critical_only]
+        total = sum(job['size'] for job in jobs)
+        if not total:
+            return 1.0
+        return sum(job['size'] for job in jobs if job['done']) / total
+
+    def status(self):
+        done = sum(job['done'] for job in self.jobs if job['critical'])
+        total = sum(job['critical'] for job in self.jobs)
+        name = os.path.basename(self.current) if self.current else "..."
+        return f"Loading {name} ({done}/{total})"
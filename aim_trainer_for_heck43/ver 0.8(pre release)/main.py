@@ -4,18 +4,30 @@ from panda3d.core import CollisionTraverser, CollisionNode, CollisionHandlerQueu
 from panda3d.core import CollisionRay, CollisionSphere, CollisionBox, BitMask32
 from panda3d.core import TextNode, TextureStage, Texture, TransparencyAttrib
 from panda3d.core import AmbientLight, DirectionalLight, LineSegs, ClockObject
-from panda3d.core import CardMaker
 from direct.gui.OnscreenText import OnscreenText
 from direct.gui.DirectGui import DirectFrame
 from direct.task import Task
 from direct.interval.IntervalGlobal import Sequence, Parallel, LerpColorScaleInterval, LerpColorInterval, LerpPosInterval, LerpHprInterval, Wait, Func
 from direct.filter.CommonFilters import CommonFilters
 from menu import MainMenu
-from target import Target
+from target import TargetPool
 from splash_screen import SplashScreen
+from audio import AudioManager
+from hitscan import Hitscan
+from spatial import TargetGrid
+from shells import ShellCasings
+from tracers import TracerBatch
+from floating_text import FloatingTextPool
+from killfeed import Killfeed
+from profiler import FrameProfiler
+from replay import InputRecorder
+from settings_store import SettingsStore
+from texture_catalog import TextureCatalog
+from asset_cache import AssetCache
+from loading import LoadQueue
+from collision_mesh import MapCollision
 import random
 import math
-import time
 import json
 import os
 from direct.actor.Actor import Actor
@@ -23,8 +35,13 @@ from math import sin, cos, pi, radians as deg2Rad
 import sys
 
 class Game(ShowBase):
-    def __init__(self):
+    def __init__(self, headless=False):
         ShowBase.__init__(self)
+        
+        # headless: без окна (window-type offscreen) - без заставки, меню и управления курсором
+        self.headless = headless
+        # Источник ввода матча (InputRecorder или InputReplay), None - живая мышь
+        self.input_source = None
 
         # Инициализация FPS
         self.fps = 0
@@ -33,19 +50,15 @@ class Game(ShowBase):
         self.cTrav = CollisionTraverser('traverser')
         self.cQueue = CollisionHandlerQueue()
         
+        # Запеченные ассеты (python bake_assets.py), если они свежее исходников
+        self.assets = AssetCache(self.loader)
+
+        # Ассеты грузятся в фоне, пока идет экран загрузки; меню ждет только критичные
+        self.loading = LoadQueue(self, self.assets, asynchronous=not headless)
+
         # Load the map
-        self.map_model = self.loader.loadModel("xz.egg")
-        self.map_model.reparentTo(self.render)
-        self.map_model.setPos(0, 0, 0)
-        self.map_model.setScale(1)
-        
-        # Setup map collisions
-        map_collision = CollisionNode('map_collision')
-        map_collision_np = NodePath(map_collision)
-        geom_node = self.map_model.find("**/+GeomNode")
-        if not geom_node.isEmpty():
-            geom_node.copyTo(map_collision_np)
-            map_collision_np.reparentTo(self.map_model)
+        self.map_model = None
+        self.loading.model("xz.egg", self.on_map_loaded)
         
         # Player collision setup
         self.player_collision = CollisionNode('player')
@@ -91,6 +104,10 @@ class Game(ShowBase):
             },
             'target_count': 10,  # Добавляем настройку количества манекенов
             'bullet_traces': True,  # Новая настройка для следов пуль
+            'tracer_capacity': 64,  # Сколько следов пуль видно одновременно
+            'texture_budget_mb': 256,  # Сколько памяти могут занимать картинки манекенов
+            'profiler_overlay': False,  # Оверлей профилировщика (F3), F4 - сохранить запись сессии
+            'profiler_dump_format': 'json',  # Формат записи сессии: json или csv
             'spread_enabled': True  # Новая настройка для разброса
         }
         
@@ -112,12 +129,13 @@ class Game(ShowBase):
         if self.settings.get('fullscreen', False):
             props.setFullscreen(True)
             
-        self.win.requestProperties(props)
+        self.request_window_properties(props)
 
         # Start with splash screen, then initialize menu
         self.menu = None
-        self.splash = SplashScreen(self)
-        self.splash.start()
+        if not headless:
+            self.splash = SplashScreen(self)
+            self.splash.start()
 
         # Игровая статистика
         self.score = 0
@@ -153,7 +171,7 @@ class Game(ShowBase):
         properties.setTitle("Aim Trainer")
         properties.setCursorHidden(True)
         properties.setMouseMode(WindowProperties.M_relative)
-        self.win.requestProperties(properties)
+        self.request_window_properties(properties)
         
         # Настраиваем FOV (поле зрения)
         self.camLens.setFov(self.settings['fov'])  # Увеличиваем FOV до значения из настроек
@@ -284,24 +302,22 @@ class Game(ShowBase):
         self.camera_pitch = 0
         self.camera_heading = 0
         
-        # Загружаем дополнительную модель
-        self.extra_model = self.loader.loadModel("model_textures/untitled.bam")
-        self.extra_model.reparentTo(self.render)
-        self.extra_model.setPos(8, 0, 0)  # Перемещаем дальше вправо от игрока
-        self.extra_model.setScale(2.0)  # Делаем модель ещё больше
-        
-        # Базовые настройки отображения
-        self.extra_model.clearShader()
-        self.extra_model.setColor(1, 1, 1, 1)
-        self.extra_model.setTwoSided(True)
-        
-        # Настраиваем материалы и освещение
-        #self.extra_model.setShaderAuto()  # Включаем автоматические шейдеры
+        # Дополнительная модель грузится в фоне после критичных ассетов (см. ниже)
+        self.extra_model = None
         
         #self.create_map()
 
-        # Создаем цель
+        # Создаем цель (все манекены живут под одним узлом - его и проверяет луч выстрела)
         self.targets = []
+        self.targets_root = self.render.attachNewNode("targets")
+        self.target_index = TargetGrid()
+        # Картинки манекенов: папка сканируется один раз, текстуры грузятся в фоне
+        self.texture_catalog = TextureCatalog(self, self.settings.get('texture_budget_mb', self.DEFAULT_SETTINGS['texture_budget_mb']))
+        if self.settings.get('show_target_images', True):
+            self.texture_catalog.prefetch(self.settings.get('nsfw_category', 'furry'))
+        # Пул манекенов: убитые прячутся и переиспользуются, а не создаются заново
+        self.target_pool = TargetPool(self)
+        self.target_pool_headroom = 5  # запас сверх target_count на одновременные респавны
         
         # Создаем прицел
         self.crosshair = OnscreenText(
@@ -311,41 +327,55 @@ class Game(ShowBase):
             pos=(0, 0),
             scale=.05)
 
-        # Загрузка звуков
-        self.shot_sound = self.loader.loadSfx("sounds/shot.wav")
-        self.hit_sound = self.loader.loadSfx("sounds/hit.wav")
-        # Настройка громкости
-        self.shot_sound.setVolume(0.5)
-        self.hit_sound.setVolume(0.7)
+        # Загрузка звуков: каждый файл декодируется один раз, дальше играется из пула голосов
+        self.audio = AudioManager(self, self.settings.get('volume', self.DEFAULT_SETTINGS['volume']) / 100)
+        self.loading.sound("sounds/hit.wav", self.on_sound_loaded, ["hit", "sounds/hit.wav", 0.7, 0.1])
+        for weapon_name, weapon in self.weapons.items():
+            self.loading.sound(weapon["sound"], self.on_sound_loaded,
+                               [weapon_name, weapon["sound"], 1.0, weapon["cooldown"]])
+        # Снежинки главного меню
+        self.loading.texture("models/snowflake.png")
+
+        # Некритичное догружается уже при открытом меню: декоративная модель и музыка
+        self.loading.model("model_textures/untitled.bam", self.on_extra_model_loaded, critical=False)
+        self.queue_music()
+        
+        # Настройки, которые применяются сразу при изменении (из меню или apply_settings)
+        for key in ('sensitivity', 'fov', 'show_score', 'show_timer', 'volume', 'nsfw_category', 'show_target_images'):
+            self.settings.subscribe(key, self.on_setting_changed)
         
         # Настройка информационных текстов
         self.fps_text = self.create_text(-1.3, 0.95)
         self.pos_text = self.create_text(-1.3, 0.85)
         self.speed_text = self.create_text(-1.3, 0.75)
+        self.pool_text = self.create_text(-1.3, 0.65)
+        self.tracer_text = self.create_text(-1.3, 0.55)
+        
+        # Профилировщик: время кадра, lows и время отдельных задач
+        self.profiler = FrameProfiler(self, self.settings.get('profiler_overlay', self.DEFAULT_SETTINGS['profiler_overlay']))
+        self.accept("f3", self.profiler.toggle)
+        self.accept("f4", self.dump_profile)
         
         # Список для хранения всех визуальных эффектов
         self.shot_effects = []  # Каждый элемент это кортеж (line_node, marker_node, task)
         
-        # Список для хранения текста урона
-        self.damage_texts = []  # Каждый элемент это кортеж (text_node, start_time, start_pos)
+        # Всплывающие очки за попадание: заранее созданные текстовые узлы на aspect2d
+        self.damage_texts = FloatingTextPool(self.aspect2d)
         
         # Список для хранения 2D маркеров попадания
         self.hit_markers = []  # Каждый элемент это NodePath
         
-        # Инициализация килфида
-        self.killfeed_messages = []
-        self.killfeed_fade_time = 0.3  # Время для fade in/out анимации
-        self.killfeed_slide_distance = 0.2  # Расстояние для slide анимации
-        self.killfeed_duration = 5  # Длительность показа сообщения в секундах
-        
-        # Список для хранения активных гильз
-        self.active_shells = []
+        # Килфид: фиксированные слоты, узлы создаются один раз
+        self.killfeed = Killfeed(self.aspect2d)
         
         # Загружаем модель гильзы
         self.shell_model = self.loader.loadModel("models/box")  # Временно используем box как гильзу
         self.shell_model.setScale(0.02, 0.05, 0.02)  # Масштаб для гильзы
         self.shell_model.setColor(0.8, 0.6, 0.2)  # Цвет латуни
         
+        # Гильзы: кольцевой буфер заранее созданных узлов, рисуются одним батчем
+        self.shells = ShellCasings(self, self.shell_model)
+        
         # Настройка управления
         self.accept("escape", self.return_to_menu)
         self.accept("space", self.start_jump)
@@ -382,20 +412,19 @@ class Game(ShowBase):
         self.frame_count = 0
         self.fps_update_time = 0
         
+        # Порядок задач кадра задан явно (sort): таймеры doMethodLater (sort 0) ->
+        # update_time_scale -> update -> гильзы -> тексты -> трассеры. При равном sort
+        # порядок между задачами не определен, и запись матча воспроизводилась бы по-разному
+        
         # Добавляем задачу обновления текста урона
-        self.taskMgr.add(self.update_damage_texts, "update_damage_texts")
+        self.taskMgr.add(self.profiler.wrap("update_damage_texts", self.update_damage_texts), "update_damage_texts", sort=4)
         
         # Добавляем задачу обновления гильз
-        self.taskMgr.add(self.update_shells, "update_shells")
+        self.taskMgr.add(self.profiler.wrap("update_shells", self.update_shells), "update_shells", sort=3)
         
-        # Create the collision ray
-        self.ray = CollisionRay()
-        rayNode = CollisionNode('mouseRay')
-        rayNode.addSolid(self.ray)
-        rayNode.setFromCollideMask(BitMask32.bit(1))
-        rayNode.setIntoCollideMask(BitMask32.allOff())
-        self.rayNodePath = self.camera.attachNewNode(rayNode)
-        self.cTrav.addCollider(self.rayNodePath, self.cQueue)
+        # Луч выстрела: отдельный траверсер только по манекенам, а не по всей сцене;
+        # сетка отбирает манекены под лучом до проверки коллизий
+        self.hitscan = Hitscan(self, self.targets_root, self.target_index)
         
         # Настройка выхода из игры
         self.accept("window-event", self.cleanup)
@@ -410,7 +439,7 @@ class Game(ShowBase):
         self.is_in_slow_motion = False
         
         # Добавляем задачу обновления масштаба времени
-        taskMgr.add(self.update_time_scale, 'update_time_scale')
+        taskMgr.add(self.profiler.wrap("update_time_scale", self.update_time_scale), 'update_time_scale', sort=1)
         
         # Устанавливаем начальную скорость времени
         globalClock.setMode(ClockObject.MLimited)
@@ -419,16 +448,12 @@ class Game(ShowBase):
         # Добавляем обработчик обновления позиции оружия
         self.accept('update_weapon_position', self.update_weapon_position)
 
-        # Initialize audio
-        self.music = None
-        self.current_music_path = None
-
         # Добавляем переменную для отслеживания зажатия кнопки
         self.mouse_pressed = False
         
-        # Создаем родительский узел для трассеров пуль
-        self.bullet_traces = self.render.attachNewNode("bullet_traces")
-        self.traces = []  # Список активных трассеров
+        # Все следы пуль - один меш с динамическим буфером на последние N выстрелов
+        self.tracers = TracerBatch(self.render, self.settings.get('tracer_capacity', self.DEFAULT_SETTINGS['tracer_capacity']))
+        self.taskMgr.add(self.profiler.wrap("update_tracers", self.update_tracers), "update_tracers", sort=5)
         
         # В __init__ добавляем новые переменные
         self.is_aiming = False
@@ -465,11 +490,71 @@ class Game(ShowBase):
         self.weapon_animation = None
         self.is_drawing_weapon = False
 
-        self.is_splash_screen_active = True  # Add this flag
+        self.is_splash_screen_active = not headless  # Add this flag
 
         # Добавляем переменную для отслеживания активного револьвера
         self.active_revolver = "left"  # Начинаем с левого револьвера
 
+    def on_map_loaded(self, model):
+        self.map_model = model
+        self.map_model.reparentTo(self.render)
+        self.map_model.setPos(0, 0, 0)
+        self.map_model.setScale(1)
+        
+        # Setup map collisions: упрощенный меш в октодереве вместо копии видимой геометрии
+        self.map_collision = MapCollision(self.map_model)
+        self.accept("f5", self.map_collision.toggle_debug)
+
+    def on_extra_model_loaded(self, model):
+        if model is None:
+            return
+        self.extra_model = model
+        self.extra_model.reparentTo(self.render)
+        self.extra_model.setPos(8, 0, 0)  # Перемещаем дальше вправо от игрока
+        self.extra_model.setScale(2.0)  # Делаем модель ещё больше
+        
+        # Базовые настройки отображения
+        self.extra_model.clearShader()
+        self.extra_model.setColor(1, 1, 1, 1)
+        self.extra_model.setTwoSided(True)
+        
+        # Настраиваем материалы и освещение
+        #self.extra_model.setShaderAuto()  # Включаем автоматические шейдеры
+
+    def on_sound_loaded(self, sound, name, path, volume, min_interval):
+        # Первый голос уже загружен в фоне, остальные копии берутся из кэша
+        self.audio.load(name, path, volume=volume, min_interval=min_interval, sound=sound)
+
+    def on_track_loaded(self, sound, path):
+        self.audio.add_track(path, sound)
+
+    def queue_music(self):
+        """Ставит треки в фоновую загрузку: сначала выбранный, потом остальные"""
+        current = self.settings.get('audio', self.DEFAULT_SETTINGS['audio'])['current_track']
+        try:
+            tracks = sorted(name for name in os.listdir("music") if name.endswith('.mp3'))
+        except OSError:
+            tracks = []
+        if current in tracks:
+            tracks.remove(current)
+            tracks.insert(0, current)
+        for track in tracks:
+            path = f"music/{track}"
+            self.loading.sound(path, self.on_track_loaded, [path], critical=False)
+
+    def request_window_properties(self, props):
+        """Применяет свойства окна (у offscreen-буфера окна нет)"""
+        if not self.headless:
+            self.win.requestProperties(props)
+
+    def read_pointer(self):
+        """Позиция мыши в окне (от -1 до 1) или None; при записи и воспроизведении - из input_source"""
+        if self.input_source is not None and self.input_source.active:
+            return self.input_source.pointer
+        if self.mouseWatcherNode is not None and self.mouseWatcherNode.hasMouse():
+            return self.mouseWatcherNode.getMouseX(), self.mouseWatcherNode.getMouseY()
+        return None
+
     def create_text(self, x, y):
         return OnscreenText(
             text="",
@@ -550,14 +635,17 @@ class Game(ShowBase):
 
     def setup_targets(self):
         """Создание манекенов"""
-        # Очищаем существующие манекены
+        # Возвращаем существующие манекены в пул
         for target in self.targets:
-            target.cleanup()
+            self.target_pool.release(target)
         self.targets.clear()
 
         # Получаем количество манекенов из настроек (по умолчанию 10)
         target_count = self.settings.get('target_count', 10)
         
+        # Заранее строим все манекены раунда с запасом, чтобы во время стрельбы не создавать новые
+        self.target_pool.prebuild(target_count + self.target_pool_headroom)
+        
         # Параметры зоны спавна
         min_distance = 15  # Минимальная дистанция от игрока
         max_distance = 35  # Максимальная дистанция от игрока
@@ -570,8 +658,8 @@ class Game(ShowBase):
             y = random.uniform(min_distance, max_distance)
             z = 1  # Высота манекена над землей
             
-            # Создаем манекен на случайной позиции
-            target = Target(self, Point3(x, y, z))
+            # Берем манекен из пула и ставим на случайную позицию
+            target = self.target_pool.acquire(Point3(x, y, z))
             self.targets.append(target)
 
     def setup_weapon(self):
@@ -818,7 +906,7 @@ class Game(ShowBase):
         
         if not self.is_jumping:
             # Увеличиваем множитель комбо при последовательных прыжках только если распрыжка включена
-            current_time = time.time()
+            current_time = globalClock.getFrameTime()
             
             if self.settings.get('bhop_enabled', True):  # Проверяем, включена ли распрыжка
                 if current_time - self.last_jump_time < self.jump_combo_time:
@@ -887,8 +975,7 @@ class Game(ShowBase):
             active_revolver = self.weapon_models["dual_revolvers"].find(f"{self.active_revolver}_revolver")
             
             # Воспроизводим звук выстрела
-            self.shot_sound = self.loader.loadSfx(self.weapons[self.current_weapon]["sound"])
-            self.shot_sound.play()
+            self.audio.play(self.current_weapon)
             
             # Создаем анимацию отдачи только для активного револьвера
             if self.active_revolver == "left":
@@ -948,8 +1035,7 @@ class Game(ShowBase):
             
         else:
             # Оригинальная логика для других оружий
-            self.shot_sound = self.loader.loadSfx(self.weapons[self.current_weapon]["sound"])
-            self.shot_sound.play()
+            self.audio.play(self.current_weapon)
             
             # Создаем анимацию выброса гильзы
             self.create_shell_casing()
@@ -967,11 +1053,12 @@ class Game(ShowBase):
         # Получаем параметры текущего оружия
         weapon_params = self.weapons[self.current_weapon]
         
-        if not self.mouseWatcherNode.hasMouse():
+        pointer = self.read_pointer()
+        if pointer is None:
             return
             
         # Получаем позицию мыши
-        mouse_pos = self.mouseWatcherNode.getMouse()
+        mouse_pos = Point2(*pointer)
         
         # Применяем разброс только если он включен в настройках
         if self.settings.get('spread_enabled', True):
@@ -1019,9 +1106,6 @@ class Game(ShowBase):
             # Если разброс выключен, используем точную позицию мыши
             spread_mouse_pos = mouse_pos
         
-        # Создаем луч от камеры
-        self.ray.setFromLens(self.camNode, spread_mouse_pos.getX(), spread_mouse_pos.getY())
-        
         # Применяем отдачу только если она включена в настройках
         if self.settings.get('recoil_enabled', True):
             # Применяем отдачу к камере с параметрами текущего оружия
@@ -1048,8 +1132,8 @@ class Game(ShowBase):
         # Обновляем время последнего выстрела
         self.last_shot_time = globalClock.getFrameTime()
         
-        # Проверяем коллизии
-        self.cTrav.traverse(self.render)
+        # Проверяем попадание лучом из камеры (с учетом разброса)
+        hit = self.hitscan.cast(spread_mouse_pos.getX(), spread_mouse_pos.getY())
         
         # Получаем начальную позицию пули (позиция оружия)
         if self.current_weapon == "dual_revolvers":
@@ -1098,58 +1182,12 @@ class Game(ShowBase):
         
         # Создаем след пули если включено в настройках
         if self.settings.get('bullet_traces', True):
-            if self.cQueue.getNumEntries() > 0:
-                # Если попали в цель, используем точку попадания
-                self.cQueue.sortEntries()
-                entry = self.cQueue.getEntry(0)
-                hit_pos = entry.getSurfacePoint(self.render)
-                
-                # Создаем след пули из правильной позиции
-                if self.current_weapon == "dual_revolvers":
-                    # Для револьверов используем позицию активного револьвера
-                    if self.active_revolver == "left":
-                        local_pos = Point3(-2.0, 0.6, -0.2)
-                    else:
-                        local_pos = Point3(0.4, 0.6, -0.2)
-                else:
-                    # Для других оружий используем их специфические позиции
-                    if self.current_weapon == "rifle":
-                        local_pos = Point3(0.2, 0.6, -0.2)
-                    elif self.current_weapon == "pistol":
-                        local_pos = Point3(0.15, 0.6, -0.2)
-                    elif self.current_weapon == "sniper":
-                        local_pos = Point3(0.25, 0.6, -0.2)
-                    else:
-                        local_pos = Point3(0, 0.6, -0.2)
-                
-                # Преобразуем локальные координаты в мировые относительно камеры
-                start_pos = self.camera.getPos() + self.camera.getMat().xformVec(local_pos)
-                self.create_bullet_trace(start_pos, hit_pos)
-                
-                # Обработка попадания в цель
-                self.handle_collision(entry)
-            else:
-                # Если не попали, используем конечную точку луча
-                if self.current_weapon == "dual_revolvers":
-                    # Для револьверов используем позицию активного револьвера
-                    if self.active_revolver == "left":
-                        local_pos = Point3(-2.0, 0.6, -0.2)
-                    else:
-                        local_pos = Point3(0.4, 0.6, -0.2)
-                else:
-                    # Для других оружий используем их специфические позиции
-                    if self.current_weapon == "rifle":
-                        local_pos = Point3(0.2, 0.6, -0.2)
-                    elif self.current_weapon == "pistol":
-                        local_pos = Point3(0.15, 0.6, -0.2)
-                    elif self.current_weapon == "sniper":
-                        local_pos = Point3(0.25, 0.6, -0.2)
-                    else:
-                        local_pos = Point3(0, 0.6, -0.2)
-                
-                # Преобразуем локальные координаты в мировые относительно камеры
-                start_pos = self.camera.getPos() + self.camera.getMat().xformVec(local_pos)
-                self.create_bullet_trace(start_pos, end_pos)
+            # Если попали в цель, след заканчивается в точке попадания
+            self.create_bullet_trace(weapon_pos, hit.pos if hit else end_pos)
+
+        # Обработка попадания в цель
+        if hit:
+            self.handle_collision(hit.entry)
         
     def remove_specific_effect(self, effect_index, task):
         if 0 <= effect_index < len(self.shot_effects):
@@ -1161,57 +1199,21 @@ class Game(ShowBase):
 
     def create_bullet_trace(self, start_pos, end_pos):
         """Создает след пули от точки start_pos до end_pos"""
-        ls = LineSegs()
-        ls.setColor(1.0, 1.0, 0.8, 0.5)  # Желтоватый цвет с прозрачностью
-        ls.setThickness(2.0)
-        ls.moveTo(start_pos)
-        
-        # Если есть попадание, рисуем до точки попадания
-        if end_pos is not None:
-            ls.drawTo(end_pos)
-        else:
-            # Если нет попадания, рисуем до конечной точки
-            ls.drawTo(end_pos)
-        
-        # Создаем узел из линии
-        trace = self.bullet_traces.attachNewNode(ls.create())
-        
-        # Добавляем эффект прозрачности
-        trace.setTransparency(TransparencyAttrib.MAlpha)
-        
-        # Запускаем анимацию исчезновения следа
-        Sequence(
-            Wait(0.1),  # Ждем 0.1 секунды
-            LerpColorScaleInterval(trace, 0.2, Vec4(1, 1, 1, 0)),  # Плавно делаем прозрачным
-            Func(trace.removeNode)  # Удаляем след
-        ).start()
-        
-    def remove_trace(self, trace_np, task):
-        """Удаляет след пули после того как он исчез"""
-        # Удаляем след из списка активных
-        self.traces = [(np, fade) for np, fade in self.traces if np != trace_np]
-        # Удаляем узел
-        trace_np.removeNode()
-        return Task.done
+        # След занимает слот самого старого; исчезает через 0.1 + 0.2 секунды
+        self.tracers.add(start_pos, end_pos, globalClock.getFrameTime())
+
+    def update_tracers(self, task):
+        """Обновляет прозрачность всех следов пуль одной записью в буфер"""
+        self.tracers.update(globalClock.getFrameTime())
+        return task.cont
+
+    def dump_profile(self):
+        """Сохраняет запись профилировщика за сессию в profiles/"""
+        self.profiler.dump_session(self.settings.get('profiler_dump_format', self.DEFAULT_SETTINGS['profiler_dump_format']))
 
     def update_damage_texts(self, task):
-        current_time = globalClock.getFrameTime()
-        
-        # Обновляем каждый текст
-        for i in range(len(self.damage_texts) - 1, -1, -1):
-            text_node, start_time, start_pos = self.damage_texts[i]
-            age = current_time - start_time
-            
-            if age > 1.0:  # Текст живет 1 секунду
-                text_node.removeNode()
-                self.damage_texts.pop(i)
-            else:
-                # Поднимаем текст вверх и делаем его прозрачным
-                alpha = 1.0 - age
-                z_offset = age * 2  # Поднимаем на 2 единицы за секунду
-                text_node.setPos(start_pos + Point3(0, 0, z_offset))
-                text_node.setAlphaScale(alpha)
-        
+        """Двигает и гасит все всплывающие тексты урона"""
+        self.damage_texts.update(globalClock.getFrameTime())
         return task.cont
 
     def cleanup(self, window=None):
@@ -1226,8 +1228,6 @@ class Game(ShowBase):
         self.shot_effects.clear()
         
         # Очищаем все тексты урона
-        for text_node, _, _ in self.damage_texts:
-            text_node.removeNode()
         self.damage_texts.clear()
 
     def return_to_menu(self):
@@ -1245,11 +1245,17 @@ class Game(ShowBase):
         self.taskMgr.remove("update")
         self.ignore("mouse1")
         
+        # Сохраняем запись матча
+        if self.input_source is not None:
+            self.input_source.stop()
+        
         # Очищаем старые цели
         if hasattr(self, 'targets'):
             for target in self.targets:
-                target.destroy()
+                self.target_pool.release(target)
             self.targets.clear()
+        stats = self.target_pool.stats()
+        print(f"Target pool: {stats['hits']} hits, {stats['misses']} misses, {stats['created']} created")
         
         # Очищаем оружие если оно есть
         if hasattr(self, 'weapon'):
@@ -1271,11 +1277,15 @@ class Game(ShowBase):
         # Настраиваем окно для игры
         props = WindowProperties()
         props.setCursorHidden(True)
-        self.win.requestProperties(props)
+        self.request_window_properties(props)
+        
+        # Запись/воспроизведение ввода начинается с матча (до случайной расстановки манекенов)
+        if self.input_source is not None:
+            self.input_source.start()
         
-        # Очищаем старые цели если они есть
+        # Возвращаем старые цели в пул если они есть
         for target in self.targets:
-            target.destroy()
+            self.target_pool.release(target)
         self.targets.clear()
         
         # Включаем игровые компоненты
@@ -1283,13 +1293,13 @@ class Game(ShowBase):
         self.setup_weapon()
         
         # Включаем управление
-        self.taskMgr.add(self.update, "update")
+        self.taskMgr.add(self.profiler.wrap("update", self.update), "update", sort=2)
         self.accept("mouse1", self.on_mouse_press)
         self.accept("mouse1-up", self.on_mouse_release)
         
         # Сбрасываем и показываем счет и таймер
         self.score = 0
-        self.start_time = time.time()
+        self.start_time = globalClock.getFrameTime()
         self.update_score_display()
         self.update_timer_display()
         
@@ -1313,7 +1323,7 @@ class Game(ShowBase):
     def update_timer_task(self, task):
         if not self.show_timer:
             return task.done
-        self.game_time = time.time() - self.start_time
+        self.game_time = globalClock.getFrameTime() - self.start_time
         self.update_timer_display()
         return task.cont
     
@@ -1339,10 +1349,10 @@ class Game(ShowBase):
         self.activate_hit_effects()
         
         # Воспроизводим звук попадания
-        self.hit_sound.play()
+        self.audio.play("hit")
         
         # Обновляем комбо
-        current_time = time.time()
+        current_time = globalClock.getFrameTime()
         if current_time - self.last_hit_time < self.combo_window:
             self.combo_multiplier = min(2.0, self.combo_multiplier + 0.2)  # Максимум x2
         else:
@@ -1366,8 +1376,14 @@ class Game(ShowBase):
         if self.settings.get('damage_numbers', True):
             self.spawn_damage_text(f"+{points}", hit_pos)
         
-        # Удаляем старый манекен
-        target.removeNode()
+        # Прячем старый манекен обратно в пул (он же уходит из сетки выстрелов)
+        target_object = target.getPythonTag('target')
+        if target_object is not None:
+            self.target_pool.release(target_object)
+            if target_object in self.targets:
+                self.targets.remove(target_object)
+        else:
+            target.removeNode()
         
         # Создаем новый манекен через случайное время
         delay = random.uniform(0.5, 2.0)
@@ -1395,64 +1411,28 @@ class Game(ShowBase):
         return int(base_damage * multiplier)
 
     def spawn_damage_text(self, text, pos):
-        # Создаем текст с уроном
-        damage_text = TextNode('damage')
-        damage_text.setText(text)
-        damage_text.setAlign(TextNode.ACenter)
-        
-        # Создаем узел для текста и прикрепляем к aspect2d (2D слой)
-        text_node_path = self.aspect2d.attachNewNode(damage_text)
-        
         # Генерируем случайное смещение от центра
         offset_x = random.uniform(-0.15, 0.15)
         offset_y = random.uniform(-0.15, 0.15)
         
-        # Располагаем текст со случайным смещением от центра
-        text_node_path.setPos(offset_x, 0, offset_y)
-        
-        # Устанавливаем размер текста
-        text_node_path.setScale(0.07)
-        
         # Устанавливаем цвет в зависимости от урона
         if int(text) >= 100:  # Хедшот
-            text_node_path.setColor(1, 0, 0, 1)  # Красный
+            color = (1, 0, 0, 1)  # Красный
         elif int(text) >= 60:  # Высокий урон
-            text_node_path.setColor(1, 0.5, 0, 1)  # Оранжевый
+            color = (1, 0.5, 0, 1)  # Оранжевый
         else:  # Обычный урон
-            text_node_path.setColor(1, 1, 1, 1)  # Белый
-        
-        # Создаем анимацию движения вверх и исчезновения
-        fade_interval = LerpColorScaleInterval(
-            text_node_path,
-            0.5,  # Длительность
-            Vec4(1, 1, 1, 0),  # Конечное значение (прозрачный)
-            Vec4(1, 1, 1, 1)   # Начальное значение (непрозрачный)
-        )
+            color = (1, 1, 1, 1)  # Белый
         
-        # Конечная позиция будет немного выше начальной, сохраняя случайное X-смещение
-        pos_interval = text_node_path.posInterval(
-            0.5,  # Длительность
-            Point3(offset_x, 0, offset_y + 0.2),  # Конечная позиция
-            Point3(offset_x, 0, offset_y)         # Начальная позиция
-        )
-        
-        # Запускаем обе анимации одновременно
-        Parallel(fade_interval, pos_interval).start()
-        
-        # Удаляем текст через 0.5 секунды
-        self.taskMgr.doMethodLater(
-            0.5,
-            lambda task: text_node_path.removeNode(),
-            'remove_damage_text'
-        )
+        # Текст берется из пула; подъем и исчезновение считает update_damage_texts
+        self.damage_texts.spawn(text, offset_x, offset_y, color, globalClock.getFrameTime())
 
     def spawn_target(self, task):
         # Генерируем случайную позицию для нового манекена
         x = random.uniform(-10, 10)
         y = random.uniform(20, 30)
         
-        # Создаем новый манекен
-        target = Target(self, Point3(x, y, 1))
+        # Берем манекен из пула (новый создается, только если пул пуст)
+        target = self.target_pool.acquire(Point3(x, y, 1))
         self.targets.append(target)
         
         return task.done
@@ -1478,11 +1458,11 @@ class Game(ShowBase):
         self.activate_hit_effects()
         
         # Существующая логика обработки попадания
-        self.hit_sound.play()
+        self.audio.play("hit")
         self.score += 10 * self.combo_multiplier
         
         # Обновляем комбо
-        current_time = time.time()
+        current_time = globalClock.getFrameTime()
         if current_time - self.last_hit_time < self.combo_window:
             self.combo_multiplier += 0.5
         else:
@@ -1507,147 +1487,11 @@ class Game(ShowBase):
 
     def create_killfeed_message(self, target_name="Target"):
         """Создает новое сообщение в килфиде"""
-        y_pos = 0.9 - len(self.killfeed_messages) * 0.06
-        x_pos = 1.3 + self.killfeed_slide_distance  # Начальная позиция справа
-        
-        # Создаем текст сообщения с начальной прозрачностью 0
-        message = OnscreenText(
-            text=f"You killed {target_name}",
-            fg=(0.3, 0.6, 1, 0),
-            shadow=(0, 0, 0, 0),
-            pos=(x_pos, y_pos),
-            align=TextNode.ARight,
-            scale=0.04
-        )
-        message.setBin('gui-popup', 0)
-
-        # Создаем узел для группировки фона и границ
-        frame_root = aspect2d.attachNewNode("frame_root")
-        frame_root.setPos(x_pos, 0, y_pos)  # Устанавливаем начальную позицию
-        
-        # Создаем фон для сообщения с начальной прозрачностью 0
-        cm = CardMaker('killfeed_bg')
-        cm.setFrame(-0.5, 0.05, -0.015, 0.025)  # Относительные координаты
-        bg = frame_root.attachNewNode(cm.generate())
-        bg.setTransparency(TransparencyAttrib.MAlpha)
-        bg.setColor(0, 0, 0, 0)
-        bg.setBin('background', 10)
-        
-        # Создаем белые границы с начальной прозрачностью 0
-        border_thickness = 0.002
-        borders = []
-        
-        # Верхняя граница
-        cm_top = CardMaker('border_top')
-        cm_top.setFrame(-0.5, 0.05, 0.025, 0.025 + border_thickness)
-        border_top = frame_root.attachNewNode(cm_top.generate())
-        border_top.setColor(1, 1, 1, 0)
-        border_top.setTransparency(TransparencyAttrib.MAlpha)
-        border_top.setBin('background', 11)
-        borders.append(border_top)
-        
-        # Нижняя граница
-        cm_bottom = CardMaker('border_bottom')
-        cm_bottom.setFrame(-0.5, 0.05, -0.015 - border_thickness, -0.015)
-        border_bottom = frame_root.attachNewNode(cm_bottom.generate())
-        border_bottom.setColor(1, 1, 1, 0)
-        border_bottom.setTransparency(TransparencyAttrib.MAlpha)
-        border_bottom.setBin('background', 11)
-        borders.append(border_bottom)
-        
-        # Левая граница
-        cm_left = CardMaker('border_left')
-        cm_left.setFrame(-0.5 - border_thickness, -0.5, -0.015, 0.025)
-        border_left = frame_root.attachNewNode(cm_left.generate())
-        border_left.setColor(1, 1, 1, 0)
-        border_left.setTransparency(TransparencyAttrib.MAlpha)
-        border_left.setBin('background', 11)
-        borders.append(border_left)
-        
-        # Правая граница
-        cm_right = CardMaker('border_right')
-        cm_right.setFrame(0.05, 0.05 + border_thickness, -0.015, 0.025)
-        border_right = frame_root.attachNewNode(cm_right.generate())
-        border_right.setColor(1, 1, 1, 0)
-        border_right.setTransparency(TransparencyAttrib.MAlpha)
-        border_right.setBin('background', 11)
-        borders.append(border_right)
-        
-        # Добавляем сообщение в список с временем создания
-        self.killfeed_messages.append({
-            'message': message,
-            'frame_root': frame_root,
-            'background': bg,
-            'borders': borders,
-            'creation_time': globalClock.getFrameTime(),
-            'y_pos': y_pos,
-            'x_pos': x_pos,
-            'alpha': 0,
-            'target_alpha': 1,
-            'x_offset': self.killfeed_slide_distance
-        })
-        
-        # Удаляем старые сообщения, если их больше 5
-        if len(self.killfeed_messages) > 5:
-            oldest = self.killfeed_messages[0]
-            oldest['target_alpha'] = 0
+        self.killfeed.push(f"You killed {target_name}", globalClock.getFrameTime())
 
     def update_killfeed_positions(self):
         """Обновляет позиции всех сообщений в килфиде"""
-        current_time = globalClock.getFrameTime()
-        messages_to_remove = []
-        
-        for i, msg_data in enumerate(self.killfeed_messages):
-            # Вычисляем время жизни сообщения
-            age = current_time - msg_data['creation_time']
-            
-            # Обновляем альфа и позицию X
-            if msg_data['alpha'] != msg_data['target_alpha']:
-                # Плавное изменение прозрачности
-                alpha_change = globalClock.getDt() / self.killfeed_fade_time
-                if msg_data['target_alpha'] > msg_data['alpha']:
-                    msg_data['alpha'] = min(msg_data['target_alpha'], msg_data['alpha'] + alpha_change)
-                else:
-                    msg_data['alpha'] = max(msg_data['target_alpha'], msg_data['alpha'] - alpha_change)
-                
-                # Обновляем прозрачность всех элементов
-                msg_data['message'].setFg((0.3, 0.6, 1, msg_data['alpha']))
-                msg_data['message'].setShadow((0, 0, 0, msg_data['alpha']))
-                msg_data['background'].setColor(0, 0, 0, msg_data['alpha'] * 0.3)
-                for border in msg_data['borders']:
-                    border.setColor(1, 1, 1, msg_data['alpha'] * 0.8)
-            
-            # Анимация скольжения
-            if msg_data['x_offset'] > 0:
-                slide_speed = self.killfeed_slide_distance / self.killfeed_fade_time
-                msg_data['x_offset'] = max(0, msg_data['x_offset'] - slide_speed * globalClock.getDt())
-                new_x = 1.3 + msg_data['x_offset']
-                
-                # Обновляем позицию текста и рамки
-                msg_data['message'].setPos(new_x, msg_data['y_pos'])
-                msg_data['frame_root'].setPos(new_x, 0, msg_data['y_pos'])
-                msg_data['x_pos'] = new_x
-            
-            # Запускаем исчезновение через 5 секунд
-            if age > 5.0 and msg_data['target_alpha'] == 1:
-                msg_data['target_alpha'] = 0
-            
-            # Удаляем полностью прозрачные сообщения
-            if msg_data['alpha'] <= 0 and msg_data['target_alpha'] == 0:
-                messages_to_remove.append(msg_data)
-            
-            # Обновляем позицию Y для всех сообщений
-            target_y = 0.9 - i * 0.06
-            if msg_data['y_pos'] != target_y:
-                msg_data['y_pos'] = target_y
-                msg_data['message'].setPos(msg_data['x_pos'], target_y)
-                msg_data['frame_root'].setPos(msg_data['x_pos'], 0, target_y)
-        
-        # Удаляем сообщения
-        for msg_data in messages_to_remove:
-            msg_data['message'].removeNode()
-            msg_data['frame_root'].removeNode()  # Удаляем весь узел с рамкой
-            self.killfeed_messages.remove(msg_data)
+        self.killfeed.update(globalClock.getFrameTime(), globalClock.getDt())
 
     def update(self, task):
         """Обновление состояния игры"""
@@ -1674,6 +1518,9 @@ class Game(ShowBase):
         # Обновляем информационные тексты
         self.fps_text.setText(f"FPS: {self.fps}")
         self.pos_text.setText(f"Pos: ({self.camera.getX():.1f}, {self.camera.getY():.1f}, {self.camera.getZ():.1f})")
+        pool_stats = self.target_pool.stats()
+        self.pool_text.setText(f"Pool: {pool_stats['hits']} hits / {pool_stats['misses']} misses")
+        self.tracer_text.setText(f"Tracers: {self.tracers.active}/{self.tracers.capacity} ({self.tracers.last_update_ms:.3f} ms)")
         
         # Обновление отдачи
         current_time = globalClock.getFrameTime()
@@ -1756,9 +1603,9 @@ class Game(ShowBase):
             self.camera.setZ(new_z)
             
         # Обновляем поворот камеры с учетом замедления времени
-        if self.mouseWatcherNode.hasMouse():
-            mouse_x = self.mouseWatcherNode.getMouseX()
-            mouse_y = self.mouseWatcherNode.getMouseY()
+        pointer = self.read_pointer()
+        if pointer is not None:
+            mouse_x, mouse_y = pointer
             
             # Применяем замедление к чувствительности мыши
             sensitivity = self.settings["sensitivity"]
@@ -1776,9 +1623,10 @@ class Game(ShowBase):
             self.camera.setHpr(self.camera_heading, self.camera_pitch, 0)
             
             # Возвращаем курсор в центр экрана
-            self.win.movePointer(0,
-                int(self.win.getProperties().getXSize() / 2),
-                int(self.win.getProperties().getYSize() / 2))
+            if not self.headless:
+                self.win.movePointer(0,
+                    int(self.win.getProperties().getXSize() / 2),
+                    int(self.win.getProperties().getYSize() / 2))
         
         # Вычисляем текущую скорость движения
         current_speed = math.sqrt(self.horizontal_velocity.getX()**2 + self.horizontal_velocity.getY()**2)
@@ -1786,12 +1634,14 @@ class Game(ShowBase):
         
         # Обработка стрельбы при нажатии левой кнопки мыши
         if self.mouse_pressed and self.current_weapon == "rifle":
-            current_time = time.time()
+            current_time = globalClock.getFrameTime()
             if current_time - self.last_shot_time >= self.weapons[self.current_weapon]["cooldown"]:
-                self.shoot()
+                with self.profiler.section("shoot"):
+                    self.shoot()
         
         # Обновляем килфид
-        self.update_killfeed_positions()
+        with self.profiler.section("killfeed"):
+            self.update_killfeed_positions()
         
         # Обновляем анимацию прицеливания
         self.update_aim(task)
@@ -2076,26 +1926,17 @@ class Game(ShowBase):
         if self.is_splash_screen_active:  # Check if splash screen is active
             return  # Ignore all actions during splash screen
         
-        if self.music:
-            self.music.stop()
-        
         # Get the music file path
         music_path = f"music/{track_name}"
         
         try:
-            self.music = loader.loadSfx(music_path)
-            if self.music:
-                self.music.setLoop(True)
-                self.music.setVolume(volume)
-                self.music.play()
-                self.current_music_path = music_path
+            self.audio.play_music(music_path, volume)
         except Exception as e:
             print(f"Error loading music: {e}")
 
     def update_music_volume(self, volume):
         """Update the volume of currently playing music"""
-        if self.music:
-            self.music.setVolume(volume)
+        self.audio.set_music_volume(volume)
             
         # Update settings
         if 'audio' not in self.settings:
@@ -2124,8 +1965,8 @@ class Game(ShowBase):
         
         if enabled:
             self.play_music(self.settings['audio']['current_track'], self.settings['audio']['music_volume'])
-        elif self.music:
-            self.music.stop()
+        else:
+            self.audio.stop_music()
 
     def cycle_weapon(self, direction):
         if self.is_splash_screen_active:  # Check if splash screen is active
@@ -2143,7 +1984,8 @@ class Game(ShowBase):
         
         self.mouse_pressed = True
         # Сразу производим первый выстрел
-        self.shoot()
+        with self.profiler.section("shoot"):
+            self.shoot()
 
     def on_mouse_release(self):
         """Обработчик отпускания кнопки мыши"""
@@ -2160,9 +2002,6 @@ class Game(ShowBase):
         # Получаем текущую модель оружия
         current_weapon_model = self.weapon_models[self.current_weapon]
         
-        # Создаем копию модели гильзы
-        shell = self.shell_model.copyTo(render)
-        
         # Определяем точку выброса относительно модели оружия
         if self.current_weapon == "pistol":
             eject_offset = Vec3(0.1, 0.9, -0.1)
@@ -2171,23 +2010,13 @@ class Game(ShowBase):
         else:  # sniper
             eject_offset = Vec3(0.1, 1.1, -0.05)
 
-        # Создаем пустой узел как родитель для гильзы
-        shell_parent = render.attachNewNode("shell_parent")
-        shell_parent.setPos(current_weapon_model.getPos(render))
-        shell_parent.setHpr(current_weapon_model.getHpr(render))
-        
-        # Привязываем гильзу к родительскому узлу и устанавливаем смещение
-        shell.reparentTo(shell_parent)
-        shell.setPos(eject_offset)
-        
-        # Получаем мировые координаты точки выброса
-        shell.wrtReparentTo(render)  # Переносим в мировые координаты
+        # Мировые координаты точки выброса (смещение в системе оружия, без его масштаба)
+        weapon_quat = current_weapon_model.getQuat(render)
+        start_pos = current_weapon_model.getPos(render) + weapon_quat.xform(eject_offset)
         
         # Базовые векторы для расчета направления выброса
-        weapon_quat = current_weapon_model.getQuat(render)
         right = weapon_quat.getRight()
         up = weapon_quat.getUp()
-        forward = weapon_quat.getForward()
         
         # Рассчитываем начальную скорость в мировых координатах
         ejection_speed = 3.0
@@ -2212,94 +2041,46 @@ class Game(ShowBase):
             random.uniform(-720, 720)
         )
         
-        # Добавляем гильзу в список активных
-        shell_data = {
-            'model': shell,
-            'velocity': initial_velocity,
-            'angular_velocity': angular_velocity,
-            'time': 0
-        }
-        self.active_shells.append(shell_data)
-        
-        # Запускаем задачу для удаления гильзы через 2 секунды
-        taskMgr.doMethodLater(2.0, self.remove_shell, 'remove_shell', 
-                            extraArgs=[shell_data], appendTask=True)
+        # Кладем гильзу в буфер (исчезнет сама через SHELL_LIFETIME секунд)
+        self.shells.emit(start_pos, current_weapon_model.getHpr(render), initial_velocity, angular_velocity)
 
     def update_shells(self, task):
         """Обновляет физику гильз"""
         if self.is_splash_screen_active:  # Check if splash screen is active
             return task.cont  # Continue but ignore input during splash screen
         
-        dt = globalClock.getDt()
-        gravity = Vec3(0, 0, -9.8)
-        
-        for shell in self.active_shells:
-            # Обновляем время
-            shell['time'] += dt
-            
-            # Обновляем позицию
-            current_pos = shell['model'].getPos()
-            shell['velocity'] += gravity * dt
-            new_pos = current_pos + shell['velocity'] * dt
-            shell['model'].setPos(new_pos)
-            
-            # Обновляем вращение
-            current_hpr = shell['model'].getHpr()
-            rotation = shell['angular_velocity'] * dt
-            new_hpr = current_hpr + rotation
-            shell['model'].setHpr(new_hpr)
-            
-            # Проверяем столкновение с полом
-            if new_pos.getZ() < 0:
-                new_pos.setZ(0)
-                shell['velocity'] = Vec3(0, 0, 0)
-                shell['angular_velocity'] = Vec3(0, 0, 0)
-                shell['model'].setPos(new_pos)
-        
+        self.shells.update(globalClock.getDt())
         return task.cont
 
-    def remove_shell(self, shell_data, task):
-        """Удаляет гильзу"""
-        if shell_data in self.active_shells:
-            self.active_shells.remove(shell_data)
-            shell_data['model'].removeNode()
-        return task.done
-
     def apply_settings(self, new_settings):
-        # Обновляем настройки
+        # Обновляем настройки: подписчики применяют их, запись на диск идет в фоне
         self.settings.update(new_settings)
-        
-        # Применяем настройки
-        if 'sensitivity' in new_settings:
-            self.mouse_sensitivity = new_settings['sensitivity']
-        if 'fov' in new_settings:
-            lens = self.cam.node().getLens()
-            lens.setFov(new_settings['fov'])
-        if 'show_score' in new_settings:
-            self.show_score = new_settings['show_score']
-        if 'show_timer' in new_settings:
-            self.show_timer = new_settings['show_timer']
-            
-        # Сохраняем все настройки
-        self.save_settings()
+
+    def on_setting_changed(self, key, value):
+        """Применяет измененную настройку (подписка на self.settings)"""
+        if key == 'sensitivity':
+            self.mouse_sensitivity = value
+        elif key == 'fov':
+            self.camLens.setFov(value)
+        elif key == 'show_score':
+            self.show_score = value
+        elif key == 'show_timer':
+            self.show_timer = value
+        elif key == 'volume':
+            self.audio.set_master_volume(value / 100)
+        elif key in ('nsfw_category', 'show_target_images'):
+            # Новая категория начинает грузиться сразу, а не при появлении манекенов
+            if self.settings.get('show_target_images', True):
+                self.texture_catalog.prefetch(self.settings.get('nsfw_category', 'furry'))
 
     def load_settings(self):
-        try:
-            with open('settings.json', 'r') as f:
-                return json.load(f)
-        except:
-            return self.DEFAULT_SETTINGS.copy()
+        """Читает settings.json, недостающие ключи берутся из DEFAULT_SETTINGS"""
+        # Без окна (замеры) настройки игрока не перезаписываются
+        return SettingsStore('settings.json', self.DEFAULT_SETTINGS, persist=not self.headless)
 
     def save_settings(self):
-        """Сохраняет текущие настройки в файл"""
-        # Обновляем значение чувствительности в настройках перед сохранением
-        self.settings['sensitivity'] = self.mouse_sensitivity
-        
-        try:
-            with open('settings.json', 'w') as f:
-                json.dump(self.settings, f, indent=4)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+        """Планирует сохранение настроек (запись в фоне, см. SettingsStore)"""
+        self.settings.save()
 
     def show_main_menu(self):
         """Called by splash screen when it's done"""
@@ -2323,5 +2104,12 @@ class Game(ShowBase):
         self.render.setLight(self.directionalLightNP)
         
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Aim Trainer")
+    parser.add_argument('--record', metavar='PATH', help="записывать ввод матчей в файл для bench_replay.py")
+    args = parser.parse_args()
+
     game = Game()
+    if args.record:
+        game.input_source = InputRecorder(game, args.record)
     game.run()
@@ -884,8 +884,7 @@ class MainMenu:
     def update_sensitivity(self):
         """Обновляет чувствительность мыши и сохраняет настройки"""
         value = self.sensitivity_slider['value']
-        self.game.mouse_sensitivity = value
-        self.game.save_settings()  # Сохраняем настройки сразу после изменения
+        self.game.settings['sensitivity'] = value  # Применяется и сохраняется через подписку
 
     def update_resolution(self, resolution):
         # Сохраняем текущее состояние полноэкранного режима
@@ -942,9 +941,7 @@ class MainMenu:
 
     def update_fov(self):
         new_fov = int(self.fov_slider['value'])
-        self.game.settings['fov'] = new_fov
-        self.game.save_settings()  # Сохраняем настройки
-        base.camLens.setFov(new_fov)  # Применяем новый FOV
+        self.game.settings['fov'] = new_fov  # Применяется и сохраняется через подписку
         
     def update_x_position(self):
         """Обновляет X позицию оружия"""
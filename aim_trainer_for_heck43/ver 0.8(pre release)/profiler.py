@@ -0,0 +1,229 @@
+from panda3d.core import GeomVertexFormat, GeomVertexData, GeomVertexWriter, GeomLinestrips, GeomLines, Geom, GeomNode
+from panda3d.core import TextNode, OmniBoundingVolume
+from direct.gui.OnscreenText import OnscreenText
+from collections import deque
+import numpy as np
+import time
+import json
+import csv
+import os
+
+PROFILER_HISTORY = 1200  # кадров для 1%/0.1% lows (~20 секунд при 60 FPS)
+PROFILER_GRAPH_FRAMES = 240  # кадров на графике
+PROFILER_TRACE_FRAMES = 60 * 60 * 30  # сколько кадров держит запись сессии (~30 минут)
+PROFILER_REFRESH = 0.25  # как часто перерисовывается оверлей (секунды)
+PROFILER_GRAPH_MAX_MS = 50.0  # верх графика
+PROFILER_DIR = "profiles"
+
+# График: левый нижний угол и размер в координатах aspect2d
+GRAPH_X, GRAPH_Y = -1.3, -0.95
+GRAPH_WIDTH, GRAPH_HEIGHT = 0.8, 0.3
+
+
+class Section:
+    """Замер одного участка кода; время копится за кадр (участок может вызываться несколько раз)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.frame_time = 0.0
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.frame_time += time.perf_counter() - self.started
+        return False
+
+
+class FrameProfiler:
+    """Время кадра и отдельных задач игры с оверлеем и записью сессии.
+
+    Задачи оборачиваются через wrap(name, func), произвольные участки -
+    через with profiler.section(name). Раз в кадр (задача с sort перед
+    отрисовкой) накопленные времена складываются в историю и в запись
+    сессии, которую можно сохранить в JSON или CSV. Участки, вызванные
+    изнутри других (например, выстрел из update), входят и в их время.
+    """
+
+    def __init__(self, base, visible=False):
+        self.base = base
+        self.sections = {}
+        self.frame_ms = deque(maxlen=PROFILER_HISTORY)
+        self.section_ms = {}  # имя -> deque последних значений
+        self.trace = deque(maxlen=PROFILER_TRACE_FRAMES)  # (кадр, время, мс кадра, {участок: мс})
+        self.frame = 0
+        self.started = time.perf_counter()
+        self.last_frame = None
+        self.last_refresh = 0.0
+
+        self.root = base.aspect2d.attachNewNode("profiler")
+        self.text = OnscreenText(
+            text="",
+            fg=(1, 1, 1, 1),
+            shadow=(0, 0, 0, 1),
+            pos=(GRAPH_X, GRAPH_Y + GRAPH_HEIGHT + 0.55),
+            align=TextNode.ALeft,
+            scale=0.035,
+            parent=self.root,
+            mayChange=True
+        )
+        self.create_graph()
+        self.visible = visible
+        if not visible:
+            self.root.hide()
+
+        # sort 49: после игровых задач, но до отрисовки кадра (igLoop)
+        base.taskMgr.add(self.end_frame, "profiler_frame", sort=49)
+
+    def create_graph(self):
+        # Линия времени кадра: одна вершина на кадр, буфер переписывается целиком
+        self.graph_data = GeomVertexData('profiler_graph', GeomVertexFormat.getV3(), Geom.UHDynamic)
+        self.graph_data.setNumRows(PROFILER_GRAPH_FRAMES)
+        strip = GeomLinestrips(Geom.UHStatic)
+        strip.addConsecutiveVertices(0, PROFILER_GRAPH_FRAMES)
+        strip.closePrimitive()
+        geom = Geom(self.graph_data)
+        geom.addPrimitive(strip)
+        node = GeomNode('profiler_graph')
+        node.addGeom(geom)
+        node.setBounds(OmniBoundingVolume())
+        node.setFinal(True)
+        graph = self.root.attachNewNode(node)
+        graph.setColor(0.3, 1, 0.3, 1)
+
+        # Отметки 16.7 мс (60 FPS) и 33.3 мс (30 FPS)
+        marks_data = GeomVertexData('profiler_marks', GeomVertexFormat.getV3(), Geom.UHStatic)
+        writer = GeomVertexWriter(marks_data, 'vertex')
+        lines = GeomLines(Geom.UHStatic)
+        for i, ms in enumerate((1000 / 60, 1000 / 30)):
+            z = GRAPH_Y + GRAPH_HEIGHT * ms / PROFILER_GRAPH_MAX_MS
+            writer.addData3(GRAPH_X, 0, z)
+            writer.addData3(GRAPH_X + GRAPH_WIDTH, 0, z)
+            lines.addVertices(i * 2, i * 2 + 1)
+        geom = Geom(marks_data)
+        geom.addPrimitive(lines)
+        node = GeomNode('profiler_marks')
+        node.addGeom(geom)
+        marks = self.root.attachNewNode(node)
+        marks.setColor(1, 1, 1, 0.4)
+        marks.setTransparency(True)
+
+        self.graph_x = np.linspace(GRAPH_X, GRAPH_X + GRAPH_WIDTH, PROFILER_GRAPH_FRAMES, dtype=np.float32)
+        self.write_graph(np.zeros(PROFILER_GRAPH_FRAMES, dtype=np.float32))
+
+    def section(self, name):
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = Section(name)
+            self.section_ms[name] = deque(maxlen=PROFILER_HISTORY)
+        return section
+
+    def wrap(self, name, func):
+        """Оборачивает задачу (или любую функцию) замером времени"""
+        section = self.section(name)
+
+        def timed(*args, **kwargs):
+            with section:
+                return func(*args, **kwargs)
+        return timed
+
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible:
+            self.root.show()
+            self.last_refresh = 0.0  # перерисовать сразу
+        else:
+            self.root.hide()
+
+    def end_frame(self, task):
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            frame_ms = (now - self.last_frame) * 1000
+            self.frame_ms.append(frame_ms)
+            sections = {}
+            for name, section in self.sections.items():
+                ms = section.frame_time * 1000
+                section.frame_time = 0.0
+                self.section_ms[name].append(ms)
+                sections[name] = ms
+            self.trace.append((self.frame, now - self.started, frame_ms, sections))
+            self.frame += 1
+        self.last_frame = now
+
+        if self.visible and now - self.last_refresh >= PROFILER_REFRESH:
+            self.last_refresh = now
+            self.refresh()
+        return task.cont
+
+    def lows(self):
+        """Средний FPS и FPS на 1% и 0.1% худших кадров истории"""
+        if not self.frame_ms:
+            return 0.0, 0.0, 0.0
+        ms = np.fromiter(self.frame_ms, dtype=np.float64)
+        p99, p999 = np.percentile(ms, (99, 99.9))
+        return 1000 / ms.mean(), 1000 / p99, 1000 / p999
+
+    def refresh(self):
+        average, low_1, low_01 = self.lows()
+        last_ms = self.frame_ms[-1] if self.frame_ms else 0.0
+        lines = [
+            f"Frame: {last_ms:.2f} ms",
+            f"FPS avg {average:.0f} / 1% low {low_1:.0f} / 0.1% low {low_01:.0f}",
+        ]
+        # Среднее по последней секунде
+        for name, values in self.section_ms.items():
+            recent = list(values)[-60:]
+            lines.append(f"{name}: {sum(recent) / len(recent) if recent else 0.0:.3f} ms")
+        self.text.setText("\n".join(lines))
+
+        recent = np.fromiter(self.frame_ms, dtype=np.float32)[-PROFILER_GRAPH_FRAMES:]
+        values = np.zeros(PROFILER_GRAPH_FRAMES, dtype=np.float32)
+        if len(recent):
+            values[-len(recent):] = recent
+        self.write_graph(values)
+
+    def write_graph(self, values):
+        data = np.frombuffer(memoryview(self.graph_data.modifyArray(0)), dtype=np.float32).reshape(-1, 3)
+        data[:, 0] = self.graph_x
+        data[:, 1] = 0
+        data[:, 2] = GRAPH_Y + GRAPH_HEIGHT * np.minimum(values, PROFILER_GRAPH_MAX_MS) / PROFILER_GRAPH_MAX_MS
+
+    def dump(self, path):
+        """Сохраняет запись сессии; формат по расширению (.json или .csv)"""
+        names = list(self.sections)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['frame', 'time', 'frame_ms'] + [f'{name}_ms' for name in names])
+                for frame, t, frame_ms, sections in self.trace:
+                    writer.writerow([frame, f'{t:.4f}', f'{frame_ms:.3f}'] +
+                                    [f'{sections.get(name, 0.0):.3f}' for name in names])
+        else:
+            average, low_1, low_01 = self.lows()
+            report = {
+                'summary': {'frames': len(self.trace), 'fps_avg': average, 'fps_1_low': low_1, 'fps_01_low': low_01},
+                'frames': [
+                    {'frame': frame, 'time': t, 'frame_ms': frame_ms, 'sections': sections}
+                    for frame, t, frame_ms, sections in self.trace
+                ],
+            }
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=4)
+        return path
+
+    def dump_session(self, fmt='json'):
+        """Сохраняет запись в profiles/session_<дата>.<fmt>"""
+        name = time.strftime("session_%Y%m%d_%H%M%S")
+        path = self.dump(os.path.join(PROFILER_DIR, f"{name}.{fmt}"))
+        print(f"Профиль сохранен: {path}")
+        return path
+
+    def destroy(self):
+        self.base.taskMgr.remove("profiler_frame")
+        self.text.destroy()
+        self.root.removeNode()
@@ -0,0 +1,155 @@
+from direct.showbase.DirectObject import DirectObject
+import atexit
+import gzip
+import json
+import random
+import time
+
+REPLAY_VERSION = 1
+
+# События, которые игра принимает во время матча (см. Game.__init__ и start_game);
+# escape не пишется - им запись заканчивается
+REPLAY_EVENTS = (
+    "w", "w-up", "a", "a-up", "s", "s-up", "d", "d-up", "shift", "shift-up",
+    "space", "1", "2", "3", "4", "wheel_up", "wheel_down",
+    "mouse1", "mouse1-up", "mouse3", "mouse3-up",
+)
+
+# Позиция мыши хранится целыми числами: так файл меньше, а запись и
+# воспроизведение видят одно и то же значение
+POINTER_SCALE = 32767
+
+# sort -40: после dataLoop (-50), когда mouseWatcher уже обновлен, но до update
+REPLAY_TASK_SORT = -40
+
+
+def quantize(x, y):
+    return int(round(x * POINTER_SCALE)), int(round(y * POINTER_SCALE))
+
+
+def read_replay(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != REPLAY_VERSION:
+        raise ValueError(f"{path}: неподдерживаемая версия записи {data.get('version')}")
+    return data
+
+
+class InputRecorder(DirectObject):
+    """Записывает ввод матча: позицию мыши за кадр, нажатия клавиш и зерно random.
+
+    Запись начинается в start_game (игра зовет start) и сохраняется в path при
+    выходе в меню или из игры. Пока запись идет, игра читает мышь отсюда,
+    чтобы она видела то же округленное значение, что попадет в файл.
+    """
+
+    def __init__(self, game, path):
+        DirectObject.__init__(self)
+        self.game = game
+        self.path = path
+        self.active = False
+        self.pointer = None
+        atexit.register(self.stop)
+
+    def start(self):
+        self.stop()
+        self.seed = random.randrange(2 ** 32)
+        random.seed(self.seed)
+        self.settings = json.loads(json.dumps(self.game.settings))
+        self.weapon = self.game.current_weapon
+        self.samples = []
+        self.events = []
+        self.started = time.perf_counter()
+        self.active = True
+        self.sample()
+        for event in REPLAY_EVENTS:
+            self.accept(event, self.record_event, [event])
+        self.game.taskMgr.add(self.record_task, "replay_record", sort=REPLAY_TASK_SORT)
+
+    def sample(self):
+        mouse = self.game.mouseWatcherNode
+        if mouse is not None and mouse.hasMouse():
+            sample = quantize(mouse.getMouseX(), mouse.getMouseY())
+            self.pointer = (sample[0] / POINTER_SCALE, sample[1] / POINTER_SCALE)
+        else:
+            sample = None
+            self.pointer = None
+        self.samples.append(sample)
+
+    def record_task(self, task):
+        self.sample()
+        return task.cont
+
+    def record_event(self, event):
+        self.events.append((len(self.samples) - 1, event))
+
+    def stop(self):
+        if not self.active:
+            return
+        self.active = False
+        self.ignoreAll()
+        self.game.taskMgr.remove("replay_record")
+        duration = time.perf_counter() - self.started
+        data = {
+            'version': REPLAY_VERSION,
+            'seed': self.seed,
+            'settings': self.settings,
+            'weapon': self.weapon,
+            'frames': len(self.samples),
+            'recorded_fps': len(self.samples) / duration if duration else 0.0,
+            'pointer': self.samples,
+            'events': self.events,
+        }
+        with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        print(f"Запись сохранена: {self.path} ({len(self.samples)} кадров, {len(self.events)} событий)")
+
+
+class InputReplay:
+    """Воспроизводит запись InputRecorder кадр за кадром.
+
+    start (из start_game) ставит настройки, оружие и зерно random записи;
+    затем каждый кадр отдает записанную позицию мыши и рассылает события
+    этого кадра через messenger, как будто их прислало окно.
+    """
+
+    def __init__(self, game, data):
+        self.game = game
+        self.data = data
+        self.samples = data['pointer']
+        self.events = {}
+        for frame, event in data['events']:
+            self.events.setdefault(frame, []).append(event)
+        self.frame = -1
+        self.pointer = None
+        self.active = False
+        self.dispatched = None  # perf_counter момента, когда разосланы события текущего кадра
+
+    @property
+    def finished(self):
+        return self.frame >= len(self.samples) - 1
+
+    def start(self):
+        self.game.settings.update(self.data['settings'])
+        self.game.current_weapon = self.data['weapon']
+        random.seed(self.data['seed'])
+        self.frame = -1
+        self.active = True
+        self.game.taskMgr.add(self.replay_task, "replay_play", sort=REPLAY_TASK_SORT)
+
+    def replay_task(self, task):
+        if self.finished:
+            self.stop()
+            return task.done
+        self.frame += 1
+        sample = self.samples[self.frame]
+        self.pointer = None if sample is None else (sample[0] / POINTER_SCALE, sample[1] / POINTER_SCALE)
+        self.dispatched = time.perf_counter()
+        for event in self.events.get(self.frame, ()):
+            self.game.messenger.send(event)
+        return task.cont
+
+    def stop(self):
+        if self.active:
+            self.active = False
+            self.game.taskMgr.remove("replay_play")
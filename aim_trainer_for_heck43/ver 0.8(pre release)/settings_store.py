@@ -0,0 +1,138 @@
+import threading
+import atexit
+import copy
+import json
+import os
+import time
+
+# Сколько ждать после изменения перед записью на диск: все изменения за это
+# время (например, пока тянут ползунок) уходят одной записью
+SAVE_DELAY = 0.5
+
+
+def merge_defaults(values, defaults):
+    """Дополняет values недостающими ключами из defaults (и во вложенных словарях)"""
+    for key, default in defaults.items():
+        if key not in values:
+            values[key] = copy.deepcopy(default)
+        elif isinstance(default, dict) and isinstance(values[key], dict):
+            merge_defaults(values[key], default)
+    return values
+
+
+class SettingsStore(dict):
+    """Настройки игры: обычный словарь, который сам сохраняется в файл.
+
+    Любое изменение ключа (settings[key] = value, update) оповещает
+    подписчиков этого ключа и планирует запись. Запись делает фоновый поток
+    не чаще раза в SAVE_DELAY секунд: сначала во временный файл, затем
+    os.replace, так что файл не остается недописанным. Вложенные словари
+    (audio, weapon_position) после изменения сохраняются через save().
+    С persist=False настройки только читаются (например, для замеров без окна).
+    """
+
+    def __init__(self, path, defaults, delay=SAVE_DELAY, persist=True):
+        super().__init__()
+        self.path = path
+        self.delay = delay
+        self.persist = persist
+        self.listeners = {}  # ключ -> [callback(key, value)]
+        self.condition = threading.Condition()
+        self.pending = False
+        self.closed = False
+        self.writes = 0
+
+        try:
+            with open(path, 'r') as f:
+                loaded = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Настройки не прочитаны ({e}), используются значения по умолчанию")
+            loaded = {}
+        super().update(merge_defaults(loaded, defaults))
+
+        self.writer = None
+        if persist:
+            self.writer = threading.Thread(target=self.writer_loop, name='settings_writer', daemon=True)
+            self.writer.start()
+            atexit.register(self.close)
+
+    def __setitem__(self, key, value):
+        changed = key not in self or self[key] != value
+        with self.condition:
+            super().__setitem__(key, value)
+        if changed:
+            self.notify(key, value)
+            self.save()
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def subscribe(self, key, callback):
+        """callback(key, value) вызывается при каждом изменении ключа"""
+        self.listeners.setdefault(key, []).append(callback)
+
+    def unsubscribe(self, key, callback):
+        if callback in self.listeners.get(key, ()):
+            self.listeners[key].remove(callback)
+
+    def notify(self, key, value):
+        for callback in list(self.listeners.get(key, ())):
+            callback(key, value)
+
+    def save(self):
+        """Планирует запись на диск (изменения за SAVE_DELAY секунд объединяются)"""
+        if not self.persist:
+            return
+        with self.condition:
+            self.pending = True
+            self.condition.notify()
+
+    def writer_loop(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if self.closed and not self.pending:
+                    return
+                # Ждем окно объединения: новые изменения в него просто попадают, close() будит раньше
+                deadline = time.monotonic() + self.delay
+                while not self.closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+            self.write()
+
+    def write(self):
+        tmp_path = f"{self.path}.tmp"
+        # Ловим любое исключение (как раньше save_settings): иначе ошибка сериализации
+        # молча убьет поток записи и дальше настройки перестанут сохраняться
+        try:
+            with self.condition:
+                self.pending = False
+                data = json.dumps(self, indent=4)
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.writes += 1
+        except Exception as e:
+            print(f"Error saving settings: {e}")
+
+    def close(self):
+        """Дописывает отложенные изменения и останавливает поток записи"""
+        if self.writer is None:
+            return
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify()
+        self.writer.join()
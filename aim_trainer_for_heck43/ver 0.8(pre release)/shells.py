@@ -0,0 +1,85 @@
+from panda3d.core import RigidBodyCombiner
+import numpy as np
+
+# Сколько гильз может лежать одновременно (новая гильза занимает место самой старой)
+SHELL_CAPACITY = 64
+SHELL_LIFETIME = 2.0  # секунды до исчезновения
+GRAVITY = 9.8
+# Куда убираются свободные гильзы (под карту, вне поля зрения)
+PARK_POS = (0, 0, -1000)
+
+
+class ShellCasings:
+    """Гильзы в кольцевом буфере фиксированного размера.
+
+    Узлы создаются один раз под RigidBodyCombiner, поэтому все гильзы рисуются
+    одним батчем, а двигать их можно по отдельности. Позиции, скорости и
+    вращение хранятся в массивах NumPy и считаются за кадр одной пачкой;
+    в сцену переносятся только летящие гильзы.
+    """
+
+    def __init__(self, base, model, capacity=SHELL_CAPACITY, lifetime=SHELL_LIFETIME):
+        self.capacity = capacity
+        self.lifetime = lifetime
+        self.combiner = RigidBodyCombiner('shells')
+        self.root = base.render.attachNewNode(self.combiner)
+        self.nodes = []
+        for i in range(capacity):
+            node = self.root.attachNewNode(f'shell_{i}')
+            model.copyTo(node)
+            node.setPos(*PARK_POS)
+            self.nodes.append(node)
+        self.combiner.collect()
+
+        self.pos = np.zeros((capacity, 3), dtype=np.float32)
+        self.hpr = np.zeros((capacity, 3), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 3), dtype=np.float32)
+        self.angular_velocity = np.zeros((capacity, 3), dtype=np.float32)
+        self.age = np.zeros(capacity, dtype=np.float32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.resting = np.zeros(capacity, dtype=bool)  # упала на пол и больше не двигается
+        self.next = 0
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    def emit(self, pos, hpr, velocity, angular_velocity):
+        """Выбрасывает гильзу; если буфер полон, самая старая пропадает"""
+        i = self.next
+        self.next = (self.next + 1) % self.capacity
+        self.pos[i] = pos
+        self.hpr[i] = hpr
+        self.velocity[i] = velocity
+        self.angular_velocity[i] = angular_velocity
+        self.age[i] = 0
+        self.alive[i] = True
+        self.resting[i] = False
+        self.nodes[i].setPosHpr(*self.pos[i].tolist(), *self.hpr[i].tolist())
+
+    def update(self, dt):
+        moving = np.flatnonzero(self.alive & ~self.resting)
+        if len(moving):
+            self.velocity[moving, 2] -= GRAVITY * dt
+            self.pos[moving] += self.velocity[moving] * dt
+            self.hpr[moving] += self.angular_velocity[moving] * dt
+
+            # Упавшие на пол гильзы останавливаются
+            landed = moving[self.pos[moving, 2] < 0]
+            self.pos[landed, 2] = 0
+            self.velocity[landed] = 0
+            self.angular_velocity[landed] = 0
+            self.resting[landed] = True
+
+            for i, pos, hpr in zip(moving.tolist(), self.pos[moving].tolist(), self.hpr[moving].tolist()):
+                self.nodes[i].setPosHpr(*pos, *hpr)
+
+        self.age[self.alive] += dt
+        expired = np.flatnonzero(self.alive & (self.age >= self.lifetime))
+        for i in expired.tolist():
+            self.nodes[i].setPos(*PARK_POS)
+        self.alive[expired] = False
+
+    def clear(self):
+        for i in np.flatnonzero(self.alive).tolist():
+            self.nodes[i].setPos(*PARK_POS)
+        self.alive[:] = False
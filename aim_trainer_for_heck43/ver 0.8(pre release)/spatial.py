@@ -0,0 +1,198 @@
+from panda3d.core import LMatrix4f
+import math
+
+# Размер ячейки сетки манекенов (метры); манекен ~2.6 м в ширину
+TARGET_CELL_SIZE = 4.0
+
+
+class TargetGrid:
+    """Равномерная сетка по плоскости XY для быстрого отбора манекенов под луч.
+
+    Каждый манекен описан сферой (центр и радиус по его bounds) и лежит во всех
+    ячейках, которые задевает квадрат вокруг этой сферы. Луч проходит по
+    ячейкам (2D DDA) только в пределах занятой области, от ближних к дальним,
+    а точная проверка коллизиями делается уже для отобранных манекенов - и
+    заканчивается, как только попадание ближе следующей ячейки.
+    """
+
+    def __init__(self, cell_size=TARGET_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> set манекенов
+        self.entries = {}  # манекен -> (диапазон ячеек, центр, радиус)
+        self.shapes = {}  # манекен -> (центр сферы в системе манекена, радиус)
+        self.bounds = None  # (min_cx, min_cy, max_cx, max_cy) занятой области
+        self.bounds_dirty = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, target):
+        return target in self.entries
+
+    def cell_of(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def insert(self, target):
+        """Добавляет манекен (сфера считается по его bounds заново)"""
+        self.remove(target)
+        if target.model.isEmpty():
+            return  # манекен уже удален
+        bounds = target.model.getBounds()
+        if bounds.isEmpty():
+            return
+        # getBounds отдает сферу в системе родителя; запоминаем ее центр в системе самого
+        # манекена, чтобы при движении не пересчитывать bounds всего поддерева
+        inverse = LMatrix4f(target.model.getMat())
+        inverse.invertInPlace()
+        self.shapes[target] = (inverse.xformPoint(bounds.getCenter()), bounds.getRadius())
+        self.place(target)
+
+    def update(self, target):
+        """Манекен сдвинулся: переносим его сферу и ячейки"""
+        if target not in self.shapes:
+            self.insert(target)
+        else:
+            self.place(target)
+
+    def place(self, target):
+        local_center, radius = self.shapes[target]
+        center = target.model.getMat().xformPoint(local_center)
+        min_cx, min_cy = self.cell_of(center.x - radius, center.y - radius)
+        max_cx, max_cy = self.cell_of(center.x + radius, center.y + radius)
+        span = (min_cx, min_cy, max_cx, max_cy)
+
+        old = self.entries.get(target)
+        if old is None or old[0] != span:
+            if old is not None:
+                self.unlink(target, old[0])
+            for cx in range(min_cx, max_cx + 1):
+                for cy in range(min_cy, max_cy + 1):
+                    self.cells.setdefault((cx, cy), set()).add(target)
+            if self.bounds is None:
+                self.bounds = span
+            else:
+                b = self.bounds
+                self.bounds = (min(b[0], min_cx), min(b[1], min_cy), max(b[2], max_cx), max(b[3], max_cy))
+        self.entries[target] = (span, (center.x, center.y, center.z), radius)
+
+    def unlink(self, target, span):
+        for cx in range(span[0], span[2] + 1):
+            for cy in range(span[1], span[3] + 1):
+                bucket = self.cells[(cx, cy)]
+                bucket.discard(target)
+                if not bucket:
+                    del self.cells[(cx, cy)]
+        self.bounds_dirty = True
+
+    def remove(self, target):
+        self.shapes.pop(target, None)
+        entry = self.entries.pop(target, None)
+        if entry is not None:
+            self.unlink(target, entry[0])
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self.shapes.clear()
+        self.bounds = None
+        self.bounds_dirty = False
+
+    def occupied_bounds(self):
+        if self.bounds_dirty:
+            # После удалений область могла сжаться - пересчитываем по занятым ячейкам
+            if self.cells:
+                xs = [cx for cx, _ in self.cells]
+                ys = [cy for _, cy in self.cells]
+                self.bounds = (min(xs), min(ys), max(xs), max(ys))
+            else:
+                self.bounds = None
+            self.bounds_dirty = False
+        return self.bounds
+
+    def ray_cells(self, origin, direction, max_distance):
+        """Ячейки занятой области, через которые проходит луч, в порядке прохождения:
+        (ячейка, дистанция выхода луча из нее)"""
+        bounds = self.occupied_bounds()
+        if bounds is None:
+            return
+        size = self.cell_size
+        lo = (bounds[0] * size, bounds[1] * size)
+        hi = ((bounds[2] + 1) * size, (bounds[3] + 1) * size)
+
+        # Обрезаем луч прямоугольником занятой области (метод плит)
+        t_enter, t_exit = 0.0, max_distance
+        for axis in range(2):
+            o, d = origin[axis], direction[axis]
+            if abs(d) < 1e-9:
+                if o < lo[axis] or o > hi[axis]:
+                    return
+                continue
+            t0, t1 = (lo[axis] - o) / d, (hi[axis] - o) / d
+            if t0 > t1:
+                t0, t1 = t1, t0
+            t_enter, t_exit = max(t_enter, t0), min(t_exit, t1)
+            if t_enter > t_exit:
+                return
+
+        # Шагаем по ячейкам от точки входа (Amanatides-Woo)
+        x = origin[0] + direction[0] * t_enter
+        y = origin[1] + direction[1] * t_enter
+        cx = min(max(int(math.floor(x / size)), bounds[0]), bounds[2])
+        cy = min(max(int(math.floor(y / size)), bounds[1]), bounds[3])
+        steps, t_max, t_delta = [], [], []
+        for axis, c in ((0, cx), (1, cy)):
+            d = direction[axis]
+            if abs(d) < 1e-9:
+                steps.append(0)
+                t_max.append(math.inf)
+                t_delta.append(math.inf)
+                continue
+            step = 1 if d > 0 else -1
+            edge = (c + (step > 0)) * size
+            steps.append(step)
+            t_max.append((edge - origin[axis]) / d)
+            t_delta.append(size / abs(d))
+
+        while True:
+            yield (cx, cy), min(t_max[0], t_max[1], t_exit)
+            if t_max[0] < t_max[1]:
+                if t_max[0] > t_exit:
+                    return
+                cx += steps[0]
+                t_max[0] += t_delta[0]
+            else:
+                if t_max[1] > t_exit:
+                    return
+                cy += steps[1]
+                t_max[1] += t_delta[1]
+            if not (bounds[0] <= cx <= bounds[2] and bounds[1] <= cy <= bounds[3]):
+                return
+
+    def query_ray(self, origin, direction, max_distance):
+        """Идет по ячейкам вдоль луча и для каждой отдает (дистанция выхода из ячейки,
+        [(дистанция входа в сферу, манекен), ...] по возрастанию) - только новые манекены.
+
+        direction должен быть нормализован.
+        """
+        ox, oy, oz = origin
+        dx, dy, dz = direction
+        seen = set()
+        for cell, cell_exit in self.ray_cells(origin, direction, max_distance):
+            found = []
+            for target in self.cells.get(cell, ()):
+                if target in seen:
+                    continue
+                seen.add(target)
+                _, (cx, cy, cz), radius = self.entries[target]
+                # Пересечение луча со сферой
+                vx, vy, vz = cx - ox, cy - oy, cz - oz
+                along = vx * dx + vy * dy + vz * dz
+                miss = vx * vx + vy * vy + vz * vz - along * along
+                if miss > radius * radius or along + radius < 0:
+                    continue
+                distance = along - math.sqrt(radius * radius - miss)
+                if distance <= max_distance:
+                    found.append((max(distance, 0.0), target))
+            if found:
+                found.sort(key=lambda item: item[0])
+            yield cell_exit, found
@@ -1,7 +1,7 @@
 from direct.showbase.ShowBase import ShowBase
 from direct.gui.OnscreenText import OnscreenText
 from direct.gui.OnscreenImage import OnscreenImage
-from direct.interval.IntervalGlobal import Sequence, Parallel, LerpColorScaleInterval, Wait, Func, LerpScaleInterval
+from direct.interval.IntervalGlobal import Sequence, Parallel, LerpColorScaleInterval, Wait, Func
 from panda3d.core import TextNode, TransparencyAttrib, Vec4, NodePath, Vec3, WindowProperties
 from direct.gui.DirectFrame import DirectFrame
 
@@ -45,7 +45,7 @@ class SplashScreen:
         
         # Author logo
         self.author_logo = OnscreenImage(
-            image="assets/author_logo.jpg",
+            image=game.assets.load_texture("assets/author_logo.jpg"),
             pos=(0, 0, 0.2),
             scale=0.3,
             parent=game.a2dBackground
@@ -125,60 +125,66 @@ class SplashScreen:
         ]
 
     def start(self):
-        # Animation sequence
+        # Короткая заставка автора идет, пока ассеты грузятся в фоне (game.loading);
+        # дальше экран ждет только критичные ассеты, полоса показывает реальный прогресс
+        self.intro_done = False
+        self.shown_progress = 0.0
+        self.last_status = None
+        self.loading_fill.setSx(0.01)
         self.sequence = Sequence(
-            # First fade in nickname
-            LerpColorScaleInterval(self.author_name, 1.0, Vec4(1, 1, 1, 1), Vec4(1, 1, 1, 0)),
-            Wait(0.5),
-            
-            # Then fade in author logo
-            LerpColorScaleInterval(self.author_logo, 1.0, Vec4(1, 1, 1, 1), Vec4(1, 1, 1, 0)),
-            Wait(1.5),
-            
-            # Fade out both author logo and name together
+            # Fade in nickname and author logo
             Parallel(
-                LerpColorScaleInterval(self.author_logo, 1.0, Vec4(1, 1, 1, 0), Vec4(1, 1, 1, 1)),
-                LerpColorScaleInterval(self.author_name, 1.0, Vec4(1, 1, 1, 0), Vec4(1, 1, 1, 1))
+                LerpColorScaleInterval(self.author_name, 0.5, Vec4(1, 1, 1, 1), Vec4(1, 1, 1, 0)),
+                LerpColorScaleInterval(self.author_logo, 0.5, Vec4(1, 1, 1, 1), Vec4(1, 1, 1, 0))
             ),
             Wait(0.5),
             
-            # Fade in game title and loading text
-            Parallel(
-                LerpColorScaleInterval(self.game_title, 1.5, Vec4(1, 1, 1, 1), Vec4(1, 1, 1, 0)),
-                LerpColorScaleInterval(self.loading_text, 1.5, Vec4(1, 1, 1, 1), Vec4(1, 1, 1, 0))
-            ),
-            
-            # Show loading bar and status text with animation
+            # Author fades out while title, loading bar and status fade in
             Parallel(
+                LerpColorScaleInterval(self.author_logo, 0.5, Vec4(1, 1, 1, 0), Vec4(1, 1, 1, 1)),
+                LerpColorScaleInterval(self.author_name, 0.5, Vec4(1, 1, 1, 0), Vec4(1, 1, 1, 1)),
+                LerpColorScaleInterval(self.game_title, 0.5, Vec4(1, 1, 1, 1), Vec4(1, 1, 1, 0)),
+                LerpColorScaleInterval(self.loading_text, 0.5, Vec4(1, 1, 1, 1), Vec4(1, 1, 1, 0)),
                 LerpColorScaleInterval(self.loading_bg, 0.5, Vec4(0.2, 0.2, 0.2, 1), Vec4(0.2, 0.2, 0.2, 0)),
                 LerpColorScaleInterval(self.loading_fill, 0.5, Vec4(1, 1, 1, 1), Vec4(1, 1, 1, 0)),
                 LerpColorScaleInterval(self.status_text, 0.5, Vec4(0.7, 0.7, 0.7, 1), Vec4(0.7, 0.7, 0.7, 0))
             ),
-            
-            # Animate loading bar and show status messages
-            Parallel(
-                LerpScaleInterval(self.loading_fill, 2.0, 
-                                Vec3(1.0, 1.0, 1.0),
-                                startScale=Vec3(0.01, 1.0, 1.0),
-                                blendType='easeInOut'),
-                Sequence(
-                    Func(lambda: self.status_text.setText("Initializing game...")),
-                    Wait(0.7),
-                    Func(lambda: self.status_text.setText("Loading resources...")),
-                    Wait(0.7),
-                    Func(lambda: self.status_text.setText("Preparing menu...")),
-                    Wait(0.6)
-                )
-            ),
-            Wait(0.5),
-            
-            # Fade out everything
+            Func(self.finish_intro)
+        )
+        self.sequence.start()
+        self.progress_task = self.game.taskMgr.add(self.update_progress, 'splash_progress')
+
+    def finish_intro(self):
+        self.intro_done = True
+
+    def update_progress(self, task):
+        """Полоса загрузки по загруженным байтам; меню - как только готовы критичные ассеты"""
+        loading = self.game.loading
+        target = loading.progress()
+        # Полоса плавно догоняет реальный прогресс
+        self.shown_progress += (target - self.shown_progress) * min(1.0, globalClock.getDt() * 12)
+        if target - self.shown_progress < 0.01:
+            self.shown_progress = target
+        self.loading_fill.setSx(max(0.01, self.shown_progress))
+
+        status = "Preparing menu..." if loading.critical_ready else loading.status()
+        if status != self.last_status:
+            self.status_text.setText(status)
+            self.last_status = status
+
+        if self.intro_done and loading.critical_ready and self.shown_progress >= 1.0:
+            self.fade_out()
+            return task.done
+        return task.cont
+
+    def fade_out(self):
+        self.sequence = Sequence(
             Parallel(
-                LerpColorScaleInterval(self.game_title, 1.0, Vec4(1, 1, 1, 0), Vec4(1, 1, 1, 1)),
-                LerpColorScaleInterval(self.loading_text, 1.0, Vec4(1, 1, 1, 0), Vec4(1, 1, 1, 1)),
-                LerpColorScaleInterval(self.loading_bg, 1.0, Vec4(0.2, 0.2, 0.2, 0), Vec4(0.2, 0.2, 0.2, 1)),
-                LerpColorScaleInterval(self.loading_fill, 1.0, Vec4(1, 1, 1, 0), Vec4(1, 1, 1, 1)),
-                LerpColorScaleInterval(self.status_text, 1.0, Vec4(0.7, 0.7, 0.7, 0), Vec4(0.7, 0.7, 0.7, 1))
+                LerpColorScaleInterval(self.game_title, 0.5, Vec4(1, 1, 1, 0), Vec4(1, 1, 1, 1)),
+                LerpColorScaleInterval(self.loading_text, 0.5, Vec4(1, 1, 1, 0), Vec4(1, 1, 1, 1)),
+                LerpColorScaleInterval(self.loading_bg, 0.5, Vec4(0.2, 0.2, 0.2, 0), Vec4(0.2, 0.2, 0.2, 1)),
+                LerpColorScaleInterval(self.loading_fill, 0.5, Vec4(1, 1, 1, 0), Vec4(1, 1, 1, 1)),
+                LerpColorScaleInterval(self.status_text, 0.5, Vec4(0.7, 0.7, 0.7, 0), Vec4(0.7, 0.7, 0.7, 1))
             ),
             Func(self.cleanup),
             Func(self.show_main_menu)
@@ -200,6 +206,8 @@ class SplashScreen:
         """Clean up splash screen resources"""
         if hasattr(self, 'mouse_task'):
             self.game.taskMgr.remove(self.mouse_task)
+        if hasattr(self, 'progress_task'):
+            self.game.taskMgr.remove(self.progress_task)
         for element in self.elements:
             element.removeNode()
         self.elements.clear()
@@ -1,129 +1,11 @@
 from panda3d.core import Point3, Vec3, NodePath, CollisionNode, CollisionBox, CollisionSphere, BitMask32
 from panda3d.core import TextureStage, Texture, CardMaker
 import random
-import os
-import sys
-import threading
 
 class Target:
-    # Кэш для текстур
-    texture_cache = {}
-    # Флаг, указывающий загружена ли категория
-    category_loaded = False
-    # Текущая загруженная категория
-    current_category = None
-    
     # Базовые текстуры для обычного режима - манекены без текстур
     TARGET_TEXTURES = []
 
-    @staticmethod
-    def normalize_path(path):
-        """Преобразует путь в формат, который понимает Panda3D"""
-        # Заменяем обратные слеши на прямые
-        path = path.replace('\\', '/')
-        # Если путь начинается с буквы диска (например, c:/), 
-        # преобразуем его в формат /c/
-        if len(path) > 1 and path[1] == ':':
-            path = '/' + path[0].lower() + path[2:]
-        return path
-    
-    @staticmethod
-    def get_base_path():
-        """Get the base path for resources, handling both development and compiled environments"""
-        if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
-            # Если запущено как exe
-            base = os.path.dirname(sys.executable)
-        else:
-            # Если запущено в режиме разработки
-            base = os.path.dirname(os.path.abspath(__file__))
-        # Сразу нормализуем базовый путь
-        return Target.normalize_path(base)
-    
-    @staticmethod
-    def get_images_from_category(category):
-        # Получаем базовый путь (уже нормализованный)
-        base_path = Target.get_base_path()
-        # Собираем путь к категории, используя прямые слеши
-        category_path = f"{base_path}/images/nsfw/{category}"
-        print(f"Ищем изображения в: {category_path}")
-        
-        # Для проверки существования используем Windows-путь
-        windows_path = category_path
-        if windows_path.startswith('/'):
-            windows_path = windows_path[1].upper() + ':' + windows_path[2:]
-        
-        if not os.path.exists(windows_path):
-            print(f"Путь к категории не существует: {category_path}")
-            # Попробуем поискать в родительской директории
-            parent_path = os.path.dirname(os.path.dirname(base_path))
-            category_path = f"{Target.normalize_path(parent_path)}/images/nsfw/{category}"
-            windows_path = category_path
-            if windows_path.startswith('/'):
-                windows_path = windows_path[1].upper() + ':' + windows_path[2:]
-            
-            print(f"Пробуем альтернативный путь: {category_path}")
-            if not os.path.exists(windows_path):
-                print(f"Альтернативный путь тоже не существует")
-                return []
-            
-        valid_extensions = ['.png', '.jpg', '.jpeg']
-        images = []
-        
-        try:
-            files = os.listdir(windows_path)
-            print(f"Найдено {len(files)} файлов в категории")
-            for file in files:
-                if any(file.lower().endswith(ext) for ext in valid_extensions):
-                    # Создаем путь в формате Panda3D
-                    full_path = f"{category_path}/{file}"
-                    images.append(full_path)
-                    print(f"Добавлено изображение: {full_path}")
-        except Exception as e:
-            print(f"Ошибка при чтении директории {category_path}: {e}")
-                
-        return images if images else []
-
-    @staticmethod
-    def preload_category(game, category):
-        """Предварительно загружает все текстуры из категории"""
-        if Target.current_category == category and Target.category_loaded:
-            return
-
-        Target.category_loaded = False
-        Target.current_category = category
-        
-        # Очищаем старый кэш
-        Target.texture_cache.clear()
-        
-        # Загружаем текстуры из NSFW категории
-        category_images = Target.get_images_from_category(category)
-        for image_path in category_images:
-            try:
-                tex = game.loader.loadTexture(Target.normalize_path(image_path))
-                if tex:
-                    Target.texture_cache[Target.normalize_path(image_path)] = tex
-            except:
-                print(f"Error preloading texture: {image_path}")
-        
-        Target.category_loaded = True
-        print(f"Preloaded {len(Target.texture_cache)} textures for category: {category}")
-
-    def load_texture(self, texture_path):
-        """Загружает текстуру с использованием кэша"""
-        normalized_path = Target.normalize_path(texture_path)
-        
-        if normalized_path in Target.texture_cache:
-            return Target.texture_cache[normalized_path]
-        
-        try:
-            tex = self.game.loader.loadTexture(normalized_path)
-            if tex:
-                Target.texture_cache[normalized_path] = tex
-                return tex
-        except Exception as e:
-            print(f"Ошибка загрузки текстуры {normalized_path}: {e}")
-        return None
-
     def __init__(self, game, pos):
         self.game = game
         self.position = pos
@@ -131,22 +13,50 @@ class Target:
         self.current_hp = self.max_hp
         self.is_active = True
         self.texture_path = None
+        self.shown_texture = None  # путь, который карточка держит в TextureCatalog
+        self.restore_task = None
         
         # Проверяем режим отображения
         show_images = self.game.settings.get('show_target_images', True)
         if show_images:
-            category = self.game.settings.get('nsfw_category', 'furry')
-            if not Target.category_loaded or Target.current_category != category:
-                Target.preload_category(game, category)
-            
             # Выбираем текстуру из NSFW категории
-            category_images = self.get_images_from_category(category)
-            if category_images:
-                self.texture_path = random.choice(category_images)
+            self.choose_texture()
                 
         self.create_model()
         self.update_visibility()
 
+    def choose_texture(self):
+        """Выбирает случайную картинку категории (список файлов кэширует TextureCatalog)"""
+        category = self.game.settings.get('nsfw_category', 'furry')
+        category_images = self.game.texture_catalog.category_images(category)
+        if category_images:
+            self.texture_path = random.choice(category_images)
+
+    def apply_texture(self):
+        """Ставит картинку на карточку; пока она грузится в фоне - заглушку"""
+        catalog = self.game.texture_catalog
+        if self.shown_texture != self.texture_path:
+            self.release_texture()
+            catalog.hold(self.texture_path)
+            self.shown_texture = self.texture_path
+        tex = catalog.request(self.texture_path, self.on_texture_loaded)
+        self.visual.setTexture(tex)
+        self.visual.setTransparency(1)  # 1 = M_alpha
+        self.visual.setBin("transparent", 0)
+        self.visual.setDepthWrite(False)
+
+    def release_texture(self):
+        """Снимает картинку с карточки, чтобы каталог мог выгрузить ее из памяти"""
+        if self.shown_texture is not None:
+            self.game.texture_catalog.release(self.shown_texture)
+            self.shown_texture = None
+            self.visual.clearTexture()
+
+    def on_texture_loaded(self, path, tex):
+        # За время загрузки манекен мог сменить картинку, спрятаться в пул или быть удален
+        if path == self.shown_texture and not self.model.isEmpty():
+            self.visual.setTexture(tex)
+
     def update_visibility(self):
         """Обновляет видимость манекена в зависимости от настроек"""
         show_images = self.game.settings.get('show_target_images', True)
@@ -179,7 +89,7 @@ class Target:
         # Create root node
         self.model = NodePath("target_root")
         self.model.setPos(self.position)
-        self.model.reparentTo(self.game.render)
+        self.model.reparentTo(self.game.targets_root)
         
         # Create visual representation (card with texture)
         cm = CardMaker('card')
@@ -188,15 +98,7 @@ class Target:
         
         # Load and apply texture only if we have one
         if self.texture_path:
-            try:
-                tex = self.load_texture(self.texture_path)
-                if tex:
-                    self.visual.setTexture(tex)
-                    self.visual.setTransparency(1)  # 1 = M_alpha
-                    self.visual.setBin("transparent", 0)
-                    self.visual.setDepthWrite(False)
-            except:
-                print(f"Error loading texture: {self.texture_path}")
+            self.apply_texture()
         
         # Create collision geometry
         # Head (sphere)
@@ -240,48 +142,73 @@ class Target:
         self.model.lookAt(0, 0, 0)
         self.model.setH(self.model.getH() + 180)  # Разворачиваем на 180 градусов
 
+        # Ссылка с узла на объект (по ней попадание находит манекен) и запись в сетку выстрелов
+        self.model.setPythonTag('target', self)
+        self.game.target_index.insert(self)
+
+    def set_position(self, pos):
+        """Перемещает манекен и обновляет его место в сетке выстрелов"""
+        self.position = pos
+        self.model.setPos(pos)
+        if self.is_active:
+            self.game.target_index.update(self)
+
     def destroy(self):
+        self.game.target_index.remove(self)
         if hasattr(self, 'model') and self.model:
+            self.release_texture()
+            self.model.clearPythonTag('target')
             self.model.removeNode()
 
-    def respawn(self):
+    def deactivate(self):
+        """Прячет манекен: узлы остаются в сцене, но не рисуются и не ловят выстрелы"""
         self.is_active = False
         # Скрываем все части манекена и отключаем коллизии
         self.visual.hide()
         for np in [self.head_np, self.body_np, self.left_arm_np, self.right_arm_np, self.legs_np]:
             np.hide()
         self.disable_collisions()
+        self.release_texture()
+        self.game.target_index.remove(self)
+
+    def respawn(self):
+        self.deactivate()
         
         # Через 3 секунды восстанавливаем манекен
-        taskMgr.doMethodLater(3.0, self.restore_target, 'restore_target')
+        self.restore_task = taskMgr.doMethodLater(3.0, self.restore_target, 'restore_target')
 
     def restore_target(self, task):
+        self.restore_task = None
+        self.activate()
+        return task.done
+
+    def activate(self, pos=None):
+        """Возвращает манекен в игру с полным здоровьем (и на новую позицию, если задана)"""
+        if pos is not None:
+            self.position = pos
+            self.model.setPos(pos)
+            # Поворачиваем манекен лицом к игроку
+            self.model.lookAt(0, 0, 0)
+            self.model.setH(self.model.getH() + 180)
         self.current_hp = self.max_hp
         self.is_active = True
+        self.visual.setColorScale(1, 1, 1, 1)
         
         # Выбираем новую текстуру только если включен режим изображений
         show_images = self.game.settings.get('show_target_images', True)
         if show_images:
-            category = self.game.settings.get('nsfw_category', 'furry')
-            category_images = self.get_images_from_category(category)
-            
-            if category_images:
-                self.texture_path = random.choice(category_images)
-                tex = self.load_texture(self.texture_path)
-                if tex:
-                    self.visual.setTexture(tex)
-                    self.visual.setTransparency(1)
-                    self.visual.setBin("transparent", 0)
-                    self.visual.setDepthWrite(False)
+            self.choose_texture()
+            if self.texture_path:
+                self.apply_texture()
         
         # Показываем все части и включаем коллизии
         self.visual.show()
         for np in [self.head_np, self.body_np, self.left_arm_np, self.right_arm_np, self.legs_np]:
             np.show()
         self.enable_collisions()
+        self.game.target_index.insert(self)
         
         self.update_visibility()
-        return task.done
 
     def take_damage(self, damage):
         if not self.is_active:
@@ -340,3 +267,60 @@ class Target:
                 return True, hit_pos, damage
                 
         return False, None, 0
+
+
+class TargetPool:
+    """Готовые манекены, которые переиспользуются вместо пересоздания.
+
+    Убитый манекен прячется (deactivate) и ждет в пуле; новый берется оттуда и
+    просто переставляется. Если свободных нет - создается новый (промах пула).
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.free = []
+        self.created = 0
+        self.hits = 0
+        self.misses = 0
+
+    def prebuild(self, count):
+        """Дозаполняет пул, чтобы свободных манекенов было не меньше count"""
+        while len(self.free) < count:
+            target = Target(self.game, Point3(0, 0, -100))  # под картой, до первого acquire
+            target.deactivate()
+            self.free.append(target)
+            self.created += 1
+
+    def acquire(self, pos):
+        if self.free:
+            target = self.free.pop()
+            target.activate(pos)
+            self.hits += 1
+        else:
+            # Новый манекен уже готов: конструктор ставит его, выбирает картинку и пишет в сетку
+            target = Target(self.game, pos)
+            self.created += 1
+            self.misses += 1
+        return target
+
+    def release(self, target):
+        if target in self.free:
+            return
+        if target.restore_task is not None:
+            target.restore_task.remove()  # отложенное восстановление после respawn больше не нужно
+            target.restore_task = None
+        target.deactivate()
+        self.free.append(target)
+
+    def destroy(self):
+        for target in self.free:
+            target.destroy()
+        self.free.clear()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'created': self.created,
+            'free': len(self.free),
+        }
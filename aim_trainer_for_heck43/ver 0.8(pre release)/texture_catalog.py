@@ -0,0 +1,202 @@
+from panda3d.core import Texture, TexturePool, Filename, PNMImageHeader, Thread
+from collections import OrderedDict, deque
+import os
+import sys
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+# Сколько памяти (МБ) могут занимать загруженные картинки манекенов
+TEXTURE_BUDGET_MB = 256
+TEXTURE_TASK_CHAIN = 'texture_loading'
+# Заглушка на карточке, пока картинка грузится: полупрозрачный серый
+PLACEHOLDER_COLOR = (0.6, 0.6, 0.6, 0.35)
+
+
+def get_base_path():
+    """Папка игры: рядом с exe или с исходниками"""
+    if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
+        # Если запущено как exe
+        return os.path.dirname(sys.executable)
+    # Если запущено в режиме разработки
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+class TextureCatalog:
+    """Картинки манекенов: список файлов категории и загруженные текстуры.
+
+    Папка категории сканируется один раз и пересканируется, только если
+    у нее поменялось время изменения. Текстуры грузятся в отдельном потоке
+    (task chain Panda3D); до окончания загрузки request отдает заглушку, а
+    готовая текстура передается в callback в главном потоке. Загруженные
+    текстуры лежат в LRU-кэше: при превышении бюджета памяти давно не
+    использованные выгружаются. Картинки, которые сейчас на карточках манекенов
+    (hold/release), не выгружаются: память под ними все равно занята.
+    """
+
+    def __init__(self, base, budget_mb=TEXTURE_BUDGET_MB):
+        self.base = base
+        self.budget = budget_mb * 1024 * 1024
+        self.scans = {}  # папка -> (mtime, [пути к картинкам])
+        self.directories = {}  # категория -> папка
+        self.textures = OrderedDict()  # путь -> Texture, последние использованные в конце
+        self.sizes = {}  # путь -> байт в памяти
+        self.used = 0
+        self.waiting = {}  # путь -> [callback(path, texture)]
+        self.pending = {}  # путь -> ожидаемый размер в памяти, пока грузится
+        self.pending_bytes = 0
+        self.loaded = deque()  # (путь, Texture или None) от потока загрузки
+        self.evictions = 0
+        self.in_use = {}  # путь -> сколько карточек манекенов его показывают
+
+        self.placeholder = Texture('target_placeholder')
+        self.placeholder.setup2dTexture(1, 1, Texture.T_unsigned_byte, Texture.F_rgba)
+        r, g, b, a = (int(c * 255) for c in PLACEHOLDER_COLOR)
+        self.placeholder.setRamImageAs(bytes((r, g, b, a)), 'RGBA')
+
+        # Без поддержки потоков chain все равно работает, просто в главном потоке
+        threads = 1 if Thread.isThreadingSupported() else 0
+        base.taskMgr.setupTaskChain(TEXTURE_TASK_CHAIN, numThreads=threads, threadPriority=0)
+        base.taskMgr.add(self.deliver, 'texture_catalog')
+
+    def category_directory(self, category):
+        """Папка категории: images/nsfw/<категория> у игры или на два уровня выше"""
+        directory = self.directories.get(category)
+        if directory is None:
+            base_path = get_base_path()
+            for root in (base_path, os.path.dirname(os.path.dirname(base_path))):
+                candidate = os.path.join(root, 'images', 'nsfw', category)
+                if os.path.isdir(candidate):
+                    directory = candidate
+                    break
+            else:
+                print(f"Папка категории не найдена: images/nsfw/{category}")
+                return None
+            self.directories[category] = directory
+        return directory
+
+    def category_images(self, category):
+        directory = self.category_directory(category)
+        if directory is None:
+            return []
+        return self.images(directory)
+
+    def images(self, directory):
+        """Картинки в папке (отсортированы); пересканируется, только если папка изменилась"""
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            self.scans.pop(directory, None)
+            return []
+        scan = self.scans.get(directory)
+        if scan is not None and scan[0] == mtime:
+            return scan[1]
+        try:
+            files = sorted(os.listdir(directory))
+        except OSError as e:
+            print(f"Ошибка при чтении директории {directory}: {e}")
+            return []
+        images = [os.path.join(directory, name) for name in files if name.lower().endswith(IMAGE_EXTENSIONS)]
+        print(f"Найдено {len(images)} изображений в {directory}")
+        self.scans[directory] = (mtime, images)
+        return images
+
+    def request(self, path, callback=None):
+        """Текстура картинки, если она уже загружена; иначе заглушка и загрузка в фоне,
+        по окончании которой вызывается callback(path, texture)"""
+        texture = self.textures.get(path)
+        if texture is not None:
+            self.textures.move_to_end(path)
+            return texture
+        callbacks = self.waiting.get(path)
+        if callbacks is None:
+            callbacks = self.waiting[path] = []
+            self.pending[path] = self.expected_size(path)
+            self.pending_bytes += self.pending[path]
+            self.base.taskMgr.add(self.load_task, 'load_texture', taskChain=TEXTURE_TASK_CHAIN,
+                                  extraArgs=[path], appendTask=True)
+        if callback is not None:
+            callbacks.append(callback)
+        return self.placeholder
+
+    def hold(self, path):
+        """Картинка показана на карточке: пока ее держат, из кэша она не выгружается"""
+        self.in_use[path] = self.in_use.get(path, 0) + 1
+
+    def release(self, path):
+        count = self.in_use.get(path, 0) - 1
+        if count > 0:
+            self.in_use[path] = count
+        else:
+            self.in_use.pop(path, None)
+
+    def expected_size(self, path):
+        """Сколько байт займет картинка в памяти - по заголовку файла, без декодирования"""
+        header = PNMImageHeader()
+        if header.readHeader(Filename.fromOsSpecific(path)):
+            return header.getXSize() * header.getYSize() * header.getNumChannels()
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def prefetch(self, category):
+        """Начинает фоновую загрузку картинок категории (сколько поместится в бюджет).
+        Уже поставленные в очередь считаются занятыми, иначе вся категория
+        ставится разом, пока ни одна текстура еще не загрузилась"""
+        for path in self.category_images(category):
+            if path in self.textures or path in self.waiting:
+                continue
+            if self.used + self.pending_bytes >= self.budget:
+                break
+            self.request(path)
+
+    def load_task(self, path, task):
+        # Поток загрузки: только чтение файла, сцену не трогаем
+        texture = TexturePool.loadTexture(Filename.fromOsSpecific(path))
+        self.loaded.append((path, texture))
+        return task.done
+
+    def deliver(self, task):
+        """Главный поток: кладет загруженные текстуры в кэш и раздает ожидающим"""
+        while self.loaded:
+            path, texture = self.loaded.popleft()
+            callbacks = self.waiting.pop(path, [])
+            self.pending_bytes -= self.pending.pop(path, 0)
+            if not texture:
+                print(f"Ошибка загрузки текстуры {path}")
+                continue
+            self.store(path, texture)
+            for callback in callbacks:
+                callback(path, texture)
+        return task.cont
+
+    def store(self, path, texture):
+        size = texture.getExpectedRamImageSize()
+        self.textures[path] = texture
+        self.sizes[path] = size
+        self.used += size
+        # Выгружаем давно не использованные, кроме только что загруженной и показанных на карточках.
+        # Если выгрузить нечего, бюджет превышен честно: used показывает реальную память
+        while self.used > self.budget:
+            old_path = next((p for p in self.textures if p != path and p not in self.in_use), None)
+            if old_path is None:
+                break
+            old_texture = self.textures.pop(old_path)
+            self.used -= self.sizes.pop(old_path)
+            TexturePool.releaseTexture(old_texture)
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            'textures': len(self.textures),
+            'used_mb': self.used / (1024 * 1024),
+            'loading': len(self.waiting),
+            'in_use': len(self.in_use),
+            'evictions': self.evictions,
+        }
+
+    def clear(self):
+        for texture in self.textures.values():
+            TexturePool.releaseTexture(texture)
+        self.textures.clear()
+        self.sizes.clear()
+        self.used = 0
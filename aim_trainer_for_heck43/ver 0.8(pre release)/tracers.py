@@ -0,0 +1,89 @@
+from panda3d.core import GeomVertexArrayFormat, GeomVertexFormat, GeomVertexData, GeomLines, Geom, GeomNode
+from panda3d.core import InternalName, TransparencyAttrib, RenderModeAttrib, OmniBoundingVolume
+import numpy as np
+import time
+
+# Сколько следов пуль видно одновременно (новый след занимает место самого старого)
+TRACER_CAPACITY = 64
+TRACER_COLOR = (1.0, 1.0, 0.8, 0.5)  # Желтоватый цвет с прозрачностью
+TRACER_HOLD = 0.1  # секунды до начала исчезновения
+TRACER_FADE = 0.2  # длительность исчезновения
+TRACER_THICKNESS = 2.0
+
+
+class TracerBatch:
+    """Все следы пуль - один меш из capacity отрезков.
+
+    Концы и прозрачность следов лежат в массиве NumPy, который раз в кадр
+    копируется в динамический вершинный буфер; рисуется все одним вызовом.
+    Новые узлы и интервалы на выстрел не создаются.
+    """
+
+    def __init__(self, parent, capacity=TRACER_CAPACITY):
+        self.capacity = capacity
+        self.next = 0
+        self.start = np.zeros((capacity, 3), dtype=np.float32)
+        self.end = np.zeros((capacity, 3), dtype=np.float32)
+        self.born = np.full(capacity, -np.inf)
+        self.dirty = False  # буфер надо переписать, даже если живых следов нет
+        self.last_update_ms = 0.0
+        self.active = 0
+
+        # Вершина: позиция (3 float) + цвет (4 float), по две вершины на след
+        array_format = GeomVertexArrayFormat()
+        array_format.addColumn(InternalName.getVertex(), 3, Geom.NT_float32, Geom.C_point)
+        array_format.addColumn(InternalName.getColor(), 4, Geom.NT_float32, Geom.C_color)
+        vertex_format = GeomVertexFormat.registerFormat(GeomVertexFormat(array_format))
+        self.vdata = GeomVertexData('tracers', vertex_format, Geom.UHDynamic)
+        self.vdata.setNumRows(capacity * 2)
+
+        lines = GeomLines(Geom.UHStatic)
+        for i in range(capacity):
+            lines.addVertices(i * 2, i * 2 + 1)
+        geom = Geom(self.vdata)
+        geom.addPrimitive(lines)
+        node = GeomNode('bullet_traces')
+        node.addGeom(geom)
+        # Следы разбросаны по всей карте - не пересчитываем bounds буфера каждый кадр
+        node.setBounds(OmniBoundingVolume())
+        node.setFinal(True)
+
+        self.root = parent.attachNewNode(node)
+        self.root.setTransparency(TransparencyAttrib.MAlpha)
+        self.root.setAttrib(RenderModeAttrib.make(RenderModeAttrib.MUnchanged, TRACER_THICKNESS))
+        self.root.setDepthWrite(False)
+        self.root.setLightOff()
+        self.write(0.0)
+
+    def add(self, start_pos, end_pos, now):
+        i = self.next
+        self.next = (self.next + 1) % self.capacity
+        self.start[i] = (start_pos.getX(), start_pos.getY(), start_pos.getZ())
+        self.end[i] = (end_pos.getX(), end_pos.getY(), end_pos.getZ())
+        self.born[i] = now
+        self.dirty = True
+
+    def update(self, now):
+        """Пересчитывает прозрачность всех следов и переписывает буфер одним куском"""
+        started = time.perf_counter()
+        age = now - self.born
+        visible = age < TRACER_HOLD + TRACER_FADE
+        self.active = int(visible.sum())
+        if self.active or self.dirty:
+            self.write(now)
+            self.dirty = bool(self.active)
+        self.last_update_ms = (time.perf_counter() - started) * 1000
+
+    def write(self, now):
+        age = now - self.born
+        alpha = TRACER_COLOR[3] * np.clip(1 - (age - TRACER_HOLD) / TRACER_FADE, 0, 1)
+
+        data = np.frombuffer(memoryview(self.vdata.modifyArray(0)), dtype=np.float32).reshape(self.capacity, 2, 7)
+        data[:, 0, :3] = self.start
+        data[:, 1, :3] = self.end
+        data[:, :, 3:6] = TRACER_COLOR[:3]
+        data[:, :, 6] = alpha[:, None]
+
+    def clear(self):
+        self.born[:] = -np.inf
+        self.dirty = True
@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+# Без окна: pygame рисует в память (нужно задать до импорта pygame)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from settings import CELL_SIZE, TEAM_BLUE, TEAM_RED, ENGINE
+from engines import ENGINES, create_engine, create_grids
+from render import CellRenderer
+from patterns import load_pattern_file, place_pattern
+
+# Замер движков "Жизни" без полноэкранного окна.
+# Пример: python bench.py --sizes 128x72,256x144 --densities 0.2,0.5 --generations 200
+
+# Пиковая память меряется отдельным коротким прогоном: tracemalloc заметно
+# замедляет шаг, поэтому под ним время не считается
+MEMORY_GENERATIONS = 10
+
+
+def parse_sizes(text):
+    sizes = []
+    for item in text.split(","):
+        cols, rows = item.lower().split("x")
+        sizes.append((int(cols), int(rows)))
+    return sizes
+
+
+def random_board(cols, rows, density, mode, rng):
+    """Случайная доска заданной плотности; в битве живые клетки делятся между командами поровну"""
+    grid, age_grid = create_grids(cols, rows)
+    alive = rng.random((cols, rows)) < density
+    if mode == "classic":
+        grid[alive] = 1
+    else:
+        grid[alive] = rng.choice([TEAM_BLUE, TEAM_RED], size=int(alive.sum()))
+    age_grid[alive] = 1
+    return grid, age_grid
+
+
+def scene_board(cols, rows, scene):
+    """Доска с сохраненной сценой (RLE / plaintext) по центру"""
+    grid, age_grid = create_grids(cols, rows)
+    w, h = scene.shape
+    place_pattern(grid, scene, (cols - w) // 2, (rows - h) // 2)
+    age_grid[grid != 0] = 1
+    return grid, age_grid
+
+
+def run_case(engine_name, mode, cols, rows, density, generations, cell_size, seed, scene=None):
+    """Прогоняет одну конфигурацию и возвращает словарь с результатами"""
+    rng = np.random.default_rng(seed)
+    if scene is not None:
+        grid, age_grid = scene_board(cols, rows, scene)
+    else:
+        grid, age_grid = random_board(cols, rows, density, mode, rng)
+    engine = create_engine(engine_name, seed=seed)
+    renderer = CellRenderer(cols, rows, cell_size)
+    target = pygame.Surface((cols * cell_size, rows * cell_size))
+
+    def run_generation(phases):
+        t0 = time.perf_counter()
+        if mode == "classic":
+            engine.step(grid, age_grid)
+        else:
+            engine.step_battle(grid, age_grid)
+        t1 = time.perf_counter()
+        renderer.invalidate(getattr(engine, "redraw", None) if mode == "classic" else None)
+        renderer.color_map(grid, age_grid, pulse=0.85)
+        t2 = time.perf_counter()
+        renderer.blit(target, cell_size, 0)
+        t3 = time.perf_counter()
+        phases["step"] += t1 - t0
+        phases["color_map"] += t2 - t1
+        phases["blit"] += t3 - t2
+
+    phases = {"step": 0.0, "color_map": 0.0, "blit": 0.0}
+    started = time.perf_counter()
+    for generation in range(generations):
+        run_generation(phases)
+    elapsed = time.perf_counter() - started
+    alive_at_end = int(np.count_nonzero(grid))
+
+    # Память - после замера времени, на нескольких поколениях с того же состояния
+    tracemalloc.start()
+    for generation in range(MEMORY_GENERATIONS):
+        run_generation({"step": 0.0, "color_map": 0.0, "blit": 0.0})
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    engine.close()
+
+    return {
+        "engine": engine_name,
+        "mode": mode,
+        "cols": cols,
+        "rows": rows,
+        "density": density,
+        "generations": generations,
+        "gens_per_sec": generations / phases["step"] if phases["step"] else float("inf"),
+        "frames_per_sec": generations / elapsed if elapsed else float("inf"),
+        "peak_memory_mb": peak / 2 ** 20,
+        "phases_ms": {name: total / generations * 1000 for name, total in phases.items()},
+        "alive_at_end": alive_at_end,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер движков игры \"Жизнь\" без окна")
+    parser.add_argument("--engines", default=ENGINE,
+                        help=f"движки через запятую ({', '.join(ENGINES)})")
+    parser.add_argument("--modes", default="classic,battle", help="режимы через запятую")
+    parser.add_argument("--sizes", default="128x72,256x144", help="размеры поля COLSxROWS через запятую")
+    parser.add_argument("--densities", default="0.2,0.5", help="доли живых клеток через запятую")
+    parser.add_argument("--generations", type=int, default=200)
+    parser.add_argument("--cell-size", type=int, default=CELL_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scene", help="файл RLE / .cells вместо случайной доски (плотность не используется)")
+    parser.add_argument("--output", default="bench_report.json", help="куда записать JSON-отчет")
+    args = parser.parse_args(argv)
+
+    scene = load_pattern_file(args.scene)[1] if args.scene else None
+    densities = [0.0] if scene is not None else list(map(float, args.densities.split(",")))
+
+    pygame.init()
+    results = []
+    for engine_name in args.engines.split(","):
+        for mode in args.modes.split(","):
+            for cols, rows in parse_sizes(args.sizes):
+                for density in densities:
+                    result = run_case(engine_name, mode, cols, rows, density,
+                                      args.generations, args.cell_size, args.seed, scene)
+                    results.append(result)
+                    phases = result["phases_ms"]
+                    print(f"{engine_name:>9} {mode:>7} {cols}x{rows} p={density:.2f}: "
+                          f"{result['gens_per_sec']:9.1f} пок/с, "
+                          f"шаг {phases['step']:.2f} мс, цвета {phases['color_map']:.2f} мс, "
+                          f"вывод {phases['blit']:.2f} мс, пик {result['peak_memory_mb']:.1f} МБ")
+
+    report = {
+        "settings": vars(args),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"Отчет сохранен в {args.output}")
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
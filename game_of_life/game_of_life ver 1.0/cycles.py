@@ -0,0 +1,143 @@
+from collections import deque
+
+import numpy as np
+
+from settings import CYCLE_HISTORY
+
+# Поиск циклов в классическом режиме.
+# Хэш поля (Зобрист: XOR случайных ключей живых клеток) обновляется только по изменившимся
+# клеткам. Когда хэш повторился, следующий период записывается кадрами; если поле вернулось
+# в исходное состояние - цикл подтвержден, и дальше кадры проигрываются без расчета,
+# пока игрок не изменит поле.
+
+SEARCH = "search"
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CycleDetector:
+    def __init__(self, history=CYCLE_HISTORY):
+        self.history = history
+        self.shape = None
+        self.reset()
+
+    def reset(self):
+        """Забывает историю (после правки поля, смены режима или движка)"""
+        self.state = SEARCH
+        self.generation = 0
+        self.hash = None
+        self.previous = None  # поле после прошлого шага: для правок и обновления хэша
+        self.hashes = deque()
+        self.seen = {}  # хэш -> поколение
+        self.period = None
+        self.frames = []
+        self.replay_index = 0
+        self.laps = 0
+
+    def prepare(self, shape):
+        if self.shape == shape:
+            return
+        self.shape = shape
+        rng = np.random.default_rng(0)
+        size = shape[0] * shape[1]
+        # Ключи для значений клетки 0, 1, 2; у пустой клетки ключ нулевой
+        self.keys = rng.integers(1, 2 ** 63, size=(3, size), dtype=np.uint64)
+        self.keys[0] = 0
+        self.cells = np.arange(size)
+        self.reset()
+
+    def full_hash(self, grid):
+        flat = grid.ravel()
+        return int(np.bitwise_xor.reduce(self.keys[flat, self.cells]))
+
+    def update_hash(self, grid):
+        """Меняет хэш только на клетки, отличающиеся от прошлого поколения"""
+        previous, current = self.previous.ravel(), grid.ravel()
+        changed = np.flatnonzero(previous != current)
+        if len(changed):
+            self.hash ^= int(np.bitwise_xor.reduce(self.keys[previous[changed], changed]))
+            self.hash ^= int(np.bitwise_xor.reduce(self.keys[current[changed], changed]))
+
+    def remember(self, grid):
+        """Кладет хэш поколения в ограниченную историю; возвращает поколение с тем же хэшем"""
+        earlier = self.seen.get(self.hash)
+        self.hashes.append((self.hash, self.generation))
+        self.seen[self.hash] = self.generation
+        if len(self.hashes) > self.history:
+            old_hash, old_generation = self.hashes.popleft()
+            if self.seen.get(old_hash) == old_generation:
+                del self.seen[old_hash]
+        return earlier
+
+    def advance(self, step, grid, age_grid):
+        """Следующее поколение: расчет функцией step(grid, age_grid) или кадр из кэша цикла"""
+        self.prepare(grid.shape)
+
+        # Игрок что-то поменял с прошлого поколения - начинаем поиск заново
+        if self.previous is not None and not np.array_equal(grid, self.previous):
+            self.reset()
+
+        if self.state == REPLAY:
+            self.replay(grid, age_grid)
+            return
+
+        if self.previous is None:
+            self.previous = grid.copy()
+            self.hash = self.full_hash(grid)
+            self.remember(grid)
+
+        step(grid, age_grid)
+        self.generation += 1
+        self.update_hash(grid)
+        self.previous[...] = grid
+
+        if self.state == SEARCH:
+            earlier = self.remember(grid)
+            if earlier is not None:
+                # Хэш повторился: записываем один период и проверяем, что поле вернулось
+                self.state = RECORD
+                self.period = self.generation - earlier
+                self.frames = [(grid.copy(), age_grid.copy())]
+        elif self.state == RECORD:
+            if len(self.frames) < self.period:
+                self.frames.append((grid.copy(), age_grid.copy()))
+            elif np.array_equal(grid, self.frames[0][0]):
+                self.start_replay(age_grid)
+            else:
+                # Совпадение хэшей оказалось случайным
+                self.state = SEARCH
+                self.frames = []
+                self.period = None
+
+    def start_replay(self, age_grid):
+        # Клетки, живые во всех кадрах цикла, продолжают стареть на период за каждый круг
+        self.steady = np.logical_and.reduce([frame != 0 for frame, _ in self.frames])
+        self.state = REPLAY
+        self.replay_index = 1 % self.period
+        self.laps = 1 if self.replay_index == 0 else 0
+        first_age = self.frames[0][1]
+        self.age_offset = age_grid - first_age  # возраст уже успел уйти на один период
+
+    def replay(self, grid, age_grid):
+        frame, frame_age = self.frames[self.replay_index]
+        grid[...] = frame
+        age_grid[...] = frame_age
+        age_grid += self.steady * (self.age_offset + self.laps * self.period)
+        self.previous = frame
+        self.generation += 1
+        self.replay_index += 1
+        if self.replay_index == self.period:
+            self.replay_index = 0
+            self.laps += 1
+
+    @property
+    def replaying(self):
+        return self.state == REPLAY
+
+    def status(self):
+        """Строка для панели статистики"""
+        if self.state == REPLAY:
+            return "натюрморт (без расчета)" if self.period == 1 else f"цикл {self.period} (без расчета)"
+        if self.state == RECORD:
+            return f"цикл {self.period}?"
+        return ""
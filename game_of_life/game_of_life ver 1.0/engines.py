@@ -0,0 +1,586 @@
+import os
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from settings import (EMPTY, TEAM_BLUE, TEAM_RED, GRID_DTYPE, AGE_DTYPE, WORKERS, TILE_SIZE,
+                      TILED_FULL_STEP_RATIO)
+from hashlife import Universe
+
+# Движки расчета поколений.
+# Каждый движок меняет grid и age_grid на месте (форма (COLS, ROWS), поле замкнуто в тор),
+# поэтому игровой цикл может переключать их на лету и сверять результаты.
+
+# Смещения восьми соседей в фиксированном порядке
+NEIGHBOR_OFFSETS = np.array([(-1, -1), (-1, 0), (-1, 1),
+                             (0, -1), (0, 1),
+                             (1, -1), (1, 0), (1, 1)])
+
+
+def create_grids(cols, rows):
+    """Создает пустые сетки клеток и возраста"""
+    grid = np.zeros((cols, rows), dtype=GRID_DTYPE)  # 0 - пусто, 1 - синие, 2 - красные
+    age_grid = np.zeros((cols, rows), dtype=AGE_DTYPE)
+    return grid, age_grid
+
+
+def count_neighbors(grid, x, y):
+    cols, rows = grid.shape
+    total = 0
+    for i in range(-1, 2):
+        for j in range(-1, 2):
+            row = (x + i + cols) % cols
+            col = (y + j + rows) % rows
+            total += int(grid[row, col])
+    total -= int(grid[x, y])
+    return total
+
+
+class ReferenceEngine:
+    """Эталонный движок: поклеточный обход на чистом Python"""
+
+    name = "reference"
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    def reset(self):
+        """Сбрасывает внутреннее состояние движка после очистки поля"""
+
+    def close(self):
+        """Освобождает ресурсы движка (процессы, общую память) перед заменой или выходом"""
+
+    def sync_ages(self, grid, age_grid):
+        """Доводит отложенный возраст клеток до точного значения"""
+
+    def step(self, grid, age_grid):
+        cols, rows = grid.shape
+        new_grid = grid.copy()
+        for i in range(cols):
+            for j in range(rows):
+                neighbors = count_neighbors(grid, i, j)
+                if grid[i, j] == 1:
+                    if neighbors < 2 or neighbors > 3:
+                        new_grid[i, j] = 0
+                        age_grid[i, j] = 0
+                    else:
+                        age_grid[i, j] += 1
+                else:
+                    if neighbors == 3:
+                        new_grid[i, j] = 1
+                        age_grid[i, j] = 1
+        grid[...] = new_grid
+
+    def step_battle(self, grid, age_grid):
+        cols, rows = grid.shape
+        new_grid = grid.copy()
+
+        for i in range(cols):
+            for j in range(rows):
+                if grid[i, j] == EMPTY:
+                    continue
+
+                team = grid[i, j]
+                enemy_team = TEAM_RED if team == TEAM_BLUE else TEAM_BLUE
+
+                # Подсчет врагов вокруг
+                enemy_count = 0
+                for di in range(-1, 2):
+                    for dj in range(-1, 2):
+                        if di == 0 and dj == 0:
+                            continue
+                        ni = (i + di + cols) % cols
+                        nj = (j + dj + rows) % rows
+                        if grid[ni, nj] == enemy_team:
+                            enemy_count += 1
+
+                # Вычисляем шанс быть съеденным в зависимости от количества врагов
+                eat_chance = 0
+                if enemy_count >= 2:
+                    eat_chance = (enemy_count - 1) * 0.15  # 15% за каждого врага после первого
+
+                # Если клетку съели
+                if self.rng.random() < eat_chance:
+                    new_grid[i, j] = enemy_team
+                    age_grid[i, j] = 1
+                else:
+                    # Клетка стареет
+                    age_grid[i, j] += 1
+
+                    # Случайное распространение
+                    spread_chance = 0.05 + (age_grid[i, j] - 5) * 0.02  # Увеличиваем шанс с возрастом
+                    if age_grid[i, j] > 5 and self.rng.random() < spread_chance:
+                        # Выбор случайной соседней пустой клетки
+                        empty_neighbors = []
+                        for di in range(-1, 2):
+                            for dj in range(-1, 2):
+                                if di == 0 and dj == 0:
+                                    continue
+                                ni = (i + di + cols) % cols
+                                nj = (j + dj + rows) % rows
+                                if grid[ni, nj] == EMPTY:
+                                    empty_neighbors.append((ni, nj))
+
+                        if empty_neighbors:  # Если есть пустые соседние клетки
+                            ni, nj = empty_neighbors[self.rng.integers(len(empty_neighbors))]
+                            new_grid[ni, nj] = team
+                            age_grid[ni, nj] = 1
+
+        grid[...] = new_grid
+
+
+class NumpyEngine(ReferenceEngine):
+    """Векторизованный движок: соседи считаются срезами по тору, без цикла по клеткам"""
+
+    name = "numpy"
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.shape = None
+
+    def prepare(self, shape):
+        """Выделяет рабочие буферы один раз на размер поля"""
+        if self.shape == shape:
+            return
+        self.shape = shape
+        cols, rows = shape
+        self.padded = np.zeros((cols + 2, rows + 2), dtype=np.uint8)
+        self.neighbors = np.zeros(shape, dtype=np.uint8)
+        self.blue_neighbors = np.zeros(shape, dtype=np.uint8)
+        self.red_neighbors = np.zeros(shape, dtype=np.uint8)
+        self.alive = np.zeros(shape, dtype=bool)
+        self.born = np.zeros(shape, dtype=bool)
+        self.survive = np.zeros(shape, dtype=bool)
+        self.mask = np.zeros(shape, dtype=bool)
+
+    def count_neighbors(self, grid, out=None):
+        """Сумма восьми соседей для каждой клетки с замыканием краев"""
+        if out is None:
+            out = self.neighbors
+        padded = self.padded
+        # Копируем поле в центр и дописываем противоположные края (рамка в одну клетку)
+        padded[1:-1, 1:-1] = grid
+        padded[0, 1:-1] = grid[-1]
+        padded[-1, 1:-1] = grid[0]
+        padded[:, 0] = padded[:, -2]
+        padded[:, -1] = padded[:, 1]
+
+        np.add(padded[:-2, :-2], padded[:-2, 1:-1], out=out)
+        out += padded[:-2, 2:]
+        out += padded[1:-1, :-2]
+        out += padded[1:-1, 2:]
+        out += padded[2:, :-2]
+        out += padded[2:, 1:-1]
+        out += padded[2:, 2:]
+        return out
+
+    def step(self, grid, age_grid):
+        self.prepare(grid.shape)
+        neighbors = self.count_neighbors(grid)
+        alive, born, survive, mask = self.alive, self.born, self.survive, self.mask
+
+        np.equal(grid, 1, out=alive)
+
+        # Рождение: пустая клетка ровно с тремя соседями
+        np.equal(neighbors, 3, out=born)
+        np.logical_and(born, ~alive, out=born)
+
+        # Выживание: живая клетка с двумя или тремя соседями
+        np.equal(neighbors, 2, out=survive)
+        np.equal(neighbors, 3, out=mask)
+        np.logical_or(survive, mask, out=survive)
+        np.logical_and(survive, alive, out=survive)
+
+        # Возраст: выжившие стареют, родившиеся получают 1, умершие обнуляются
+        age_grid += survive
+        age_grid[born] = 1
+        np.logical_and(alive, ~survive, out=mask)
+        age_grid[mask] = 0
+
+        np.logical_or(survive, born, out=mask)
+        grid[...] = mask
+
+    def step_battle(self, grid, age_grid):
+        self.prepare(grid.shape)
+        cols, rows = self.shape
+
+        # Число соседей каждой команды
+        blue = grid == TEAM_BLUE
+        empty = grid == EMPTY
+        blue_neighbors = self.count_neighbors(blue, self.blue_neighbors)
+        red_neighbors = self.count_neighbors(grid == TEAM_RED, self.red_neighbors)
+        enemy_count = np.where(blue, red_neighbors, blue_neighbors)
+
+        # Все случайные числа поколения одним вызовом: съедение, распространение, выбор соседа
+        rolls = self.rng.random((3, cols, rows))
+
+        # Шанс быть съеденным: 15% за каждого врага после первого (при 0-1 враге порог <= 0)
+        eat_chance = enemy_count * 0.15 - 0.15
+        eaten = ~empty & (rolls[0] < eat_chance)
+        aging = ~empty & ~eaten
+
+        # Съеденная клетка переходит к врагу (TEAM_BLUE + TEAM_RED - team)
+        grid[eaten] = TEAM_BLUE + TEAM_RED - grid[eaten]
+        age_grid[eaten] = 1
+        age_grid += aging
+
+        # Распространение: шанс растет с возрастом
+        spread_chance = 0.05 + (age_grid - 5) * 0.02
+        spreading = aging & (age_grid > 5) & (rolls[1] < spread_chance)
+
+        xs, ys = np.nonzero(spreading)
+        if len(xs) == 0:
+            return
+
+        # Координаты восьми соседей каждого источника и какие из них были пусты
+        nx = (xs[None, :] + NEIGHBOR_OFFSETS[:, 0, None]) % cols
+        ny = (ys[None, :] + NEIGHBOR_OFFSETS[:, 1, None]) % rows
+        free = empty[nx, ny]
+        free_count = free.sum(axis=0)
+
+        # Случайный пустой сосед: первое направление, где накопленное число пустых превысило выбор
+        choice = (rolls[2][xs, ys] * free_count).astype(np.int64)
+        direction = np.argmax(np.cumsum(free, axis=0) > choice, axis=0)
+        has_free = free_count > 0
+        sources = np.arange(len(xs))
+        tx = nx[direction, sources][has_free]
+        ty = ny[direction, sources][has_free]
+        teams = grid[xs, ys][has_free]
+
+        # Спор за одну клетку решает порядок источников: как в эталонном обходе по строкам,
+        # побеждает последний записавший (первое вхождение в перевернутом порядке)
+        _, first_reversed = np.unique((tx * rows + ty)[::-1], return_index=True)
+        last = len(tx) - 1 - first_reversed
+        grid[tx[last], ty[last]] = teams[last]
+        age_grid[tx[last], ty[last]] = 1
+
+
+class HashLifeEngine(NumpyEngine):
+    """Разреженный движок классического режима: бесконечная вселенная HashLife.
+
+    grid - только окно просмотра во вселенную (без замыкания краев), его можно двигать
+    и проматывать поколения прыжками по step_size. Режим битвы считается как в NumpyEngine.
+    """
+
+    name = "hashlife"
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.universe = Universe()
+        self.view_x = 0
+        self.view_y = 0
+        self.step_size = 1
+        self.view = None  # Окно, которое движок последний раз положил в grid
+
+    def reset(self):
+        self.universe.clear()
+        self.view = None
+
+    def sync_edits(self, grid):
+        """Переносит во вселенную клетки, которые игрок изменил в окне"""
+        alive = grid == 1
+        if self.view is None:
+            self.view = np.zeros(grid.shape, dtype=np.uint8)
+        xs, ys = np.nonzero(alive != self.view)
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            self.universe.set_cell(self.view_x + x, self.view_y + y, alive[x, y])
+        self.view[...] = alive
+
+    def step(self, grid, age_grid):
+        self.sync_edits(grid)
+        self.universe.step(self.step_size)
+        new_view = self.universe.viewport(self.view_x, self.view_y, *grid.shape)
+
+        # Возраст как в классике: выжившие стареют, новые получают 1, пустые обнуляются
+        age_grid[...] = np.where(new_view, np.where(self.view, age_grid + 1, 1), 0)
+        grid[...] = new_view
+        self.view = new_view
+
+    def pan(self, dx, dy, grid, age_grid):
+        """Сдвигает окно просмотра на (dx, dy) клеток"""
+        self.sync_edits(grid)
+        self.view_x += dx
+        self.view_y += dy
+        cols, rows = grid.shape
+
+        # Возраст уехавших вместе с окном клеток сохраняем, пришедшие из-за края считаем новыми
+        shifted = np.zeros_like(age_grid)
+        src_x, dst_x = slice(max(dx, 0), cols + min(dx, 0)), slice(max(-dx, 0), cols + min(-dx, 0))
+        src_y, dst_y = slice(max(dy, 0), rows + min(dy, 0)), slice(max(-dy, 0), rows + min(-dy, 0))
+        shifted[dst_x, dst_y] = age_grid[src_x, src_y]
+
+        self.view = self.universe.viewport(self.view_x, self.view_y, cols, rows)
+        age_grid[...] = np.where(self.view, np.maximum(shifted, 1), 0)
+        grid[...] = self.view
+
+
+class TiledEngine(NumpyEngine):
+    """Классический режим только там, где что-то происходит.
+
+    Поле делится на плитки TILE_SIZE x TILE_SIZE. Считаются лишь плитки, изменившиеся в
+    прошлом поколении, и их соседи: если ни плитка, ни ее окрестность не менялись, не изменится
+    и она сама. Возраст в давно успокоившихся плитках копится в счетчике и дописывается,
+    когда плитка снова оживает (или по sync_ages). Битва считается как в NumpyEngine.
+    """
+
+    name = "tiled"
+
+    def __init__(self, seed=None, tile_size=TILE_SIZE):
+        super().__init__(seed)
+        self.tile_size = tile_size
+        self.tiles_shape = None
+
+    def prepare_tiles(self, grid):
+        if self.tiles_shape is not None and self.previous.shape == grid.shape:
+            return
+        cols, rows = grid.shape
+        size = self.tile_size
+        self.tiles_shape = (-(-cols // size), -(-rows // size))
+        # Границы плиток и индексы строк/столбцов плитки вместе с гало (с замыканием краев)
+        self.x_bounds = [(x, min(x + size, cols)) for x in range(0, cols, size)]
+        self.y_bounds = [(y, min(y + size, rows)) for y in range(0, rows, size)]
+        self.x_halo = [np.arange(x0 - 1, x1 + 1) % cols for x0, x1 in self.x_bounds]
+        self.y_halo = [np.arange(y0 - 1, y1 + 1) % rows for y0, y1 in self.y_bounds]
+        self.previous = grid.copy()
+        self.changed = np.ones(self.tiles_shape, dtype=bool)  # на первом шаге считаем все
+        self.quiet = np.zeros(self.tiles_shape, dtype=np.int64)  # поколений без изменений
+        self.idle = np.zeros(self.tiles_shape, dtype=np.int64)  # недописанный возраст
+        self.redraw = np.ones(self.tiles_shape, dtype=bool)  # плитки, которые надо перерисовать
+        self.populated = self.tiles_any(grid == 1)  # плитки с живыми клетками
+        self.active_ratio = 1.0
+
+    def reset(self):
+        self.tiles_shape = None
+
+    def tiles_any(self, mask):
+        """Маска клеток -> маска плиток, где есть хоть одна отмеченная клетка"""
+        size = self.tile_size
+        tiles_x, tiles_y = self.tiles_shape
+        padded = np.zeros((tiles_x * size, tiles_y * size), dtype=bool)
+        padded[:mask.shape[0], :mask.shape[1]] = mask
+        return padded.reshape(tiles_x, size, tiles_y, size).any(axis=(1, 3))
+
+    def tile(self, tx, ty):
+        (x0, x1), (y0, y1) = self.x_bounds[tx], self.y_bounds[ty]
+        return slice(x0, x1), slice(y0, y1)
+
+    def flush_idle(self, tx, ty, grid, age_grid):
+        """Дописывает возраст, накопленный плиткой, пока ее не считали"""
+        if self.idle[tx, ty]:
+            xs, ys = self.tile(tx, ty)
+            age_grid[xs, ys] += (grid[xs, ys] == 1) * self.idle[tx, ty]
+            self.idle[tx, ty] = 0
+
+    def sync_ages(self, grid, age_grid):
+        """Точный возраст на всем поле (нужен при смене движка или сверке)"""
+        if self.tiles_shape is None:
+            return
+        for tx, ty in zip(*np.nonzero(self.idle)):
+            self.flush_idle(tx, ty, grid, age_grid)
+
+    def step_tile(self, tx, ty, grid, age_grid):
+        """Шаг одной плитки по полю прошлого поколения; возвращает True, если она изменилась"""
+        block = self.previous[np.ix_(self.x_halo[tx], self.y_halo[ty])]
+        neighbors = (block[:-2, :-2] + block[:-2, 1:-1] + block[:-2, 2:]
+                     + block[1:-1, :-2] + block[1:-1, 2:]
+                     + block[2:, :-2] + block[2:, 1:-1] + block[2:, 2:])
+        alive = block[1:-1, 1:-1] == 1
+        new = (neighbors == 3) | (alive & (neighbors == 2))
+
+        xs, ys = self.tile(tx, ty)
+        ages = age_grid[xs, ys]
+        ages += alive & new
+        ages[new & ~alive] = 1
+        ages[alive & ~new] = 0
+        grid[xs, ys] = new
+        return bool((new != alive).any())
+
+    def step(self, grid, age_grid):
+        self.prepare_tiles(grid)
+
+        # Правки игрока с прошлого шага тоже делают плитки активными
+        if not np.array_equal(grid, self.previous):
+            self.changed |= self.tiles_any(grid != self.previous)
+            self.populated = self.tiles_any(grid == 1)
+            self.previous[...] = grid
+
+        # Считаем изменившиеся плитки и их соседей (с замыканием краев)
+        to_step = self.changed.copy()
+        for dx, dy in NEIGHBOR_OFFSETS:
+            to_step |= np.roll(self.changed, (dx, dy), axis=(0, 1))
+        self.active_ratio = to_step.mean()
+
+        if self.active_ratio > TILED_FULL_STEP_RATIO:
+            # Активно почти все поле: один векторный шаг дешевле, чем цикл по плиткам
+            self.sync_ages(grid, age_grid)
+            super().step(grid, age_grid)
+            self.changed = self.tiles_any(grid != self.previous)
+            self.quiet = np.where(self.changed, 0, self.quiet + 1)
+            self.populated = self.tiles_any(grid == 1)
+            self.previous[...] = grid
+            self.redraw = np.ones(self.tiles_shape, dtype=bool)
+            return
+
+        changed = np.zeros(self.tiles_shape, dtype=bool)
+        for tx, ty in zip(*np.nonzero(to_step)):
+            self.flush_idle(tx, ty, grid, age_grid)
+            changed[tx, ty] = self.step_tile(tx, ty, grid, age_grid)
+            xs, ys = self.tile(tx, ty)
+            self.populated[tx, ty] = grid[xs, ys].any()
+
+        # Нетронутые плитки: пока там есть молодые клетки (возраст < 5 меняет цвет), старим сразу,
+        # а дальше копим возраст в счетчике. Пустые плитки не трогаем вовсе
+        self.quiet = np.where(changed, 0, self.quiet + 1)
+        resting = ~to_step & self.populated
+        young = resting & (self.quiet <= 5)
+        for tx, ty in zip(*np.nonzero(young)):
+            xs, ys = self.tile(tx, ty)
+            age_grid[xs, ys] += grid[xs, ys] == 1
+        self.idle[resting & ~young] += 1
+
+        for tx, ty in zip(*np.nonzero(to_step)):
+            xs, ys = self.tile(tx, ty)
+            self.previous[xs, ys] = grid[xs, ys]
+        self.changed = changed
+        self.redraw = to_step | young
+
+    def step_battle(self, grid, age_grid):
+        self.sync_ages(grid, age_grid)
+        self.reset()
+        super().step_battle(grid, age_grid)
+
+
+# Состояние процесса-воркера ParallelEngine: подключенная общая память и свой NumpyEngine
+_worker = {}
+
+
+def _init_worker(names, shape):
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    _worker["blocks"] = blocks
+    _worker["src"] = np.ndarray(shape, dtype=GRID_DTYPE, buffer=blocks[0].buf)
+    _worker["dst"] = np.ndarray(shape, dtype=GRID_DTYPE, buffer=blocks[1].buf)
+    _worker["age"] = np.ndarray(shape, dtype=AGE_DTYPE, buffer=blocks[2].buf)
+    _worker["engine"] = NumpyEngine()
+
+
+def _step_band(bounds):
+    """Шаг полосы строк [y0, y1) с гало в одну строку сверху и снизу"""
+    y0, y1 = bounds
+    src, dst, age = _worker["src"], _worker["dst"], _worker["age"]
+
+    # Полоса вместе с соседними строками (с замыканием по вертикали). Строки гало внутри
+    # полосы посчитаются неверно, но их не записываем - внутренние строки видят верных соседей
+    band_rows = np.arange(y0 - 1, y1 + 1)
+    band = src.take(band_rows, axis=1, mode="wrap")
+    age_band = age.take(band_rows, axis=1, mode="wrap")
+    _worker["engine"].step(band, age_band)
+
+    dst[:, y0:y1] = band[:, 1:-1]
+    age[:, y0:y1] = age_band[:, 1:-1]
+
+
+class ParallelEngine(NumpyEngine):
+    """Классический режим на нескольких ядрах: поле режется на горизонтальные полосы,
+    которые считают процессы пула над общей памятью. Битва считается в одном процессе."""
+
+    name = "parallel"
+
+    def __init__(self, seed=None, workers=WORKERS):
+        super().__init__(seed)
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        self.pool_shape = None
+        self.blocks = []
+
+    def start(self, shape):
+        """Создает общую память и пул под размер поля (один раз)"""
+        if self.pool_shape == shape:
+            return
+        self.close()
+        cols, rows = shape
+        grid_size = cols * rows * np.dtype(GRID_DTYPE).itemsize
+        age_size = cols * rows * np.dtype(AGE_DTYPE).itemsize
+        self.blocks = [shared_memory.SharedMemory(create=True, size=size)
+                       for size in (grid_size, grid_size, age_size)]
+        self.src = np.ndarray(shape, dtype=GRID_DTYPE, buffer=self.blocks[0].buf)
+        self.dst = np.ndarray(shape, dtype=GRID_DTYPE, buffer=self.blocks[1].buf)
+        self.age = np.ndarray(shape, dtype=AGE_DTYPE, buffer=self.blocks[2].buf)
+
+        bounds = np.linspace(0, rows, min(self.workers, rows) + 1).astype(int)
+        self.bands = [(int(y0), int(y1)) for y0, y1 in zip(bounds[:-1], bounds[1:])]
+        self.pool = Pool(self.workers, initializer=_init_worker,
+                         initargs=([block.name for block in self.blocks], shape))
+        self.pool_shape = shape
+
+    def step(self, grid, age_grid):
+        self.start(grid.shape)
+        self.src[...] = grid
+        self.age[...] = age_grid
+        self.pool.map(_step_band, self.bands)
+        grid[...] = self.dst
+        age_grid[...] = self.age
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        if self.blocks:
+            # Сначала отпускаем массивы-представления, иначе память нельзя закрыть
+            del self.src, self.dst, self.age
+            for block in self.blocks:
+                block.close()
+                block.unlink()
+            self.blocks = []
+        self.pool_shape = None
+
+
+ENGINES = {
+    ReferenceEngine.name: ReferenceEngine,
+    NumpyEngine.name: NumpyEngine,
+    HashLifeEngine.name: HashLifeEngine,
+    TiledEngine.name: TiledEngine,
+    ParallelEngine.name: ParallelEngine,
+}
+
+
+def create_engine(name, seed=None):
+    """Создает движок по имени из ENGINES"""
+    if name not in ENGINES:
+        raise ValueError(f"Неизвестный движок: {name}. Доступны: {', '.join(ENGINES)}")
+    return ENGINES[name](seed=seed)
+
+
+def next_engine_name(name):
+    """Имя следующего движка по кругу (для переключения клавишей)"""
+    names = list(ENGINES)
+    return names[(names.index(name) + 1) % len(names)]
+
+
+def cross_check(grid, age_grid, generations=10, first="reference", second="numpy", mode="classic"):
+    """Прогоняет два движка на копиях одной доски.
+
+    Возвращает номер первого поколения, на котором результаты разошлись, или None.
+    В режиме "battle" движки тянут случайные числа в разном порядке, поэтому побитово
+    совпадают только прогоны одного и того же движка (проверка воспроизводимости по seed).
+    """
+    engine_a, engine_b = create_engine(first, seed=0), create_engine(second, seed=0)
+    grid_a, age_a = grid.copy(), age_grid.copy()
+    grid_b, age_b = grid.copy(), age_grid.copy()
+    for generation in range(1, generations + 1):
+        if mode == "classic":
+            engine_a.step(grid_a, age_a)
+            engine_b.step(grid_b, age_b)
+        else:
+            engine_a.step_battle(grid_a, age_a)
+            engine_b.step_battle(grid_b, age_b)
+        engine_a.sync_ages(grid_a, age_a)
+        engine_b.sync_ages(grid_b, age_b)
+        if not (np.array_equal(grid_a, grid_b) and np.array_equal(age_a, age_b)):
+            engine_a.close()
+            engine_b.close()
+            return generation
+    engine_a.close()
+    engine_b.close()
+    return None
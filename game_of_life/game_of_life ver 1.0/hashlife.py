@@ -0,0 +1,228 @@
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# Бесконечная вселенная "Жизни" в стиле HashLife.
+# Поле хранится квадродеревом: узел уровня k - квадрат 2^k x 2^k из четырех узлов уровня k-1
+# (a - левый верхний, b - правый верхний, c - левый нижний, d - правый нижний).
+# Одинаковые узлы создаются один раз (join кэшируется), а результат successor запоминается,
+# поэтому повторяющиеся участки (пустота, натюрморты, потоки глайдеров) считаются один раз,
+# а прыжок на 2^j поколений стоит столько же, сколько один шаг.
+
+# Размер кэшей узлов и переходов
+CACHE_SIZE = 2 ** 20
+
+_Node = namedtuple("Node", ["k", "a", "b", "c", "d", "n", "hash"])
+
+
+class Node(_Node):
+    __slots__ = ()
+
+    def __hash__(self):
+        return self.hash
+
+    def __repr__(self):
+        return f"Node(k={self.k}, n={self.n})"
+
+
+HASH_MASK = (1 << 63) - 1
+
+OFF = Node(k=0, a=None, b=None, c=None, d=None, n=0, hash=0)
+ON = Node(k=0, a=None, b=None, c=None, d=None, n=1, hash=1)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def join(a, b, c, d):
+    """Собирает узел уровня k+1 из четырех узлов уровня k"""
+    n = a.n + b.n + c.n + d.n
+    node_hash = (a.k + 2
+                 + 5131830419411 * a.hash + 3758991985019 * b.hash
+                 + 8973110871315 * c.hash + 4318490180473 * d.hash) & HASH_MASK
+    return Node(a.k + 1, a, b, c, d, n, node_hash)
+
+
+@lru_cache(maxsize=None)
+def get_zero(k):
+    """Пустой узел уровня k"""
+    return OFF if k == 0 else join(get_zero(k - 1), get_zero(k - 1),
+                                   get_zero(k - 1), get_zero(k - 1))
+
+
+def centre(m):
+    """Узел уровня k+1, в центре которого лежит m (окружен пустотой)"""
+    z = get_zero(m.k - 1)
+    return join(join(z, z, z, m.a), join(z, z, m.b, z),
+                join(z, m.c, z, z), join(m.d, z, z, z))
+
+
+def life(a, b, c, d, e, f, g, h, i):
+    """Правило B3/S23 для центральной клетки e окна 3x3"""
+    outer = a.n + b.n + c.n + d.n + f.n + g.n + h.n + i.n
+    return ON if (e.n and outer == 2) or outer == 3 else OFF
+
+
+def life_4x4(m):
+    """Центральные 2x2 узла 4x4 через одно поколение"""
+    ad = life(m.a.a, m.a.b, m.b.a, m.a.c, m.a.d, m.b.c, m.c.a, m.c.b, m.d.a)
+    bc = life(m.a.b, m.b.a, m.b.b, m.a.d, m.b.c, m.b.d, m.c.b, m.d.a, m.d.b)
+    cb = life(m.a.c, m.a.d, m.b.c, m.c.a, m.c.b, m.d.a, m.c.c, m.c.d, m.d.c)
+    da = life(m.a.d, m.b.c, m.b.d, m.c.b, m.d.a, m.d.b, m.c.d, m.d.c, m.d.d)
+    return join(ad, bc, cb, da)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def successor(m, j):
+    """Центральный квадрат узла m (уровень k-1) через 2^j поколений, j <= k-2"""
+    if m.n == 0:
+        return m.a
+    if m.k == 2:
+        return life_4x4(m)
+
+    j = min(j, m.k - 2)
+    c1 = successor(join(m.a.a, m.a.b, m.a.c, m.a.d), j)
+    c2 = successor(join(m.a.b, m.b.a, m.a.d, m.b.c), j)
+    c3 = successor(join(m.b.a, m.b.b, m.b.c, m.b.d), j)
+    c4 = successor(join(m.a.c, m.a.d, m.c.a, m.c.b), j)
+    c5 = successor(join(m.a.d, m.b.c, m.c.b, m.d.a), j)
+    c6 = successor(join(m.b.c, m.b.d, m.d.a, m.d.b), j)
+    c7 = successor(join(m.c.a, m.c.b, m.c.c, m.c.d), j)
+    c8 = successor(join(m.c.b, m.d.a, m.c.d, m.d.c), j)
+    c9 = successor(join(m.d.a, m.d.b, m.d.c, m.d.d), j)
+
+    if j < m.k - 2:
+        # Короткий прыжок: второй половины шагов не нужно, берем центры без повторного successor
+        return join(join(c1.d, c2.c, c4.b, c5.a), join(c2.d, c3.c, c5.b, c6.a),
+                    join(c4.d, c5.c, c7.b, c8.a), join(c5.d, c6.c, c8.b, c9.a))
+    return join(successor(join(c1, c2, c4, c5), j), successor(join(c2, c3, c5, c6), j),
+                successor(join(c4, c5, c7, c8), j), successor(join(c5, c6, c8, c9), j))
+
+
+def set_cell(node, x, y, alive):
+    """Новый узел с измененной клеткой (x, y отсчитываются от левого верхнего угла узла)"""
+    if node.k == 0:
+        return ON if alive else OFF
+    half = 1 << (node.k - 1)
+    a, b, c, d = node.a, node.b, node.c, node.d
+    if y < half:
+        if x < half:
+            a = set_cell(a, x, y, alive)
+        else:
+            b = set_cell(b, x - half, y, alive)
+    else:
+        if x < half:
+            c = set_cell(c, x, y - half, alive)
+        else:
+            d = set_cell(d, x - half, y - half, alive)
+    return join(a, b, c, d)
+
+
+def get_cell(node, x, y):
+    while node.k > 0:
+        if node.n == 0:
+            return 0
+        half = 1 << (node.k - 1)
+        if y < half:
+            node, x = (node.a, x) if x < half else (node.b, x - half)
+        else:
+            node, x = (node.c, x) if x < half else (node.d, x - half)
+            y -= half
+    return node.n
+
+
+def is_padded(node):
+    """Все живые клетки лежат в центральной половине узла"""
+    if node.k < 3:
+        return node.n == 0
+    inner = node.a.d.n + node.b.c.n + node.c.b.n + node.d.a.n
+    return inner == node.n
+
+
+class Universe:
+    """Бесконечное поле: корень квадродерева, центр которого всегда в точке (0, 0)"""
+
+    def __init__(self, level=3):
+        self.root = get_zero(level)
+        self.generation = 0
+
+    @property
+    def population(self):
+        return self.root.n
+
+    @property
+    def half(self):
+        return 1 << (self.root.k - 1)
+
+    def expand(self):
+        self.root = centre(self.root)
+
+    def set_cell(self, x, y, alive=True):
+        while not (-self.half <= x < self.half and -self.half <= y < self.half):
+            self.expand()
+        self.root = set_cell(self.root, x + self.half, y + self.half, alive)
+
+    def get_cell(self, x, y):
+        if not (-self.half <= x < self.half and -self.half <= y < self.half):
+            return 0
+        return get_cell(self.root, x + self.half, y + self.half)
+
+    def clear(self):
+        self.root = get_zero(3)
+        self.generation = 0
+
+    def step(self, generations=1):
+        """Продвигает вселенную на любое число поколений (по степеням двойки)"""
+        j = 0
+        while generations > 0:
+            if generations & 1:
+                # Запас пустоты: за 2^j поколений узор не вылезет за центральную половину корня
+                while self.root.k < j + 2 or not is_padded(self.root):
+                    self.expand()
+                self.root = successor(centre(self.root), j)
+                self.generation += 1 << j
+            generations >>= 1
+            j += 1
+
+    def viewport(self, x0, y0, cols, rows, out=None):
+        """Плотный массив (cols, rows) с живыми клетками окна, левый верхний угол которого (x0, y0)"""
+        if out is None:
+            out = np.zeros((cols, rows), dtype=np.uint8)
+        else:
+            out.fill(0)
+        half = self.half
+        self._fill(self.root, -half, -half, x0, y0, out)
+        return out
+
+    def _fill(self, node, left, top, x0, y0, out):
+        if node.n == 0:
+            return
+        cols, rows = out.shape
+        size = 1 << node.k
+        if left >= x0 + cols or top >= y0 + rows or left + size <= x0 or top + size <= y0:
+            return
+        if node.k == 0:
+            out[left - x0, top - y0] = 1
+            return
+        half = size >> 1
+        self._fill(node.a, left, top, x0, y0, out)
+        self._fill(node.b, left + half, top, x0, y0, out)
+        self._fill(node.c, left, top + half, x0, y0, out)
+        self._fill(node.d, left + half, top + half, x0, y0, out)
+
+    def cells(self):
+        """Список координат всех живых клеток"""
+        result = []
+        self._collect(self.root, -self.half, -self.half, result)
+        return result
+
+    def _collect(self, node, left, top, result):
+        if node.n == 0:
+            return
+        if node.k == 0:
+            result.append((left, top))
+            return
+        half = 1 << (node.k - 1)
+        self._collect(node.a, left, top, result)
+        self._collect(node.b, left + half, top, result)
+        self._collect(node.c, left, top + half, result)
+        self._collect(node.d, left + half, top + half, result)
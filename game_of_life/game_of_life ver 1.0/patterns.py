@@ -0,0 +1,242 @@
+import json
+import os
+import re
+
+import numpy as np
+
+from hashlife import Universe
+from settings import PATTERNS_DIR, PATTERN_MAX_PERIOD, PATTERN_PERIOD_MAX_CELLS
+
+# Библиотека фигур: файлы RLE (.rle) и plaintext (.cells) из папки patterns.
+# Сводка по файлам (имя, размеры, население, период) хранится в patterns/index.json и
+# пересчитывается только для новых или измененных файлов, сами клетки читаются при первом выборе.
+# Массив фигуры имеет форму (ширина, высота) и индексируется [x, y], как и сетка игры.
+
+INDEX_FILE = "index.json"
+EXTENSIONS = (".rle", ".cells")
+
+
+def parse_rle(text):
+    """Разбирает RLE; возвращает (имя, массив клеток)"""
+    name = None
+    width = height = None
+    body = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            if line[:2] in ("#N", "#n") and name is None:
+                name = line[2:].strip() or None
+            continue
+        if width is None and line.startswith("x"):
+            header = dict(part.split("=", 1) for part in line.replace(" ", "").split(",") if "=" in part)
+            width, height = int(header["x"]), int(header["y"])
+            continue
+        body.append(line)
+        if "!" in line:
+            break
+
+    rows = [[]]
+    for count, tag in re.findall(r"(\d*)([a-zA-Z$!])", "".join(body)):
+        count = int(count) if count else 1
+        if tag == "!":
+            break
+        if tag == "$":
+            rows.extend([] for _ in range(count))
+        else:
+            rows[-1].extend([0 if tag == "b" else 1] * count)
+
+    if width is None:
+        width = max((len(row) for row in rows), default=0)
+        height = len(rows)
+    cells = np.zeros((width, height), dtype=np.uint8)
+    for y, row in enumerate(rows[:height]):
+        row = row[:width]
+        cells[:len(row), y] = row
+    return name, cells
+
+
+def parse_plaintext(text):
+    """Разбирает формат .cells ('O' - живая, '.' - пустая, '!' - комментарий)"""
+    name = None
+    rows = []
+    for line in text.splitlines():
+        if line.startswith("!"):
+            if line.startswith("!Name:") and name is None:
+                name = line[len("!Name:"):].strip() or None
+            continue
+        rows.append([1 if ch in "O*" else 0 for ch in line.rstrip()])
+    width = max((len(row) for row in rows), default=0)
+    cells = np.zeros((width, len(rows)), dtype=np.uint8)
+    for y, row in enumerate(rows):
+        cells[:len(row), y] = row
+    return name, cells
+
+
+def load_pattern_file(path):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.lower().endswith(".rle"):
+        return parse_rle(text)
+    return parse_plaintext(text)
+
+
+def to_rle(cells, name=None):
+    """Сохраняет ограничивающий прямоугольник живых клеток в RLE"""
+    xs, ys = np.nonzero(cells)
+    lines = []
+    if name:
+        lines.append(f"#N {name}")
+    if len(xs) == 0:
+        lines.append("x = 0, y = 0, rule = B3/S23")
+        lines.append("!")
+        return "\n".join(lines) + "\n"
+
+    box = cells[xs.min():xs.max() + 1, ys.min():ys.max() + 1] != 0
+    width, height = box.shape
+    lines.append(f"x = {width}, y = {height}, rule = B3/S23")
+
+    tokens = []
+    pending_rows = 0
+    for y in range(height):
+        row = box[:, y]
+        if not row.any():
+            pending_rows += 1
+            continue
+        if tokens or pending_rows:
+            tokens.append(f"{pending_rows + 1 if pending_rows else ''}$")
+        pending_rows = 0
+        last = np.nonzero(row)[0][-1]
+        x = 0
+        while x <= last:
+            value = row[x]
+            run = 1
+            while x + run <= last and row[x + run] == value:
+                run += 1
+            tokens.append(f"{run if run > 1 else ''}{'o' if value else 'b'}")
+            x += run
+    tokens.append("!")
+
+    # Строки RLE не длиннее 70 символов
+    line = ""
+    for token in tokens:
+        if len(line) + len(token) > 70:
+            lines.append(line)
+            line = ""
+        line += token
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def save_rle(grid, path, name=None):
+    """Записывает живые клетки поля (любой команды) в файл RLE"""
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(to_rle(grid, name))
+
+
+def place_pattern(grid, pattern, x, y, value=1):
+    """Ставит фигуру левым верхним углом в (x, y) с переносом через края поля"""
+    cols, rows = grid.shape
+    w, h = pattern.shape
+    xs = (x + np.arange(w)) % cols
+    ys = (y + np.arange(h)) % rows
+    target = np.ix_(xs, ys)
+    grid[target] = np.where(pattern != 0, value, grid[target])
+
+
+def find_period(cells, max_period=PATTERN_MAX_PERIOD):
+    """Период фигуры (1 - натюрморт), с учетом сдвига для кораблей; None - не нашли"""
+    def normalized(points):
+        if not points:
+            return frozenset()
+        min_x = min(x for x, _ in points)
+        min_y = min(y for _, y in points)
+        return frozenset((x - min_x, y - min_y) for x, y in points)
+
+    universe = Universe()
+    for x, y in zip(*np.nonzero(cells)):
+        universe.set_cell(int(x), int(y))
+    start = normalized(universe.cells())
+    for period in range(1, max_period + 1):
+        universe.step(1)
+        if normalized(universe.cells()) == start:
+            return period
+    return None
+
+
+def describe(cells):
+    """Сводка для индекса"""
+    population = int(np.count_nonzero(cells))
+    period = find_period(cells) if 0 < population <= PATTERN_PERIOD_MAX_CELLS else None
+    return {
+        "width": int(cells.shape[0]),
+        "height": int(cells.shape[1]),
+        "population": population,
+        "period": period,
+    }
+
+
+class PatternLibrary:
+    def __init__(self, directory=PATTERNS_DIR):
+        self.directory = directory
+        self.index = {}  # имя фигуры -> запись индекса
+        self.cache = {}  # имя фигуры -> массив клеток
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, INDEX_FILE)
+
+    def load(self):
+        """Читает индекс и досчитывает записи только для новых и измененных файлов"""
+        stored = {}
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                stored = {entry["file"]: entry for entry in json.load(f)}
+        except (OSError, ValueError, KeyError, TypeError):
+            stored = {}
+
+        entries = []
+        changed = False
+        files = sorted(os.listdir(self.directory)) if os.path.isdir(self.directory) else []
+        for file in files:
+            if not file.lower().endswith(EXTENSIONS):
+                continue
+            path = os.path.join(self.directory, file)
+            stat = os.stat(path)
+            entry = stored.get(file)
+            if entry is None or entry.get("mtime") != stat.st_mtime or entry.get("size") != stat.st_size:
+                try:
+                    name, cells = load_pattern_file(path)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Не удалось прочитать фигуру {path}: {e}")
+                    continue
+                entry = {"file": file, "name": name or os.path.splitext(file)[0],
+                         "mtime": stat.st_mtime, "size": stat.st_size}
+                entry.update(describe(cells))
+                self.cache[entry["name"]] = cells
+                changed = True
+            entries.append(entry)
+
+        if changed or len(entries) != len(stored):
+            try:
+                with open(self.index_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, indent=4, ensure_ascii=False)
+            except OSError as e:
+                print(f"Не удалось сохранить индекс фигур: {e}")
+
+        self.index = {entry["name"]: entry for entry in entries}
+        return self
+
+    def names(self):
+        return list(self.index)
+
+    def get(self, name):
+        """Клетки фигуры по имени (файл читается при первом обращении)"""
+        if name not in self.cache:
+            _, cells = load_pattern_file(os.path.join(self.directory, self.index[name]["file"]))
+            self.cache[name] = cells
+        return self.cache[name]
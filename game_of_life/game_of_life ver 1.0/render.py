@@ -0,0 +1,116 @@
+import numpy as np
+import pygame
+
+from settings import BLACK, TEAM_BLUE, TEAM_RED, TILE_SIZE
+
+# Отрисовка клеток одним кадром: сетка -> индексы палитры -> картинка 1 пиксель на клетку,
+# затем масштабирование до размера клеток и маска зазоров поверх. Стоимость не зависит
+# от числа живых клеток, а индексы пересчитываются только в измененных плитках.
+
+# Классы возраста: 0 - только родилась, 1 - молодая (< 5), 2 - старая
+AGE_CLASSES = np.array([1, 0, 1, 1, 1, 2], dtype=np.uint8)  # индекс - возраст, обрезанный до 5
+AGE_SAMPLES = (1, 2, 5)  # представитель каждого класса для get_cell_color
+TEAMS = (0, TEAM_BLUE, TEAM_RED)
+
+# Цвет-ключ маски зазоров (прозрачные места маски, через которые видна клетка)
+MASK_KEY = (255, 0, 255)
+
+
+def get_cell_color(team, age, pulse):
+    if team == 0:
+        return BLACK
+
+    if team == TEAM_BLUE:
+        if age == 1:
+            c = int(128 * pulse)
+            return (c, c, 255)
+        elif age < 5:
+            return (0, 0, int(255 * pulse))
+        else:
+            return (0, int(128 * pulse), 255)
+    else:  # TEAM_RED
+        if age == 1:
+            c = int(128 * pulse)
+            return (255, c, c)
+        elif age < 5:
+            return (int(255 * pulse), 0, 0)
+        else:
+            return (255, int(128 * pulse), 0)
+
+
+def build_palette(pulse, out=None):
+    """Таблица цветов (команда * 3 + класс возраста) -> RGB для текущей пульсации"""
+    if out is None:
+        out = np.zeros((len(TEAMS) * len(AGE_SAMPLES), 3), dtype=np.uint8)
+    for team in TEAMS:
+        for age_class, age in enumerate(AGE_SAMPLES):
+            out[team * len(AGE_SAMPLES) + age_class] = get_cell_color(team, age, pulse)
+    return out
+
+
+class CellRenderer:
+    """Кадр хранится индексами палитры (8-битная поверхность): пульсация меняет только палитру,
+    а индексы пересчитываются лишь в плитках, отмеченных через invalidate()."""
+
+    def __init__(self, cols, rows, cell_size, tile_size=TILE_SIZE):
+        self.cols = cols
+        self.rows = rows
+        self.cell_size = cell_size
+        self.tile_size = tile_size
+        self.small = pygame.Surface((cols, rows), depth=8)
+        self.scaled = pygame.Surface((cols * cell_size, rows * cell_size), depth=8)
+        self.palette = np.zeros((len(TEAMS) * len(AGE_SAMPLES), 3), dtype=np.uint8)
+        self.masks = {}  # (размер клетки, отступ) -> поверхность маски
+        self.dirty = np.zeros((-(-cols // tile_size), -(-rows // tile_size)), dtype=bool)
+        self.full = True  # перерисовать все поле
+
+    def invalidate(self, tiles=None):
+        """Отмечает плитки для пересчета индексов (None - все поле)"""
+        if tiles is None:
+            self.full = True
+        else:
+            self.dirty |= tiles
+
+    def get_mask(self, cell_size, offset):
+        """Маска зазоров между клетками; размеров клетки за время пульсации всего пара, кэшируем"""
+        key = (cell_size, offset)
+        if key not in self.masks:
+            tile = np.zeros((self.cell_size, self.cell_size, 3), dtype=np.uint8)
+            inner = slice(offset, offset + max(cell_size - 1, 0))
+            tile[inner, inner] = MASK_KEY
+            mask = pygame.surfarray.make_surface(np.tile(tile, (self.cols, self.rows, 1)))
+            mask.set_colorkey(MASK_KEY)
+            self.masks[key] = mask
+        return self.masks[key]
+
+    def color_map(self, grid, age_grid, pulse):
+        """Обновляет палитру и индексы цветов в маленькой поверхности (1 пиксель на клетку)"""
+        build_palette(pulse, self.palette)
+        colors = [tuple(color) for color in self.palette.tolist()]
+        self.small.set_palette(colors)
+        self.scaled.set_palette(colors)
+
+        if self.full:
+            regions = [(slice(None), slice(None))]
+        else:
+            size = self.tile_size
+            regions = [(slice(tx * size, (tx + 1) * size), slice(ty * size, (ty + 1) * size))
+                       for tx, ty in zip(*np.nonzero(self.dirty))]
+        if regions:
+            index = pygame.surfarray.pixels2d(self.small)
+            for xs, ys in regions:
+                age_class = AGE_CLASSES[np.clip(age_grid[xs, ys], 0, len(AGE_CLASSES) - 1)]
+                index[xs, ys] = grid[xs, ys] * len(AGE_SAMPLES) + age_class
+            del index  # отпускаем блокировку поверхности
+        self.full = False
+        self.dirty[...] = False
+
+    def blit(self, target, cell_size, offset):
+        """Масштабирует кадр до размера клеток и накрывает маской зазоров"""
+        pygame.transform.scale(self.small, self.scaled.get_size(), self.scaled)
+        target.blit(self.scaled, (0, 0))
+        target.blit(self.get_mask(cell_size, offset), (0, 0))
+
+    def draw(self, target, grid, age_grid, pulse, cell_size, offset):
+        self.color_map(grid, age_grid, pulse)
+        self.blit(target, cell_size, offset)
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from settings import FPS, GENERATIONS_PER_SECOND, MAX_CATCH_UP
+
+# Расчет поколений в фоновом потоке с фиксированным шагом времени.
+# Скорость симуляции (поколений в секунду) не зависит от частоты кадров: за один кадр может
+# пройти несколько поколений или ни одного. Сетки общие с основным потоком, поэтому и шаг,
+# и любое чтение/правка поля из основного потока делаются под lock.
+
+
+class Simulation:
+    def __init__(self, step, rate=GENERATIONS_PER_SECOND):
+        self.step = step  # функция без аргументов: одно поколение
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.paused = True
+        self.generations = 0
+        self.measured_rate = 0.0  # фактическая скорость за последнюю секунду
+        self.error = None  # исключение из фонового потока
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="life-simulation", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        backlog = 0.0  # время симуляции, которое еще надо досчитать
+        last = time.perf_counter()
+        window_start, window_generations = last, 0
+        while self.running:
+            now = time.perf_counter()
+            backlog = backlog + now - last if not self.paused else 0.0
+            last = now
+
+            # Не догоняем больше MAX_CATCH_UP секунд: если шаг не успевает, скорость просто падает
+            interval = 1 / self.rate
+            backlog = min(backlog, max(MAX_CATCH_UP, interval))
+            due = int(backlog / interval)
+            if due:
+                try:
+                    with self.lock:
+                        started = time.perf_counter()
+                        done = 0
+                        # Держим lock не дольше кадра, чтобы не тормозить ввод и отрисовку
+                        while done < due and self.running and not self.paused:
+                            self.step()
+                            done += 1
+                            if time.perf_counter() - started > 1 / FPS:
+                                break
+                except Exception as e:
+                    self.error = e
+                    self.running = False
+                    return
+                backlog -= done * interval
+                self.generations += done
+                window_generations += done
+
+            if now - window_start >= 1:
+                self.measured_rate = window_generations / (now - window_start)
+                window_start, window_generations = now, 0
+
+            # Спим до следующего поколения (даем основному потоку взять lock)
+            wait = interval - backlog if not self.paused else 0.01
+            time.sleep(min(max(wait, 0.001), 0.01))
@@ -0,0 +1,61 @@
+import os
+
+# Общие настройки игры "Жизнь"
+# Модуль не трогает pygame, поэтому его можно импортировать без окна (движки, тесты)
+
+CELL_SIZE = 15
+STATS_HEIGHT = 50
+FPS = 60  # частота кадров отрисовки (от скорости симуляции не зависит)
+ANIMATION_SPEED = 0.05
+
+# Цвета
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GRAY = (128, 128, 128)
+BLUE = (0, 0, 255)
+RED = (255, 0, 0)
+
+# Команды (значения клеток в сетке)
+EMPTY = 0
+TEAM_BLUE = 1
+TEAM_RED = 2
+
+# Скорость симуляции: поколений в секунду (стрелки вверх/вниз меняют ее вдвое)
+GENERATIONS_PER_SECOND = 60
+MIN_GENERATIONS_PER_SECOND = 1
+MAX_GENERATIONS_PER_SECOND = 4096
+# Сколько секунд отставания симуляция пытается догнать (дальше просто замедляется)
+MAX_CATCH_UP = 0.25
+
+# Движок расчета поколений: "numpy" (быстрый), "reference" (эталонный, для сверки)
+# "hashlife" (бесконечная разреженная вселенная), "parallel" (полосы на нескольких ядрах)
+# или "tiled" (считает только плитки, где что-то меняется)
+ENGINE = "numpy"
+
+# Зерно генератора случайных чисел для режима битвы (None - каждый запуск разный)
+SEED = None
+
+# Число процессов движка "parallel" (0 - по числу ядер)
+WORKERS = 0
+
+# Сдвиг окна просмотра вселенной HashLife одной клавишей (в клетках)
+PAN_CELLS = 10
+
+# Библиотека фигур (RLE / plaintext) и сохраненные поля
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PATTERNS_DIR = os.path.join(BASE_DIR, "patterns")
+SAVES_DIR = os.path.join(BASE_DIR, "saves")
+PATTERN_MAX_PERIOD = 60  # до какого периода искать осцилляции при индексации
+PATTERN_PERIOD_MAX_CELLS = 500  # для фигур крупнее период не ищем
+
+# Типы данных сеток
+GRID_DTYPE = "uint8"
+AGE_DTYPE = "int32"
+
+# Сколько последних поколений помнит поиск циклов (наибольший находимый период)
+CYCLE_HISTORY = 64
+
+# Размер плитки (в клетках) для движка "tiled" и частичной перерисовки
+TILE_SIZE = 32
+# Если активных плиток больше этой доли, поле считается целиком одним векторным шагом
+TILED_FULL_STEP_RATIO = 0.3